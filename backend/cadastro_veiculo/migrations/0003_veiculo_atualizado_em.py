@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cadastro_veiculo', '0002_auto_20250821_1223'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='veiculo',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['entregador', 'atualizado_em'], name='veiculo_entreg_atualiz_idx'),
+        ),
+    ]
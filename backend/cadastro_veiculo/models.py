@@ -21,6 +21,7 @@ class Veiculo(models.Model):
     categoria = models.CharField(max_length=10, choices=CATEGORIA_CHOICES, default='passeio')
     km_por_l = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
     data_cadastro = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.modelo}"
@@ -29,3 +30,7 @@ class Veiculo(models.Model):
         verbose_name = 'Veículo'
         verbose_name_plural = 'Veículos'
         ordering = ['-data_cadastro']
+        indexes = [
+            # Sincronização incremental
+            models.Index(fields=['entregador', 'atualizado_em'], name='veiculo_entreg_atualiz_idx'),
+        ]
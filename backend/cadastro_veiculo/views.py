@@ -1,9 +1,20 @@
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+
+from sistema.condicional import get_condicional, validador_entregador
 from .models import Veiculo
 from .serializers import VeiculoSerializer
 
+
+def _validador_veiculos(request, *args, **kwargs):
+    """Validador da listagem de veículos do usuário (GET condicional)"""
+    return validador_entregador(request.user, Veiculo.objects.all())
+
+
+@method_decorator(get_condicional(_validador_veiculos), name='list')
+@method_decorator(get_condicional(_validador_veiculos), name='meus_veiculos')
 class VeiculoViewSet(viewsets.ModelViewSet):
     queryset = Veiculo.objects.all()
     serializer_class = VeiculoSerializer
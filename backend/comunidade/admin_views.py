@@ -6,12 +6,45 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.db.models import Q, Count
+from .busca_service import BuscaComunidade
+from .estatisticas_service import EstatisticasComunidade
+from .moderacao_service import FilaModeracao
+from registro_entregadespesa.pagination import ParametroInvalido
 from .models import Postagem, AnuncioVeiculo
 from .serializers import PostagemSerializer, AnuncioVeiculoSerializer
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Campos usados quando a consulta não tem termos indexáveis (ex.: uma só letra)
+CAMPOS_BUSCA_SIMPLES = {
+    'postagem': (Postagem, ('titulo', 'conteudo', 'autor')),
+    'anuncio': (AnuncioVeiculo, ('modelo', 'localizacao')),
+}
+
+
+def _pagina_conteudo(tipo, search, status_filter, inicio, fim):
+    """
+    Página de postagens/anúncios da moderação e o total de itens
+
+    Com `search`, usa o índice de busca (resultados por relevância)
+    """
+    modelo, campos = CAMPOS_BUSCA_SIMPLES[tipo]
+    if search:
+        resultado = BuscaComunidade.buscar(tipo, search, status=status_filter, inicio=inicio, fim=fim)
+        if resultado is not None:
+            return resultado
+
+    queryset = modelo.objects.all()
+    if search:
+        filtro = Q()
+        for campo in campos:
+            filtro |= Q(**{f'{campo}__icontains': search})
+        queryset = queryset.filter(filtro)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    return list(queryset[inicio:fim]), queryset.count()
+
 @method_decorator(csrf_exempt, name='dispatch')
 class AdminComunidadeAPIView(APIView):
     """
@@ -38,36 +71,15 @@ class AdminComunidadeAPIView(APIView):
             page = int(request.GET.get('page', 1))
             per_page = int(request.GET.get('per_page', 10))
             
-            # Query base para postagens
-            postagens_queryset = Postagem.objects.all()
-            anuncios_queryset = AnuncioVeiculo.objects.all()
-            
-            # Filtro de busca
-            if search:
-                postagens_queryset = postagens_queryset.filter(
-                    Q(titulo__icontains=search) |
-                    Q(conteudo__icontains=search) |
-                    Q(autor__icontains=search)
-                )
-                anuncios_queryset = anuncios_queryset.filter(
-                    Q(modelo__icontains=search) |
-                    Q(localizacao__icontains=search)
-                )
-            
-            # Filtro de status
-            if status_filter != 'all':
-                postagens_queryset = postagens_queryset.filter(status=status_filter)
-                anuncios_queryset = anuncios_queryset.filter(status=status_filter)
-            
             # Paginação
             start = (page - 1) * per_page
             end = start + per_page
+            status_busca = None if status_filter == 'all' else status_filter
             
             # Serializar dados baseado no tipo
             if tipo == 'postagens':
-                postagens = postagens_queryset[start:end]
+                postagens, total_count = _pagina_conteudo('postagem', search, status_busca, start, end)
                 serializer = PostagemSerializer(postagens, many=True)
-                total_count = postagens_queryset.count()
                 
                 return Response({
                     'success': True,
@@ -83,9 +95,8 @@ class AdminComunidadeAPIView(APIView):
                 }, status=status.HTTP_200_OK)
                 
             elif tipo == 'anuncios':
-                anuncios = anuncios_queryset[start:end]
+                anuncios, total_count = _pagina_conteudo('anuncio', search, status_busca, start, end)
                 serializer = AnuncioVeiculoSerializer(anuncios, many=True)
-                total_count = anuncios_queryset.count()
                 
                 return Response({
                     'success': True,
@@ -100,22 +111,34 @@ class AdminComunidadeAPIView(APIView):
                     }
                 }, status=status.HTTP_200_OK)
             
-            else:  # tipo == 'all'
-                # Combinar postagens e anúncios
-                postagens = postagens_queryset[:per_page//2]
-                anuncios = anuncios_queryset[:per_page//2]
+            elif search:  # tipo == 'all' com busca: cada tipo paginado por relevância
+                # As relevâncias dos dois tipos não são comparáveis: cada página traz
+                # a mesma fatia (metade da página) de cada tipo
+                por_tipo = max(per_page // 2, 1)
+                inicio_tipo = (page - 1) * por_tipo
+                postagens, total_postagens = _pagina_conteudo(
+                    'postagem', search, status_busca, inicio_tipo, inicio_tipo + por_tipo
+                )
+                anuncios, total_anuncios = _pagina_conteudo(
+                    'anuncio', search, status_busca, inicio_tipo, inicio_tipo + por_tipo
+                )
+                total_pages = (max(total_postagens, total_anuncios) + por_tipo - 1) // por_tipo
                 
                 postagens_serializer = PostagemSerializer(postagens, many=True)
                 anuncios_serializer = AnuncioVeiculoSerializer(anuncios, many=True)
                 
-                total_postagens = postagens_queryset.count()
-                total_anuncios = anuncios_queryset.count()
-                
                 return Response({
                     'success': True,
                     'data': {
                         'postagens': postagens_serializer.data,
                         'anuncios': anuncios_serializer.data,
+                        'pagination': {
+                            'page': page,
+                            'per_page': per_page,
+                            'total': total_postagens + total_anuncios,
+                            'total_pages': total_pages,
+                            'has_more': page < total_pages
+                        },
                         'stats': {
                             'total_postagens': total_postagens,
                             'total_anuncios': total_anuncios,
@@ -124,6 +147,51 @@ class AdminComunidadeAPIView(APIView):
                     }
                 }, status=status.HTTP_200_OK)
             
+            else:  # tipo == 'all': postagens e anúncios intercalados por data
+                try:
+                    resultado = FilaModeracao.pagina(
+                        status=status_busca, cursor=request.GET.get('cursor') or None,
+                        inicio=start, limite=per_page
+                    )
+                except ParametroInvalido as e:
+                    return Response({
+                        'success': False,
+                        'error': str(e)
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
+                postagens = [item for tipo_item, item in resultado['itens'] if tipo_item == 'postagem']
+                anuncios = [item for tipo_item, item in resultado['itens'] if tipo_item == 'anuncio']
+                
+                # Totais da fonte de estatísticas em cache (sem COUNT por requisição)
+                estatisticas = EstatisticasComunidade.obter()
+                chave_total = status_busca or 'total'
+                total_postagens = estatisticas['postagem'].get(chave_total, 0)
+                total_anuncios = estatisticas['anuncio'].get(chave_total, 0)
+                total_count = total_postagens + total_anuncios
+                
+                return Response({
+                    'success': True,
+                    'data': {
+                        'postagens': PostagemSerializer(postagens, many=True).data,
+                        'anuncios': AnuncioVeiculoSerializer(anuncios, many=True).data,
+                        # Ordem cronológica da página (intercalando os dois tipos)
+                        'ordem': [{'tipo': tipo_item, 'id': item.id} for tipo_item, item in resultado['itens']],
+                        'pagination': {
+                            'page': page,
+                            'per_page': per_page,
+                            'total': total_count,
+                            'total_pages': (total_count + per_page - 1) // per_page,
+                            'next_cursor': resultado['next_cursor'],
+                            'has_more': resultado['has_more']
+                        },
+                        'stats': {
+                            'total_postagens': total_postagens,
+                            'total_anuncios': total_anuncios,
+                            'total_conteudo': total_count
+                        }
+                    }
+                }, status=status.HTTP_200_OK)
+            
         except Exception as e:
             logger.error(f"Erro ao listar conteúdo da comunidade: {str(e)}")
             return Response({
@@ -352,49 +420,32 @@ class AdminComunidadeStatsAPIView(APIView):
                     'error': 'Acesso negado. Apenas administradores podem acessar esta funcionalidade.'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Estatísticas de postagens
-            total_postagens = Postagem.objects.count()
-            postagens_aprovadas = Postagem.objects.filter(status='aprovado').count()
-            postagens_pendentes = Postagem.objects.filter(status='pendente').count()
-            postagens_rejeitadas = Postagem.objects.filter(status='rejeitado').count()
-            postagens_removidas = Postagem.objects.filter(status='removido').count()
-            
-            # Estatísticas de anúncios
-            total_anuncios = AnuncioVeiculo.objects.count()
-            anuncios_aprovados = AnuncioVeiculo.objects.filter(status='aprovado').count()
-            anuncios_pendentes = AnuncioVeiculo.objects.filter(status='pendente').count()
-            anuncios_rejeitados = AnuncioVeiculo.objects.filter(status='rejeitado').count()
-            anuncios_removidos = AnuncioVeiculo.objects.filter(status='removido').count()
-            
-            # Estatísticas por período (últimos 30 dias)
-            from datetime import timedelta
-            hoje = timezone.now().date()
-            mes_passado = hoje - timedelta(days=30)
-            
-            postagens_mes = Postagem.objects.filter(data_criacao__date__gte=mes_passado).count()
-            anuncios_mes = AnuncioVeiculo.objects.filter(data_publicacao__date__gte=mes_passado).count()
+            # Contagens por status e do último mês (em cache até a próxima alteração de conteúdo)
+            estatisticas = EstatisticasComunidade.obter()
+            postagens = estatisticas['postagem']
+            anuncios = estatisticas['anuncio']
             
             return Response({
                 'success': True,
                 'data': {
                     'postagens': {
-                        'total': total_postagens,
-                        'aprovadas': postagens_aprovadas,
-                        'pendentes': postagens_pendentes,
-                        'rejeitadas': postagens_rejeitadas,
-                        'removidas': postagens_removidas,
-                        'ultimo_mes': postagens_mes
+                        'total': postagens['total'],
+                        'aprovadas': postagens['aprovado'],
+                        'pendentes': postagens['pendente'],
+                        'rejeitadas': postagens['rejeitado'],
+                        'removidas': postagens['removido'],
+                        'ultimo_mes': postagens['ultimo_mes']
                     },
                     'anuncios': {
-                        'total': total_anuncios,
-                        'aprovados': anuncios_aprovados,
-                        'pendentes': anuncios_pendentes,
-                        'rejeitados': anuncios_rejeitados,
-                        'removidos': anuncios_removidos,
-                        'ultimo_mes': anuncios_mes
+                        'total': anuncios['total'],
+                        'aprovados': anuncios['aprovado'],
+                        'pendentes': anuncios['pendente'],
+                        'rejeitados': anuncios['rejeitado'],
+                        'removidos': anuncios['removido'],
+                        'ultimo_mes': anuncios['ultimo_mes']
                     },
-                    'total_conteudo': total_postagens + total_anuncios,
-                    'conteudo_pendente': postagens_pendentes + anuncios_pendentes
+                    'total_conteudo': postagens['total'] + anuncios['total'],
+                    'conteudo_pendente': postagens['pendente'] + anuncios['pendente']
                 }
             }, status=status.HTTP_200_OK)
             
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ComunidConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'comunidade'
+
+    def ready(self):
+        import comunidade.signals
@@ -0,0 +1,212 @@
+"""
+Busca textual do conteúdo da comunidade (painel de moderação).
+
+Os textos de postagens e anúncios são normalizados (minúsculas, sem acentos,
+apenas letras e dígitos) e gravados como termos em TermoBusca, com um peso
+por campo (título/modelo valem mais que o corpo). O índice é mantido nos
+sinais de gravação/exclusão (comunidade/signals.py) e pode ser reconstruído
+com `manage.py reindexar_busca_comunidade`.
+
+Cada palavra da consulta casa por prefixo com um intervalo sobre o índice
+(tipo, termo) (ver sistema/busca.py), o que funciona igual no SQLite, MySQL e
+PostgreSQL sem depender de FULLTEXT/FTS. Todos os termos da consulta precisam
+aparecer; a relevância é a soma dos pesos dos termos encontrados.
+"""
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Max, Q, Sum, When
+
+from sistema.busca import STOPWORDS, filtro_prefixo, normalizar
+from .models import Postagem, AnuncioVeiculo, TermoBusca
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO = 2
+TAMANHO_MAXIMO = 40
+PESO_MAXIMO = 1000
+
+# Campos indexados de cada tipo e o peso de cada ocorrência
+CAMPOS_BUSCA = {
+    'postagem': (Postagem, {'titulo': 3, 'autor': 2, 'conteudo': 1}),
+    'anuncio': (AnuncioVeiculo, {'modelo': 3, 'localizacao': 1}),
+}
+TIPO_POR_MODELO = {modelo: tipo for tipo, (modelo, _) in CAMPOS_BUSCA.items()}
+
+
+def termos_do_objeto(objeto, campos):
+    """
+    Returns:
+        dict: {termo: peso} de um objeto
+    """
+    pesos = {}
+    for campo, peso in campos.items():
+        for palavra in normalizar(getattr(objeto, campo, '')):
+            if len(palavra) < TAMANHO_MINIMO or palavra in STOPWORDS:
+                continue
+            termo = palavra[:TAMANHO_MAXIMO]
+            pesos[termo] = min(pesos.get(termo, 0) + peso, PESO_MAXIMO)
+    return pesos
+
+
+def termos_da_consulta(texto):
+    """
+    Prefixos pesquisáveis da consulta (sem repetição, na ordem digitada)
+
+    Stopwords ficam de fora, como na indexação (termos_do_objeto): elas não
+    estão no índice e exigiriam um termo que nunca casa.
+    """
+    termos = []
+    for palavra in normalizar(texto):
+        termo = palavra[:TAMANHO_MAXIMO]
+        if len(termo) >= TAMANHO_MINIMO and termo not in STOPWORDS and termo not in termos:
+            termos.append(termo)
+    return termos
+
+
+class BuscaComunidade:
+    """
+    Índice e consulta da busca de postagens e anúncios
+    """
+
+    @staticmethod
+    def indexar(objeto):
+        """
+        Atualiza os termos de uma postagem/anúncio
+
+        Grava apenas a diferença em relação ao índice atual, então salvar sem
+        alterar o texto (ex.: moderação) custa uma leitura.
+        """
+        tipo = TIPO_POR_MODELO[type(objeto)]
+        novos = termos_do_objeto(objeto, CAMPOS_BUSCA[tipo][1])
+        atuais = dict(
+            TermoBusca.objects.filter(tipo=tipo, objeto_id=objeto.pk).values_list('termo', 'peso')
+        )
+        if novos == atuais:
+            return
+
+        removidos = [termo for termo, peso in atuais.items() if novos.get(termo) != peso]
+        with transaction.atomic():
+            if removidos:
+                TermoBusca.objects.filter(tipo=tipo, objeto_id=objeto.pk, termo__in=removidos).delete()
+            TermoBusca.objects.bulk_create([
+                TermoBusca(tipo=tipo, objeto_id=objeto.pk, termo=termo, peso=peso)
+                for termo, peso in novos.items()
+                if atuais.get(termo) != peso
+            ])
+
+    @staticmethod
+    def remover(objeto):
+        tipo = TIPO_POR_MODELO[type(objeto)]
+        TermoBusca.objects.filter(tipo=tipo, objeto_id=objeto.pk).delete()
+
+    @staticmethod
+    def reindexar(tipo, lote=1000):
+        """
+        Reconstrói o índice de um tipo do zero
+
+        Returns:
+            tuple: (objetos indexados, termos gravados)
+        """
+        modelo, campos = CAMPOS_BUSCA[tipo]
+        objetos = termos = 0
+        with transaction.atomic():
+            TermoBusca.objects.filter(tipo=tipo).delete()
+            pendentes = []
+            for objeto in modelo.objects.only('pk', *campos).order_by('pk').iterator(chunk_size=lote):
+                objetos += 1
+                pendentes.extend(
+                    TermoBusca(tipo=tipo, objeto_id=objeto.pk, termo=termo, peso=peso)
+                    for termo, peso in termos_do_objeto(objeto, campos).items()
+                )
+                if len(pendentes) >= lote:
+                    TermoBusca.objects.bulk_create(pendentes, batch_size=lote)
+                    termos += len(pendentes)
+                    pendentes = []
+            TermoBusca.objects.bulk_create(pendentes, batch_size=lote)
+            termos += len(pendentes)
+        BuscaComunidade.atualizar_estatisticas()
+        logger.info(f"Índice de busca ({tipo}) reconstruído: {objetos} objetos, {termos} termos")
+        return objetos, termos
+
+    @staticmethod
+    def atualizar_estatisticas():
+        """
+        Atualiza as estatísticas do otimizador para TermoBusca após cargas grandes
+
+        Sem estatísticas o SQLite prefere a chave única (tipo, objeto_id, termo)
+        para o GROUP BY e lê o índice inteiro em vez do intervalo do prefixo.
+        """
+        tabela = connection.ops.quote_name(TermoBusca._meta.db_table)
+        if connection.vendor == 'mysql':
+            if connection.in_atomic_block:
+                # ANALYZE TABLE faz commit implícito no MySQL
+                return
+            sql = f'ANALYZE TABLE {tabela}'
+        elif connection.vendor in ('postgresql', 'sqlite'):
+            sql = f'ANALYZE {tabela}'
+        else:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+
+    @staticmethod
+    def ranking(tipo, termos, status=None):
+        """
+        IDs que contêm todos os termos (por prefixo), do mais ao menos relevante
+
+        Args:
+            tipo: 'postagem' ou 'anuncio'
+            termos: Saída de termos_da_consulta (não vazia)
+            status: Restringe a objetos com esse status de moderação
+
+        Returns:
+            QuerySet de dicts {'objeto_id', 'relevancia'}
+        """
+        qualquer_termo = Q()
+        presencas = {}
+        for indice, termo in enumerate(termos):
+            filtro = filtro_prefixo(termo)
+            qualquer_termo |= filtro
+            presencas[f'tem_{indice}'] = Max(
+                Case(When(filtro, then=1), default=0, output_field=IntegerField())
+            )
+
+        queryset = TermoBusca.objects.filter(qualquer_termo, tipo=tipo)
+        if status:
+            modelo = CAMPOS_BUSCA[tipo][0]
+            queryset = queryset.filter(objeto_id__in=modelo.objects.filter(status=status).values('pk'))
+
+        ranking = queryset.values('objeto_id').annotate(relevancia=Sum('peso'))
+        if len(termos) > 1:
+            # Cada termo precisa casar com ao menos uma linha do objeto
+            ranking = ranking.annotate(**presencas).filter(**{nome: 1 for nome in presencas})
+        return ranking.values('objeto_id', 'relevancia').order_by('-relevancia', '-objeto_id')
+
+    @staticmethod
+    def buscar(tipo, texto, status=None, inicio=0, fim=None, queryset=None):
+        """
+        Página de resultados da busca, em ordem de relevância
+
+        Args:
+            tipo: 'postagem' ou 'anuncio'
+            texto: Texto digitado
+            status: Filtro de status de moderação (None = todos)
+            inicio, fim: Fatia da página
+            queryset: Queryset do modelo usado para carregar os objetos
+
+        Returns:
+            tuple: (objetos da página, total de resultados) ou None se a
+            consulta não tiver termos pesquisáveis (ex.: uma só letra)
+        """
+        termos = termos_da_consulta(texto)
+        if not termos:
+            return None
+
+        ranking = BuscaComunidade.ranking(tipo, termos, status)
+        total = ranking.count()
+        ids = [linha['objeto_id'] for linha in ranking[inicio:fim]]
+
+        modelo = CAMPOS_BUSCA[tipo][0]
+        objetos = (queryset if queryset is not None else modelo.objects.all()).in_bulk(ids)
+        return [objetos[pk] for pk in ids if pk in objetos], total
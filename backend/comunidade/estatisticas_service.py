@@ -0,0 +1,188 @@
+"""
+Estatísticas de moderação da comunidade (painel administrativo).
+
+Por padrão, as contagens por status e dos últimos 30 dias saem de uma
+consulta por modelo com agregados condicionais. Com
+COMUNIDADE_ESTATISTICAS_CONTADORES ativo, vêm da tabela ContadorComunidade
+(status x dia de criação), atualizada a cada gravação/exclusão pelos sinais:
+uma única consulta numa tabela pequena, independente do volume de conteúdo.
+Ao ativar a opção, recrie os contadores com
+`manage.py recalcular_contadores_comunidade`.
+
+O resultado fica em cache com a versão do feed (FeedCache), que muda em
+qualquer gravação ou exclusão de conteúdo; um painel consultando a cada
+poucos segundos só chega ao banco quando algo mudou.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .feed_service import FeedCache
+from .models import Postagem, AnuncioVeiculo, ContadorComunidade
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'comunidade:estatisticas'
+DIAS_RECENTES = 30
+STATUS = [valor for valor, _ in Postagem.STATUS_CHOICES]
+
+# Tipo do contador: (modelo, campo da data de criação)
+TIPOS = {
+    'postagem': (Postagem, 'data_criacao'),
+    'anuncio': (AnuncioVeiculo, 'data_publicacao'),
+}
+TIPO_POR_MODELO = {modelo: tipo for tipo, (modelo, _) in TIPOS.items()}
+
+
+def contagens_por_dia(modelo, campo_data):
+    """
+    Returns:
+        list: [(status, dia de criação, quantidade), ...] de um modelo
+    """
+    return [
+        (linha['status'], linha['dia'], linha['quantidade'])
+        for linha in modelo.objects.order_by()
+        .annotate(dia=TruncDate(campo_data))
+        .values('status', 'dia')
+        .annotate(quantidade=Count('pk'))
+    ]
+
+
+def _vazio():
+    return {'total': 0, 'ultimo_mes': 0, **{status: 0 for status in STATUS}}
+
+
+class EstatisticasComunidade:
+    """
+    Contagens de postagens e anúncios por status e no último mês
+    """
+
+    @staticmethod
+    def usar_contadores():
+        return getattr(settings, 'COMUNIDADE_ESTATISTICAS_CONTADORES', False)
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'COMUNIDADE_ESTATISTICAS_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def obter():
+        """
+        Returns:
+            dict: {'postagem': {...}, 'anuncio': {...}} com 'total',
+            'ultimo_mes' e uma chave por status
+        """
+        hoje = timezone.localdate()
+        chave = f'{PREFIXO}:v{FeedCache.versao()}:{hoje.isoformat()}'
+        estatisticas = cache.get(chave)
+        if estatisticas is None:
+            estatisticas = EstatisticasComunidade.calcular(hoje)
+            cache.set(chave, estatisticas, EstatisticasComunidade.timeout())
+        return estatisticas
+
+    @staticmethod
+    def calcular(hoje=None):
+        hoje = hoje or timezone.localdate()
+        desde = hoje - timedelta(days=DIAS_RECENTES)
+        if EstatisticasComunidade.usar_contadores():
+            return EstatisticasComunidade._dos_contadores(desde)
+        return {
+            tipo: EstatisticasComunidade._do_modelo(modelo, campo_data, desde)
+            for tipo, (modelo, campo_data) in TIPOS.items()
+        }
+
+    @staticmethod
+    def _do_modelo(modelo, campo_data, desde):
+        """Todas as contagens de um modelo em uma consulta"""
+        inicio = datetime.combine(desde, time.min)
+        if settings.USE_TZ:
+            inicio = timezone.make_aware(inicio)
+        agregados = {
+            'total': Count('pk'),
+            'ultimo_mes': Count('pk', filter=Q(**{f'{campo_data}__gte': inicio})),
+            **{status: Count('pk', filter=Q(status=status)) for status in STATUS},
+        }
+        return modelo.objects.order_by().aggregate(**agregados)
+
+    @staticmethod
+    def _dos_contadores(desde):
+        """Todas as contagens a partir de ContadorComunidade em uma consulta"""
+        estatisticas = {tipo: _vazio() for tipo in TIPOS}
+        linhas = (
+            ContadorComunidade.objects.order_by()
+            .values('tipo', 'status')
+            .annotate(soma=Sum('quantidade'), recentes=Sum('quantidade', filter=Q(dia__gte=desde)))
+        )
+        for linha in linhas:
+            contagens = estatisticas[linha['tipo']]
+            contagens[linha['status']] = linha['soma'] or 0
+            contagens['total'] += linha['soma'] or 0
+            contagens['ultimo_mes'] += linha['recentes'] or 0
+        return estatisticas
+
+
+class ContadoresComunidade:
+    """
+    Manutenção incremental da tabela ContadorComunidade
+    """
+
+    @staticmethod
+    def dia_do_objeto(objeto):
+        data = getattr(objeto, TIPOS[TIPO_POR_MODELO[type(objeto)]][1])
+        return timezone.localdate(data) if settings.USE_TZ else data.date()
+
+    @staticmethod
+    def ajustar(tipo, status, dia, delta):
+        """Soma `delta` ao contador (tipo, status, dia), criando-o se preciso"""
+        filtro = {'tipo': tipo, 'status': status, 'dia': dia}
+        if ContadorComunidade.objects.filter(**filtro).update(quantidade=F('quantidade') + delta):
+            return
+        try:
+            with transaction.atomic():
+                ContadorComunidade.objects.create(quantidade=delta, **filtro)
+        except IntegrityError:
+            # Criado por outra requisição entre o UPDATE e o INSERT
+            ContadorComunidade.objects.filter(**filtro).update(quantidade=F('quantidade') + delta)
+
+    @staticmethod
+    def registrar_gravacao(objeto, created, status_anterior):
+        tipo = TIPO_POR_MODELO[type(objeto)]
+        dia = ContadoresComunidade.dia_do_objeto(objeto)
+        if created:
+            ContadoresComunidade.ajustar(tipo, objeto.status, dia, 1)
+        elif status_anterior is not None and status_anterior != objeto.status:
+            ContadoresComunidade.ajustar(tipo, status_anterior, dia, -1)
+            ContadoresComunidade.ajustar(tipo, objeto.status, dia, 1)
+
+    @staticmethod
+    def registrar_exclusao(objeto, status_anterior):
+        tipo = TIPO_POR_MODELO[type(objeto)]
+        ContadoresComunidade.ajustar(
+            tipo, status_anterior or objeto.status, ContadoresComunidade.dia_do_objeto(objeto), -1
+        )
+
+    @staticmethod
+    def recalcular():
+        """
+        Recria todos os contadores a partir do conteúdo atual
+
+        Returns:
+            int: Quantidade de contadores gravados
+        """
+        contadores = [
+            ContadorComunidade(tipo=tipo, status=status, dia=dia, quantidade=quantidade)
+            for tipo, (modelo, campo_data) in TIPOS.items()
+            for status, dia, quantidade in contagens_por_dia(modelo, campo_data)
+        ]
+        with transaction.atomic():
+            ContadorComunidade.objects.all().delete()
+            ContadorComunidade.objects.bulk_create(contadores, batch_size=1000)
+        FeedCache.invalidar()
+        logger.info(f"Contadores da comunidade recalculados: {len(contadores)} linhas")
+        return len(contadores)
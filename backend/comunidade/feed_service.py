@@ -0,0 +1,232 @@
+"""
+Feed público da comunidade (postagens e anúncios aprovados e visíveis).
+
+Cada tipo de conteúdo é um fluxo separado, paginado por cursor em
+(data, id) decrescente, sem OFFSET. As consultas carregam apenas as colunas
+exibidas (`.only()`).
+
+As primeiras páginas de cada fluxo ficam em um cache compartilhado entre
+visitantes. As chaves incluem um contador de versão global do feed;
+qualquer gravação ou exclusão de Postagem/AnuncioVeiculo (inclusive as ações
+de moderação) incrementa a versão (ver comunidade/signals.py).
+"""
+import base64
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from registro_entregadespesa.pagination import ParametroInvalido
+from .models import Postagem, AnuncioVeiculo
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'comunidade:feed'
+PAGE_SIZE_PADRAO = 20
+PAGE_SIZE_MAXIMO = 100
+
+
+def serializar_postagem(postagem):
+    return {
+        'id': postagem.id,
+        'autor': postagem.autor,
+        'titulo': postagem.titulo,
+        'conteudo': postagem.conteudo,
+        'data_criacao': postagem.data_criacao.isoformat(),
+        'curtidas': getattr(postagem, 'curtidas', 0),
+        'comentarios': getattr(postagem, 'comentarios', 0),
+    }
+
+
+def serializar_anuncio(anuncio):
+    return {
+        'id': anuncio.id,
+        'modelo': anuncio.modelo,
+        'ano': anuncio.ano,
+        'quilometragem': anuncio.quilometragem,
+        'preco': float(anuncio.preco),
+        'localizacao': anuncio.localizacao,
+        'link_externo': anuncio.link_externo,
+        'foto': anuncio.foto.url if anuncio.foto else None,
+        'data_publicacao': anuncio.data_publicacao.isoformat(),
+        'vendedor': getattr(anuncio, 'vendedor', 'Usuário'),
+    }
+
+
+class FluxoFeed:
+    """Um tipo de conteúdo do feed: modelo, campo de ordenação e colunas exibidas"""
+
+    def __init__(self, modelo, campo_data, campos, serializar):
+        self.modelo = modelo
+        self.campo_data = campo_data
+        self.campos = campos
+        self.serializar = serializar
+
+    def publicos(self):
+        return self.modelo.objects.filter(status='aprovado', is_visivel=True)
+
+    def queryset(self):
+        return self.publicos().only(*self.campos).order_by(f'-{self.campo_data}', '-id')
+
+
+FLUXOS = {
+    'postagens': FluxoFeed(
+        Postagem, 'data_criacao',
+        ('id', 'autor', 'titulo', 'conteudo', 'data_criacao'),
+        serializar_postagem
+    ),
+    'anuncios': FluxoFeed(
+        AnuncioVeiculo, 'data_publicacao',
+        ('id', 'modelo', 'ano', 'quilometragem', 'preco', 'localizacao',
+         'link_externo', 'foto', 'data_publicacao'),
+        serializar_anuncio
+    ),
+}
+
+
+def codificar_cursor(instante, item_id, pagina):
+    bruto = f'{instante.isoformat()}|{item_id}|{pagina}'.encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Returns:
+        tuple: (instante, id, número da página que o cursor abre)
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento).decode()
+        instante_texto, item_id, pagina = bruto.split('|')
+        instante = parse_datetime(instante_texto)
+        if instante is None:
+            raise ValueError(instante_texto)
+        return instante, int(item_id), int(pagina)
+    except (ValueError, UnicodeDecodeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+class FeedCache:
+    """
+    Cache compartilhado das primeiras páginas do feed com invalidação por versão
+    """
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'COMUNIDADE_FEED_CACHE_TIMEOUT', 120)
+
+    @staticmethod
+    def paginas_em_cache():
+        return getattr(settings, 'COMUNIDADE_FEED_PAGINAS_CACHE', 3)
+
+    @staticmethod
+    def versao():
+        chave = f'{PREFIXO}:versao'
+        versao = cache.get(chave)
+        if versao is None:
+            cache.add(chave, int(time.time() * 1000), None)
+            versao = cache.get(chave)
+        return versao
+
+    @staticmethod
+    def invalidar():
+        """Incrementa a versão do feed (todas as páginas em cache deixam de valer)"""
+        chave = f'{PREFIXO}:versao'
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.add(chave, int(time.time() * 1000), None)
+        logger.debug("Cache do feed da comunidade invalidado")
+
+    @staticmethod
+    def chave(tipo, page_size, cursor):
+        return f'{PREFIXO}:{tipo}:v{FeedCache.versao()}:{page_size}:{cursor or "inicio"}'
+
+
+class FeedComunidade:
+    """
+    Páginas do feed público
+    """
+
+    @staticmethod
+    def page_size(params):
+        padrao = getattr(settings, 'COMUNIDADE_FEED_PAGE_SIZE', PAGE_SIZE_PADRAO)
+        valor = params.get('page_size')
+        if not valor:
+            return padrao
+        try:
+            page_size = int(valor)
+        except ValueError:
+            raise ParametroInvalido('page_size deve ser um número inteiro')
+        if page_size < 1:
+            raise ParametroInvalido('page_size deve ser maior que zero')
+        return min(page_size, PAGE_SIZE_MAXIMO)
+
+    @staticmethod
+    def pagina(tipo, cursor=None, page_size=PAGE_SIZE_PADRAO):
+        """
+        Uma página do fluxo informado (das primeiras páginas vem do cache)
+
+        Args:
+            tipo: 'postagens' ou 'anuncios'
+            cursor: Cursor devolvido pela página anterior (None = primeira)
+            page_size: Itens por página
+
+        Returns:
+            dict: {'results', 'count', 'next_cursor', 'has_more'}
+
+        Raises:
+            ParametroInvalido: Se o tipo ou o cursor forem inválidos
+        """
+        fluxo = FLUXOS.get(tipo)
+        if fluxo is None:
+            raise ParametroInvalido(f"Tipo inválido: {tipo}. Use: {', '.join(FLUXOS)}")
+
+        numero = decodificar_cursor(cursor)[2] if cursor else 0
+        usar_cache = numero < FeedCache.paginas_em_cache()
+        if usar_cache:
+            chave = FeedCache.chave(tipo, page_size, cursor)
+            dados = cache.get(chave)
+            if dados is not None:
+                return dados
+
+        dados = FeedComunidade._consultar(fluxo, cursor, page_size)
+        if usar_cache:
+            cache.set(chave, dados, FeedCache.timeout())
+        return dados
+
+    @staticmethod
+    def _consultar(fluxo, cursor, page_size):
+        queryset = fluxo.queryset()
+        numero = 0
+        if cursor:
+            instante, item_id, numero = decodificar_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{fluxo.campo_data}__lt': instante})
+                | Q(**{fluxo.campo_data: instante, 'id__lt': item_id})
+            )
+
+        # Buscar um item a mais para saber se há próxima página
+        itens = list(queryset[:page_size + 1])
+        proximo_cursor = None
+        if len(itens) > page_size:
+            itens = itens[:page_size]
+            ultimo = itens[-1]
+            proximo_cursor = codificar_cursor(getattr(ultimo, fluxo.campo_data), ultimo.id, numero + 1)
+
+        results = [fluxo.serializar(item) for item in itens]
+        return {
+            'results': results,
+            'count': len(results),
+            'next_cursor': proximo_cursor,
+            'has_more': proximo_cursor is not None,
+        }
+
+    @staticmethod
+    def completo(tipo):
+        """Todos os itens públicos do fluxo (sem paginação nem cache)"""
+        fluxo = FLUXOS[tipo]
+        return [fluxo.serializar(item) for item in fluxo.queryset()]
@@ -0,0 +1,108 @@
+import itertools
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from comunidade.busca_service import BuscaComunidade
+from comunidade.models import Postagem
+
+# Palavras frequentes do assunto + cauda longa de termos raros (nomes de
+# ruas, bairros, marcas...), sorteadas com distribuição de Zipf como em texto real
+PALAVRAS_COMUNS = (
+    'entrega moto bicicleta carro rota bairro centro gorjeta cliente aplicativo pedido '
+    'restaurante mercado farmácia combustível pneu corrente óleo manutenção chuva trânsito '
+    'horário almoço jantar noite madrugada promoção ganho semana mês taxa distância '
+    'segurança capacete baú mochila suporte celular bateria carregador acidente seguro'
+).split()
+SILABAS = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru', 'sa', 'te', 'vi', 'xo', 'za']
+VOCABULARIO = PALAVRAS_COMUNS + [
+    ''.join(silabas) for silabas in itertools.product(SILABAS, repeat=3)
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a busca da moderação por icontains com a busca indexada. '
+        'Os dados gerados são descartados ao final (transação revertida).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quantidade',
+            type=int,
+            default=100000,
+            help='Postagens sintéticas geradas para a medição',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Execuções de cada consulta para o tempo médio',
+        )
+
+    def handle(self, *args, **options):
+        quantidade = options['quantidade']
+        repeticoes = options['repeticoes']
+        aleatorio = random.Random(42)
+        pesos = list(itertools.accumulate(1 / posicao for posicao in range(1, len(VOCABULARIO) + 1)))
+
+        def texto(palavras):
+            return ' '.join(aleatorio.choices(VOCABULARIO, cum_weights=pesos, k=palavras))
+
+        consultas = [
+            'moto',                                   # muito frequente
+            'manutenção pneu',                        # frequentes, com acento
+            'combus',                                 # prefixo
+            VOCABULARIO[200],                         # frequência média
+            f'{VOCABULARIO[800]} {VOCABULARIO[60]}',  # rara + média
+            VOCABULARIO[3000][:4],                    # prefixo raro
+        ]
+
+        with transaction.atomic():
+            self.stdout.write(f'⏳ Gerando {quantidade} postagens...')
+            inicio = time.perf_counter()
+            Postagem.objects.bulk_create(
+                (
+                    Postagem(
+                        autor=f'Entregador {aleatorio.randint(1, 5000)}',
+                        titulo=texto(5).capitalize(),
+                        conteudo=texto(40),
+                    )
+                    for _ in range(quantidade)
+                ),
+                batch_size=2000
+            )
+            BuscaComunidade.reindexar('postagem', lote=5000)
+            self.stdout.write(f'   dados e índice prontos em {time.perf_counter() - inicio:.1f}s\n')
+
+            for consulta in consultas:
+                icontains, (_, total_icontains) = self._medir(repeticoes, lambda: self._busca_icontains(consulta))
+                indexada, (_, total_indice) = self._medir(
+                    repeticoes, lambda: BuscaComunidade.buscar('postagem', consulta, inicio=0, fim=10)
+                )
+                self.stdout.write(
+                    f'  "{consulta}": icontains {icontains * 1000:.1f}ms ({total_icontains}) | '
+                    f'índice {indexada * 1000:.1f}ms ({total_indice})'
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _busca_icontains(consulta):
+        queryset = Postagem.objects.filter(
+            Q(titulo__icontains=consulta) | Q(conteudo__icontains=consulta) | Q(autor__icontains=consulta)
+        )
+        return list(queryset[:10]), queryset.count()
+
+    @staticmethod
+    def _medir(repeticoes, funcao):
+        """Tempo médio e o resultado da última execução"""
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+        return sum(tempos) / len(tempos), resultado
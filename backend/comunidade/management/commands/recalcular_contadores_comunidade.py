@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from comunidade.estatisticas_service import ContadoresComunidade
+
+
+class Command(BaseCommand):
+    help = 'Recria os contadores de postagens/anúncios por status usados nas estatísticas de moderação'
+
+    def handle(self, *args, **options):
+        linhas = ContadoresComunidade.recalcular()
+        self.stdout.write(self.style.SUCCESS(f'✅ {linhas} contadores gravados'))
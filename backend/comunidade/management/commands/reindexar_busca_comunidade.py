@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from comunidade.busca_service import BuscaComunidade, CAMPOS_BUSCA
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de postagens e anúncios da comunidade'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tipo',
+            choices=list(CAMPOS_BUSCA),
+            help='Reindexar apenas postagens ou anúncios (padrão: ambos)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Quantidade de termos gravados por INSERT',
+        )
+
+    def handle(self, *args, **options):
+        tipos = [options['tipo']] if options['tipo'] else list(CAMPOS_BUSCA)
+        for tipo in tipos:
+            objetos, termos = BuscaComunidade.reindexar(tipo, lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {tipo}: {objetos} objetos, {termos} termos indexados'))
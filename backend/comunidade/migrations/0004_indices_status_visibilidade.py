@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comunidade', '0003_alter_anuncioveiculo_options_alter_postagem_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='anuncioveiculo',
+            index=models.Index(fields=['status', 'is_visivel', '-data_publicacao'], name='anuncio_status_visivel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anuncioveiculo',
+            index=models.Index(condition=models.Q(('is_visivel', True), ('status', 'aprovado')), fields=['-data_publicacao'], name='anuncio_publicos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postagem',
+            index=models.Index(fields=['status', 'is_visivel', '-data_criacao'], name='postagem_status_visivel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postagem',
+            index=models.Index(condition=models.Q(('is_visivel', True), ('status', 'aprovado')), fields=['-data_criacao'], name='postagem_publicas_idx'),
+        ),
+    ]
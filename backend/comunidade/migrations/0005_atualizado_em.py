@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comunidade', '0004_indices_status_visibilidade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anuncioveiculo',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='postagem',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+def indexar_conteudo_existente(apps, schema_editor):
+    from comunidade.busca_service import termos_do_objeto
+
+    TermoBusca = apps.get_model('comunidade', 'TermoBusca')
+    modelos = {
+        'postagem': (apps.get_model('comunidade', 'Postagem'), {'titulo': 3, 'autor': 2, 'conteudo': 1}),
+        'anuncio': (apps.get_model('comunidade', 'AnuncioVeiculo'), {'modelo': 3, 'localizacao': 1}),
+    }
+    for tipo, (modelo, campos) in modelos.items():
+        pendentes = []
+        for objeto in modelo.objects.only('pk', *campos).iterator(chunk_size=1000):
+            pendentes.extend(
+                TermoBusca(tipo=tipo, objeto_id=objeto.pk, termo=termo, peso=peso)
+                for termo, peso in termos_do_objeto(objeto, campos).items()
+            )
+        TermoBusca.objects.bulk_create(pendentes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comunidade', '0005_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('postagem', 'Postagem'), ('anuncio', 'Anúncio')], max_length=10)),
+                ('objeto_id', models.BigIntegerField()),
+                ('termo', models.CharField(max_length=40)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tipo', 'termo'], name='termo_busca_termo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id', 'termo'), name='termo_busca_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_conteudo_existente, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:29
+
+from django.db import migrations, models
+
+
+def contar_conteudo_existente(apps, schema_editor):
+    from comunidade.estatisticas_service import contagens_por_dia
+
+    ContadorComunidade = apps.get_model('comunidade', 'ContadorComunidade')
+    modelos = {
+        'postagem': (apps.get_model('comunidade', 'Postagem'), 'data_criacao'),
+        'anuncio': (apps.get_model('comunidade', 'AnuncioVeiculo'), 'data_publicacao'),
+    }
+    ContadorComunidade.objects.bulk_create([
+        ContadorComunidade(tipo=tipo, status=status, dia=dia, quantidade=quantidade)
+        for tipo, (modelo, campo_data) in modelos.items()
+        for status, dia, quantidade in contagens_por_dia(modelo, campo_data)
+    ], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comunidade', '0006_termo_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorComunidade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('postagem', 'Postagem'), ('anuncio', 'Anúncio')], max_length=10)),
+                ('status', models.CharField(choices=[('aprovado', 'Aprovado'), ('pendente', 'Pendente'), ('rejeitado', 'Rejeitado'), ('removido', 'Removido')], max_length=20)),
+                ('dia', models.DateField()),
+                ('quantidade', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'status', 'dia'), name='contador_comunidade_unico')],
+            },
+        ),
+        migrations.RunPython(contar_conteudo_existente, migrations.RunPython.noop),
+    ]
@@ -15,6 +15,7 @@ class Postagem(models.Model):
     titulo = models.CharField(max_length=200)
     conteudo = models.TextField()
     data_criacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
     
     # Campos de moderação
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='aprovado')
@@ -25,6 +26,16 @@ class Postagem(models.Model):
 
     class Meta:
         ordering = ['-data_criacao']
+        indexes = [
+            # Moderação: filtro por status/visibilidade ordenado por data
+            models.Index(fields=['status', 'is_visivel', '-data_criacao'], name='postagem_status_visivel_idx'),
+            # Feed público (índice parcial; ignorado no MySQL, que usa o anterior)
+            models.Index(
+                fields=['-data_criacao'],
+                name='postagem_publicas_idx',
+                condition=models.Q(status='aprovado', is_visivel=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.get_status_display()}"
@@ -46,6 +57,7 @@ class AnuncioVeiculo(models.Model):
     link_externo = models.URLField()
     foto = models.ImageField(upload_to='anuncios_fotos/', null=True, blank=True)
     data_publicacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
     
     # Campos de moderação
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='aprovado')
@@ -56,6 +68,64 @@ class AnuncioVeiculo(models.Model):
 
     class Meta:
         ordering = ['-data_publicacao']
+        indexes = [
+            # Moderação: filtro por status/visibilidade ordenado por data
+            models.Index(fields=['status', 'is_visivel', '-data_publicacao'], name='anuncio_status_visivel_idx'),
+            # Feed público (índice parcial; ignorado no MySQL, que usa o anterior)
+            models.Index(
+                fields=['-data_publicacao'],
+                name='anuncio_publicos_idx',
+                condition=models.Q(status='aprovado', is_visivel=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.modelo} - {self.ano} - {self.get_status_display()}"
+
+
+class TermoBusca(models.Model):
+    """
+    Índice invertido da busca de conteúdo da comunidade: um termo normalizado
+    (minúsculo, sem acentos) por postagem/anúncio, com o peso da relevância
+    """
+    TIPO_CHOICES = [
+        ('postagem', 'Postagem'),
+        ('anuncio', 'Anúncio'),
+    ]
+
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    objeto_id = models.BigIntegerField()
+    termo = models.CharField(max_length=40)
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id', 'termo'], name='termo_busca_unico'),
+        ]
+        indexes = [
+            # Busca por prefixo: intervalo em (tipo, termo)
+            models.Index(fields=['tipo', 'termo'], name='termo_busca_termo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}:{self.objeto_id} - {self.termo}"
+
+
+class ContadorComunidade(models.Model):
+    """
+    Quantidade de postagens/anúncios por status e dia de criação, mantida
+    incrementalmente pelos sinais quando COMUNIDADE_ESTATISTICAS_CONTADORES
+    está ativo (ver comunidade/estatisticas_service.py)
+    """
+    tipo = models.CharField(max_length=10, choices=TermoBusca.TIPO_CHOICES)
+    status = models.CharField(max_length=20, choices=Postagem.STATUS_CHOICES)
+    dia = models.DateField()
+    quantidade = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'status', 'dia'], name='contador_comunidade_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.status} {self.dia}: {self.quantidade}"
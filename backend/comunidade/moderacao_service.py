@@ -0,0 +1,132 @@
+"""
+Fila de moderação com postagens e anúncios intercalados por data.
+
+Cada modelo é um fluxo ordenado por (data, id) decrescente, lido por keyset
+sobre os índices de status/data. A página é a intercalação (k-way merge) das
+cabeças dos fluxos; o cursor guarda a posição (data, id) do último item
+consumido de cada fluxo, então continua estável mesmo com inserções novas
+no topo da fila.
+"""
+import base64
+import heapq
+import logging
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from registro_entregadespesa.pagination import ParametroInvalido
+from .models import Postagem, AnuncioVeiculo
+
+logger = logging.getLogger(__name__)
+
+# Fluxo: (modelo, campo de data)
+FLUXOS_MODERACAO = {
+    'postagem': (Postagem, 'data_criacao'),
+    'anuncio': (AnuncioVeiculo, 'data_publicacao'),
+}
+
+
+def codificar_cursor(posicoes):
+    """
+    Args:
+        posicoes: {tipo: (instante, id) ou None}
+    """
+    partes = [
+        f'{tipo}:{instante.isoformat()}|{item_id}'
+        for tipo, posicao in posicoes.items() if posicao is not None
+        for instante, item_id in [posicao]
+    ]
+    return base64.urlsafe_b64encode(';'.join(partes).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Returns:
+        dict: {tipo: (instante, id)} dos fluxos já iniciados
+
+    Raises:
+        ParametroInvalido: Se o cursor for inválido
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento).decode()
+        posicoes = {}
+        for parte in filter(None, bruto.split(';')):
+            tipo, valor = parte.split(':', 1)
+            instante_texto, item_id = valor.rsplit('|', 1)
+            instante = parse_datetime(instante_texto)
+            if tipo not in FLUXOS_MODERACAO or instante is None:
+                raise ValueError(parte)
+            posicoes[tipo] = (instante, int(item_id))
+        return posicoes
+    except (ValueError, UnicodeDecodeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+class FilaModeracao:
+    """
+    Páginas da moderação com todos os tipos de conteúdo em ordem cronológica
+    """
+
+    @staticmethod
+    def _fluxo(tipo, status, posicao, limite):
+        modelo, campo_data = FLUXOS_MODERACAO[tipo]
+        queryset = modelo.objects.order_by(f'-{campo_data}', '-id')
+        if status:
+            queryset = queryset.filter(status=status)
+        if posicao is not None:
+            instante, item_id = posicao
+            queryset = queryset.filter(
+                Q(**{f'{campo_data}__lt': instante}) | Q(**{campo_data: instante, 'id__lt': item_id})
+            )
+        # Chave decrescente para o heapq.merge (que intercala em ordem crescente)
+        return [
+            ((-getattr(item, campo_data).timestamp(), tipo, -item.id), tipo, item)
+            for item in queryset[:limite]
+        ]
+
+    @staticmethod
+    def pagina(status=None, cursor=None, inicio=0, limite=10):
+        """
+        Uma página da fila intercalada
+
+        Args:
+            status: Filtro de status de moderação (None = todos)
+            cursor: Cursor da página anterior (tem precedência sobre `inicio`)
+            inicio: Deslocamento para paginação por número de página
+            limite: Itens por página
+
+        Returns:
+            dict: {'itens': [(tipo, objeto), ...], 'next_cursor', 'has_more'}
+
+        Raises:
+            ParametroInvalido: Se o cursor for inválido
+        """
+        posicoes = decodificar_cursor(cursor) if cursor else {}
+        if cursor:
+            inicio = 0
+
+        # Cada fluxo contribui com no máximo inicio + limite itens, +1 para saber se há mais
+        necessarios = inicio + limite + 1
+        fluxos = [
+            FilaModeracao._fluxo(tipo, status, posicoes.get(tipo), necessarios)
+            for tipo in FLUXOS_MODERACAO
+        ]
+        intercalados = list(islice(heapq.merge(*fluxos, key=lambda linha: linha[0]), necessarios))
+
+        consumidos = intercalados[:inicio + limite]
+        pagina = consumidos[inicio:]
+        has_more = len(intercalados) > inicio + limite
+
+        proximo_cursor = None
+        if has_more:
+            for _, tipo, item in consumidos:
+                posicoes[tipo] = (getattr(item, FLUXOS_MODERACAO[tipo][1]), item.id)
+            proximo_cursor = codificar_cursor(posicoes)
+
+        return {
+            'itens': [(tipo, item) for _, tipo, item in pagina],
+            'next_cursor': proximo_cursor,
+            'has_more': has_more,
+        }
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .busca_service import BuscaComunidade
+from .estatisticas_service import ContadoresComunidade, EstatisticasComunidade
+from .feed_service import FeedCache
+from .models import Postagem, AnuncioVeiculo
+
+
+@receiver(post_save, sender=Postagem)
+@receiver(post_save, sender=AnuncioVeiculo)
+@receiver(post_delete, sender=Postagem)
+@receiver(post_delete, sender=AnuncioVeiculo)
+def invalidar_cache_feed(sender, instance, **kwargs):
+    """Invalida as páginas do feed em cache (publicação, moderação ou exclusão)"""
+    FeedCache.invalidar()
+
+
+@receiver(post_save, sender=Postagem)
+@receiver(post_save, sender=AnuncioVeiculo)
+def indexar_busca(sender, instance, **kwargs):
+    """Mantém o índice de busca da moderação"""
+    BuscaComunidade.indexar(instance)
+
+
+@receiver(post_delete, sender=Postagem)
+@receiver(post_delete, sender=AnuncioVeiculo)
+def remover_da_busca(sender, instance, **kwargs):
+    BuscaComunidade.remover(instance)
+
+
+@receiver(post_init, sender=Postagem)
+@receiver(post_init, sender=AnuncioVeiculo)
+def guardar_status_contado(sender, instance, **kwargs):
+    """Status como está no banco, para mover o contador quando mudar (sem consulta extra)"""
+    instance._status_contado = vars(instance).get('status') if instance.pk else None
+
+
+@receiver(pre_save, sender=Postagem)
+@receiver(pre_save, sender=AnuncioVeiculo)
+def carregar_status_contado(sender, instance, **kwargs):
+    # Objeto carregado sem a coluna status (.only()/.defer())
+    if EstatisticasComunidade.usar_contadores() and instance.pk and instance._status_contado is None:
+        instance._status_contado = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Postagem)
+@receiver(post_save, sender=AnuncioVeiculo)
+def atualizar_contadores(sender, instance, created, **kwargs):
+    """Mantém ContadorComunidade quando os contadores estão ativos"""
+    if EstatisticasComunidade.usar_contadores():
+        ContadoresComunidade.registrar_gravacao(instance, created, instance._status_contado)
+    instance._status_contado = instance.status
+
+
+@receiver(post_delete, sender=Postagem)
+@receiver(post_delete, sender=AnuncioVeiculo)
+def descontar_exclusao(sender, instance, **kwargs):
+    if EstatisticasComunidade.usar_contadores():
+        ContadoresComunidade.registrar_exclusao(instance, instance._status_contado)
@@ -0,0 +1,197 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from usuarios.models import Entregador
+from .busca_service import BuscaComunidade, termos_da_consulta
+from .estatisticas_service import ContadoresComunidade, EstatisticasComunidade
+from .models import Postagem, AnuncioVeiculo
+
+
+class BuscaComunidadeTests(TestCase):
+    """Busca da moderação pelo índice de termos"""
+
+    def setUp(self):
+        self.postagem = Postagem.objects.create(
+            autor='@joao', titulo='Carro de aluguel', conteudo='Fiat Mobi disponível por semana'
+        )
+        Postagem.objects.create(autor='@maria', titulo='Dicas de rota', conteudo='Evite o centro às 18h')
+
+    def test_consulta_ignora_stopwords(self):
+        self.assertEqual(termos_da_consulta('Carro de aluguel'), ['carro', 'aluguel'])
+
+    def test_titulo_exato_com_stopword_encontra_a_postagem(self):
+        objetos, total = BuscaComunidade.buscar('postagem', 'carro de aluguel')
+
+        self.assertEqual(total, 1)
+        self.assertEqual(objetos, [self.postagem])
+
+    def test_todos_os_termos_precisam_casar(self):
+        self.assertEqual(BuscaComunidade.buscar('postagem', 'carro rota'), ([], 0))
+
+    def test_prefixo_e_acentos(self):
+        objetos, total = BuscaComunidade.buscar('postagem', 'DISPONIVEL alug')
+
+        self.assertEqual(total, 1)
+        self.assertEqual(objetos, [self.postagem])
+
+    def test_consulta_sem_termos_pesquisaveis(self):
+        self.assertIsNone(BuscaComunidade.buscar('postagem', 'de'))
+        self.assertIsNone(BuscaComunidade.buscar('postagem', 'a'))
+
+
+@override_settings(COMUNIDADE_FEED_PAGE_SIZE=5)
+class FeedComunidadeTests(TestCase):
+    """Feed público paginado por cursor"""
+
+    def setUp(self):
+        cache.clear()
+        for indice in range(12):
+            Postagem.objects.create(autor='@autor', titulo=f'Postagem {indice}', conteudo='Texto', status='aprovado')
+        Postagem.objects.create(autor='@autor', titulo='Pendente', conteudo='Texto', status='pendente')
+
+    def test_primeira_pagina_e_cursores(self):
+        dados = self.client.get('/comunidade/api/postagens/').json()
+
+        self.assertEqual(len(dados['postagens']), 5)
+        self.assertIsNotNone(dados['postagens_next_cursor'])
+
+    def test_seguir_cursor_percorre_todo_o_feed_sem_repetir(self):
+        dados = self.client.get('/comunidade/api/postagens/').json()
+        ids = [item['id'] for item in dados['postagens']]
+        cursor = dados['postagens_next_cursor']
+        while cursor:
+            pagina = self.client.get('/comunidade/api/feed/postagens/', {'cursor': cursor}).json()
+            ids.extend(item['id'] for item in pagina['results'])
+            cursor = pagina['next_cursor']
+
+        aprovadas = list(Postagem.objects.filter(status='aprovado').values_list('pk', flat=True))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), sorted(aprovadas))
+
+    def test_completo_devolve_tudo(self):
+        dados = self.client.get('/comunidade/api/postagens/', {'completo': 'true'}).json()
+
+        self.assertEqual(len(dados['postagens']), 12)
+
+    def test_cursor_invalido(self):
+        resposta = self.client.get('/comunidade/api/feed/postagens/', {'cursor': '%%%'})
+
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_nova_postagem_invalida_o_cache_do_feed(self):
+        self.client.get('/comunidade/api/postagens/')
+        nova = Postagem.objects.create(autor='@autor', titulo='Nova', conteudo='Texto', status='aprovado')
+
+        dados = self.client.get('/comunidade/api/postagens/').json()
+        self.assertIn(nova.pk, [item['id'] for item in dados['postagens']])
+
+
+class ModeracaoBuscaTests(TestCase):
+    """Busca da moderação com tipo=all paginada"""
+
+    url = '/comunidade/admin/api/'
+
+    def setUp(self):
+        self.admin = Entregador.objects.create_user(
+            email='admin@teste.com', password='senha-teste', nome='Admin', telefone='11999999999', is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.postagens = [
+            Postagem.objects.create(autor='@autor', titulo=f'Moto usada {indice}', conteudo='Texto')
+            for indice in range(7)
+        ]
+        self.anuncios = [
+            AnuncioVeiculo.objects.create(
+                modelo=f'Moto CG {indice}', ano=2020, quilometragem=1000, preco=Decimal('9000'),
+                localizacao='São Paulo', link_externo='https://exemplo.com'
+            )
+            for indice in range(3)
+        ]
+
+    def _pagina(self, page):
+        resposta = self.client.get(self.url, {'tipo': 'all', 'search': 'moto', 'page': page, 'per_page': 4})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['data']
+
+    def test_paginas_percorrem_todos_os_resultados_de_cada_tipo(self):
+        postagens, anuncios = [], []
+        primeira = self._pagina(1)
+        self.assertEqual(primeira['pagination']['total'], 10)
+        self.assertEqual(primeira['pagination']['total_pages'], 4)
+
+        for page in range(1, primeira['pagination']['total_pages'] + 1):
+            dados = self._pagina(page)
+            postagens.extend(item['id'] for item in dados['postagens'])
+            anuncios.extend(item['id'] for item in dados['anuncios'])
+            self.assertEqual(dados['pagination']['has_more'], page < 4)
+
+        self.assertEqual(sorted(postagens), sorted(postagem.pk for postagem in self.postagens))
+        self.assertEqual(sorted(anuncios), sorted(anuncio.pk for anuncio in self.anuncios))
+
+
+@override_settings(COMUNIDADE_ESTATISTICAS_CONTADORES=True)
+class ContadoresComunidadeTests(TestCase):
+    """Contadores de moderação mantidos pelos sinais"""
+
+    def setUp(self):
+        cache.clear()
+        self.postagem = Postagem.objects.create(
+            autor='@autor', titulo='Primeira', conteudo='Texto', status='pendente'
+        )
+        Postagem.objects.create(autor='@autor', titulo='Segunda', conteudo='Texto')
+        self.anuncio = AnuncioVeiculo.objects.create(
+            modelo='Moto CG', ano=2020, quilometragem=1000, preco=Decimal('9000'),
+            localizacao='São Paulo', link_externo='https://exemplo.com'
+        )
+
+    def _conferir(self):
+        """Contadores iguais aos agregados direto nas tabelas"""
+        with self.settings(COMUNIDADE_ESTATISTICAS_CONTADORES=False):
+            esperado = EstatisticasComunidade.calcular()
+        self.assertEqual(EstatisticasComunidade.calcular(), esperado)
+        return esperado
+
+    def test_criacao_moderacao_e_exclusao(self):
+        self.assertEqual(self._conferir()['postagem']['pendente'], 1)
+
+        self.postagem.status = 'aprovado'
+        self.postagem.save()
+        self.anuncio.status = 'rejeitado'
+        self.anuncio.save()
+        estatisticas = self._conferir()
+        self.assertEqual(estatisticas['postagem']['aprovado'], 2)
+        self.assertEqual(estatisticas['anuncio']['rejeitado'], 1)
+
+        # Salvar de novo sem mudar o status não conta duas vezes
+        self.postagem.save()
+        self._conferir()
+
+        self.postagem.delete()
+        self.assertEqual(self._conferir()['postagem']['total'], 1)
+
+    def test_objeto_carregado_sem_status(self):
+        postagem = Postagem.objects.only('titulo').get(pk=self.postagem.pk)
+        postagem.status = 'rejeitado'
+        postagem.save()
+
+        self.assertEqual(self._conferir()['postagem']['rejeitado'], 1)
+
+    def test_recalcular_corrige_contadores(self):
+        Postagem.objects.filter(pk=self.postagem.pk).update(status='aprovado')
+
+        ContadoresComunidade.recalcular()
+
+        self.assertEqual(self._conferir()['postagem']['aprovado'], 2)
+
+    def test_cache_acompanha_gravacoes(self):
+        self.assertEqual(EstatisticasComunidade.obter()['postagem']['total'], 2)
+        with self.assertNumQueries(0):
+            EstatisticasComunidade.obter()
+
+        Postagem.objects.create(autor='@autor', titulo='Terceira', conteudo='Texto')
+
+        self.assertEqual(EstatisticasComunidade.obter()['postagem']['total'], 3)
@@ -15,6 +15,7 @@ urlpatterns = [
     # URLs de API específicas
     path('api/postagens/', views.comunidade_api, name='comunidade_postagens'),
     path('api/anuncios/', views.comunidade_api, name='comunidade_anuncios'),
+    path('api/feed/<str:tipo>/', views.feed_api, name='comunidade_feed'),
     
     # URLs de template removidas - usando apenas API
     
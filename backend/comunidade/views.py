@@ -8,18 +8,32 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from registro_entregadespesa.pagination import ParametroInvalido, lista_completa_solicitada
+from sistema.condicional import Validador, get_condicional
+from .feed_service import FeedCache, FeedComunidade
 from .models import Postagem, AnuncioVeiculo
 
 logger = logging.getLogger(__name__)
 
 
+def _validador_comunidade(request):
+    """
+    Validador do feed público (GET condicional)
+
+    Usa a versão do cache do feed, que muda a cada gravação/exclusão de
+    conteúdo, então a verificação não consulta o banco
+    """
+    return Validador([], escopo=('comunidade', FeedCache.versao(), sorted(request.GET.lists())))
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
+@get_condicional(_validador_comunidade)
 def comunidade_api(request):
     """API JSON para a comunidade - postagens e anúncios"""
     try:
         if request.method == "GET":
-            return _get_comunidade_data()
+            return _get_comunidade_data(request.GET)
         
         elif request.method == "POST":
             return _create_comunidade_item(request)
@@ -32,54 +46,54 @@ def comunidade_api(request):
         }, status=500)
 
 
-def _get_comunidade_data():
-    """Retorna postagens e anúncios aprovados"""
-    postagens = Postagem.objects.filter(
-        status='aprovado', 
-        is_visivel=True
-    ).order_by('-data_criacao')
-    
-    anuncios = AnuncioVeiculo.objects.filter(
-        status='aprovado', 
-        is_visivel=True
-    ).order_by('-data_publicacao')
-    
-    postagens_data = [
-        {
-            'id': p.id,
-            'autor': p.autor,
-            'titulo': p.titulo,
-            'conteudo': p.conteudo,
-            'data_criacao': p.data_criacao.isoformat(),
-            'curtidas': getattr(p, 'curtidas', 0),
-            'comentarios': getattr(p, 'comentarios', 0),
-        }
-        for p in postagens
-    ]
-    
-    anuncios_data = [
-        {
-            'id': a.id,
-            'modelo': a.modelo,
-            'ano': a.ano,
-            'quilometragem': a.quilometragem,
-            'preco': float(a.preco),
-            'localizacao': a.localizacao,
-            'link_externo': a.link_externo,
-            'foto': a.foto.url if a.foto else None,
-            'data_publicacao': a.data_publicacao.isoformat(),
-            'vendedor': getattr(a, 'vendedor', 'Usuário'),
-        }
-        for a in anuncios
-    ]
-    
+def _get_comunidade_data(params):
+    """
+    Retorna postagens e anúncios aprovados
+
+    Por padrão devolve a primeira página de cada fluxo (com os cursores para
+    continuar em /comunidade/api/feed/<tipo>/); ?completo=true devolve tudo.
+    """
+    if lista_completa_solicitada(params):
+        return JsonResponse({
+            'success': True,
+            'postagens': FeedComunidade.completo('postagens'),
+            'anuncios': FeedComunidade.completo('anuncios'),
+        })
+
+    try:
+        page_size = FeedComunidade.page_size(params)
+    except ParametroInvalido as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    postagens = FeedComunidade.pagina('postagens', page_size=page_size)
+    anuncios = FeedComunidade.pagina('anuncios', page_size=page_size)
     return JsonResponse({
         'success': True,
-        'postagens': postagens_data,
-        'anuncios': anuncios_data,
+        'postagens': postagens['results'],
+        'anuncios': anuncios['results'],
+        'postagens_next_cursor': postagens['next_cursor'],
+        'anuncios_next_cursor': anuncios['next_cursor'],
     })
 
 
+@require_http_methods(["GET"])
+def feed_api(request, tipo):
+    """Feed público paginado por cursor de um tipo de conteúdo (postagens ou anuncios)"""
+    try:
+        page_size = FeedComunidade.page_size(request.GET)
+        pagina = FeedComunidade.pagina(tipo, request.GET.get('cursor') or None, page_size)
+    except ParametroInvalido as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Erro no feed da comunidade: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'message': 'Erro interno do servidor'
+        }, status=500)
+
+    return JsonResponse({'success': True, 'tipo': tipo, **pagina})
+
+
 def _create_comunidade_item(request):
     """Cria nova postagem ou anúncio"""
     # Tentar processar como JSON
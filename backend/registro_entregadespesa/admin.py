@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import RegistroEntregaDespesa, RegistroTrabalho, Despesa, CategoriaDespesa
+from .models import RegistroEntregaDespesa, RegistroTrabalho, Despesa, CategoriaDespesa, ResumoDiario
 
 @admin.register(RegistroEntregaDespesa)
 class RegistroEntregaDespesaAdmin(admin.ModelAdmin):
@@ -30,3 +30,11 @@ class DespesaAdmin(admin.ModelAdmin):
     search_fields = ['descricao', 'entregador__nome']
     date_hierarchy = 'data'
     readonly_fields = ['data_criacao']
+
+@admin.register(ResumoDiario)
+class ResumoDiarioAdmin(admin.ModelAdmin):
+    list_display = ['data', 'entregador', 'registros_trabalho', 'quantidade_entregues', 'ganho', 'despesa_total']
+    list_filter = ['data', 'entregador']
+    search_fields = ['entregador__nome']
+    date_hierarchy = 'data'
+    readonly_fields = ['atualizado_em']
@@ -0,0 +1,187 @@
+"""
+Motor de agregação do dashboard.
+
+Todas as séries (diária, semanal e mensal) e os totais do período são montados
+a partir de uma única leitura da tabela de resumos diários (ResumoDiario), em
+vez de um aggregate() por dia/semana/mês sobre os registros brutos.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .models import RegistroTrabalho, ResumoDiario
+
+DIAS_SEMANA = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
+MESES_NOMES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+DIAS_GRAFICO_DIARIO = 7
+SEMANAS_GRAFICO = 4
+MESES_GRAFICO = 6
+
+
+def _inicio_mes_anterior(dia, meses):
+    """Primeiro dia do mês `meses` meses antes do mês de `dia`"""
+    indice = dia.year * 12 + (dia.month - 1) - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _fim_mes(inicio_mes):
+    """Último dia do mês que começa em `inicio_mes`"""
+    return _inicio_mes_anterior(inicio_mes, -1) - timedelta(days=1)
+
+
+class DashboardAggregator:
+    """
+    Agrega os dados do dashboard de um entregador a partir dos resumos diários.
+
+    Os totais diários são carregados uma única vez para uma janela que cobre o
+    período selecionado e todos os gráficos; o restante é somado em memória
+    sobre no máximo algumas centenas de linhas (uma por dia).
+    """
+
+    def __init__(self, entregador, data_inicio, data_fim, hoje):
+        self.entregador = entregador
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+        self.hoje = hoje
+
+        inicio_graficos = min(
+            hoje - timedelta(days=DIAS_GRAFICO_DIARIO - 1),
+            hoje - timedelta(days=SEMANAS_GRAFICO * 7),
+            _inicio_mes_anterior(hoje, MESES_GRAFICO - 1),
+        )
+        self.janela_inicio = min(data_inicio, inicio_graficos, data_fim)
+        self.janela_fim = max(data_fim, hoje)
+
+        self._trabalho_por_dia = None
+        self._despesas_por_dia = None
+
+    # ------------------------------------------------------------------
+    # Carga dos totais diários
+    # ------------------------------------------------------------------
+
+    def _carregar(self):
+        if self._trabalho_por_dia is not None:
+            return
+
+        resumos = ResumoDiario.objects.filter(
+            entregador=self.entregador,
+            data__gte=self.janela_inicio,
+            data__lte=self.janela_fim,
+        ).values(
+            'data', 'registros_trabalho', 'quantidade_entregues',
+            'quantidade_nao_entregues', 'ganho', 'despesa_total'
+        ).order_by()
+
+        self._trabalho_por_dia = {}
+        self._despesas_por_dia = {}
+        for resumo in resumos:
+            if resumo['registros_trabalho']:
+                self._trabalho_por_dia[resumo['data']] = {
+                    'entregas': resumo['quantidade_entregues'],
+                    'nao_entregas': resumo['quantidade_nao_entregues'],
+                    'ganho': resumo['ganho'],
+                    'registros': resumo['registros_trabalho'],
+                }
+            self._despesas_por_dia[resumo['data']] = resumo['despesa_total']
+
+    def _no_periodo(self, dia):
+        return self.data_inicio <= dia <= self.data_fim
+
+    def _somar(self, inicio, fim, apenas_periodo=True):
+        """Soma os totais diários no intervalo fechado [inicio, fim]"""
+        self._carregar()
+        totais = {
+            'entregas': 0,
+            'nao_entregas': 0,
+            'ganho': Decimal('0'),
+            'registros': 0,
+            'despesa': Decimal('0'),
+        }
+        for dia, linha in self._trabalho_por_dia.items():
+            if inicio <= dia <= fim and (not apenas_periodo or self._no_periodo(dia)):
+                totais['entregas'] += linha['entregas'] or 0
+                totais['nao_entregas'] += linha['nao_entregas'] or 0
+                totais['ganho'] += linha['ganho'] or 0
+                totais['registros'] += linha['registros']
+        for dia, total in self._despesas_por_dia.items():
+            if inicio <= dia <= fim and (not apenas_periodo or self._no_periodo(dia)):
+                totais['despesa'] += total or 0
+        return totais
+
+    # ------------------------------------------------------------------
+    # Resumos e séries
+    # ------------------------------------------------------------------
+
+    def resumo_periodo(self):
+        """Totais do período selecionado"""
+        return self._somar(self.data_inicio, self.data_fim)
+
+    def resumo_dia(self, dia):
+        """Totais de um único dia, independente do período selecionado"""
+        return self._somar(dia, dia, apenas_periodo=False)
+
+    def entregas_por_dia(self):
+        """Entregas e ganhos por dia nos últimos 7 dias"""
+        serie = []
+        for i in range(DIAS_GRAFICO_DIARIO):
+            data_dia = self.hoje - timedelta(days=DIAS_GRAFICO_DIARIO - 1 - i)
+            totais = self._somar(data_dia, data_dia)
+            serie.append({
+                'dia': DIAS_SEMANA[data_dia.weekday()],
+                'entregas': totais['entregas'],
+                'ganho': float(totais['ganho'])
+            })
+        return serie
+
+    def ganhos_por_semana(self):
+        """Ganhos e despesas nas últimas 4 semanas (janelas móveis de 7 dias)"""
+        serie = []
+        for i in range(SEMANAS_GRAFICO):
+            semana_inicio = self.hoje - timedelta(days=(i + 1) * 7)
+            # Janela [inicio, fim): o último dia pertence à semana seguinte
+            semana_fim = self.hoje - timedelta(days=i * 7 + 1)
+            totais = self._somar(semana_inicio, semana_fim)
+            serie.append({
+                'semana': f'Sem {SEMANAS_GRAFICO - i}',
+                'ganho': float(totais['ganho']),
+                'despesa': float(totais['despesa'])
+            })
+        return serie
+
+    def performance_mensal(self):
+        """Entregas e ganhos por mês calendário nos últimos 6 meses"""
+        serie = []
+        for i in range(MESES_GRAFICO):
+            mes_inicio = _inicio_mes_anterior(self.hoje, i)
+            totais = self._somar(mes_inicio, _fim_mes(mes_inicio))
+            serie.append({
+                'mes': MESES_NOMES[mes_inicio.month - 1],
+                'entregas': totais['entregas'],
+                'ganho': float(totais['ganho'])
+            })
+        return serie
+
+    def ultimos_registros(self, limite=5):
+        """Últimos registros do período com a despesa total do mesmo dia"""
+        self._carregar()
+        registros = (
+            RegistroTrabalho.objects.filter(
+                entregador=self.entregador,
+                data__gte=self.data_inicio,
+                data__lte=self.data_fim,
+            )
+            .order_by('-data', '-hora_inicio')
+            .values('data', 'tipo_pagamento', 'valor')[:limite]
+        )
+
+        ultimos = []
+        for registro in registros:
+            despesas_dia = self._despesas_por_dia.get(registro['data']) or 0
+            ultimos.append({
+                'data': registro['data'].strftime('%d/%m/%Y'),
+                'tipo_rendimento': 'unitario' if registro['tipo_pagamento'] == 'por_entrega' else 'diaria',
+                'ganho': float(registro['valor']),
+                'despesa': float(despesas_dia),
+                'lucro': float(registro['valor']) - float(despesas_dia)
+            })
+        return ultimos
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RegistroEntregadespesaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'registro_entregadespesa'
+
+    def ready(self):
+        import registro_entregadespesa.signals
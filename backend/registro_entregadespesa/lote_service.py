@@ -0,0 +1,178 @@
+"""
+Criação e atualização em lote de registros de trabalho e despesas.
+
+Todos os itens são validados antes de qualquer escrita; os válidos são gravados
+com um único bulk_create/bulk_update dentro de uma transação e os inválidos
+voltam com o erro correspondente. Como as operações em lote não disparam
+signals, os resumos diários e o cache de relatórios são atualizados aqui.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from relatorios_dashboard.cache_service import ReportCache
+from .models import RegistroTrabalho, Despesa
+from .rollup_service import recalcular_resumos_dias
+from .validacao import (
+    DadosInvalidos,
+    carregar_categorias,
+    dados_despesa,
+    dados_registro_trabalho,
+    validar_despesa,
+    validar_registro_trabalho,
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_BANCO = 200
+
+
+class LoteService:
+    """
+    Serviço de gravação em lote para RegistroTrabalho e Despesa
+    """
+
+    @staticmethod
+    def limite():
+        return getattr(settings, 'REGISTROS_LOTE_MAXIMO', 500)
+
+    @staticmethod
+    def _validar(modelo, dados, entregador, categorias):
+        if not isinstance(dados, dict):
+            raise DadosInvalidos('Item deve ser um objeto')
+        if modelo is RegistroTrabalho:
+            return validar_registro_trabalho(dados)
+        return validar_despesa(dados, entregador, categorias)
+
+    @staticmethod
+    def _id_do_item(dados):
+        try:
+            return int(dados.get('id'))
+        except (AttributeError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _client_id(dados):
+        return dados.get('client_id') if isinstance(dados, dict) else None
+
+    @staticmethod
+    def _apos_escrita(entregador, dias):
+        """Substitui os signals que bulk_create/bulk_update não disparam"""
+        recalcular_resumos_dias(entregador.id, dias)
+        ReportCache.invalidar(entregador.id)
+
+    @staticmethod
+    def criar(entregador, modelo, itens):
+        """
+        Valida e cria os itens com um único bulk_create
+
+        Returns:
+            list: Um resultado por item, na ordem recebida, com o `client_id`
+            enviado no item. O `id` só é preenchido quando o banco devolve as
+            chaves do INSERT em lote (PostgreSQL, SQLite, MariaDB); no MySQL
+            vem como None e o cliente correlaciona pelo `client_id` (os ids
+            reais chegam na próxima sincronização).
+        """
+        categorias = carregar_categorias(entregador) if modelo is Despesa else None
+        resultados = [None] * len(itens)
+        novos = []
+        posicoes = []
+
+        for indice, dados in enumerate(itens):
+            try:
+                campos = LoteService._validar(modelo, dados, entregador, categorias)
+            except DadosInvalidos as e:
+                resultados[indice] = {
+                    'indice': indice,
+                    'client_id': LoteService._client_id(dados),
+                    'success': False,
+                    'error': str(e)
+                }
+                continue
+            novos.append(modelo(entregador=entregador, **campos))
+            posicoes.append(indice)
+
+        if novos:
+            with transaction.atomic():
+                modelo.objects.bulk_create(novos, batch_size=TAMANHO_LOTE_BANCO)
+                LoteService._apos_escrita(entregador, {objeto.data for objeto in novos})
+
+        retorna_ids = connection.features.can_return_rows_from_bulk_insert
+        for indice, objeto in zip(posicoes, novos):
+            resultados[indice] = {
+                'indice': indice,
+                'client_id': LoteService._client_id(itens[indice]),
+                'success': True,
+                'id': objeto.pk if retorna_ids else None
+            }
+
+        logger.info(f"Lote de {modelo.__name__}: {len(novos)}/{len(itens)} criados para usuário {entregador.id}")
+        return resultados
+
+    @staticmethod
+    def atualizar(entregador, modelo, itens):
+        """
+        Atualiza os itens (cada um com `id` e os campos a alterar) com um único
+        bulk_update. Campos ausentes mantêm o valor atual.
+
+        Returns:
+            list: Um resultado por item, na ordem recebida
+        """
+        ids = {LoteService._id_do_item(dados) for dados in itens} - {None}
+        queryset = modelo.objects.filter(entregador=entregador)
+        if modelo is Despesa:
+            queryset = queryset.select_related('categoria_personalizada')
+        existentes = queryset.in_bulk(ids)
+
+        categorias = carregar_categorias(entregador) if modelo is Despesa else None
+        extrair_dados = dados_registro_trabalho if modelo is RegistroTrabalho else dados_despesa
+        agora = timezone.now()
+
+        resultados = []
+        alterados = {}
+        campos_alterados = {'atualizado_em'}
+        dias = set()
+
+        for indice, dados in enumerate(itens):
+            try:
+                if not isinstance(dados, dict):
+                    raise DadosInvalidos('Item deve ser um objeto')
+                registro = existentes.get(LoteService._id_do_item(dados))
+                if registro is None:
+                    raise DadosInvalidos('Registro não encontrado')
+                if registro.pk in alterados:
+                    raise DadosInvalidos('Registro repetido no lote')
+
+                # Campos ausentes vêm do registro atual (inclusive a categoria
+                # personalizada, mantida mesmo se já estiver desativada)
+                campos = LoteService._validar(
+                    modelo, {**extrair_dados(registro), **dados}, entregador, categorias
+                )
+            except DadosInvalidos as e:
+                resultados.append({'indice': indice, 'success': False, 'error': str(e)})
+                continue
+
+            # Dia antigo e novo: ambos precisam do resumo recalculado
+            dias.add(registro.data)
+            for campo, valor in campos.items():
+                setattr(registro, campo, valor)
+            # bulk_update não aplica auto_now
+            registro.atualizado_em = agora
+            campos_alterados.update(campos)
+            dias.add(registro.data)
+            alterados[registro.pk] = registro
+            resultados.append({'indice': indice, 'success': True, 'id': registro.pk})
+
+        if alterados:
+            with transaction.atomic():
+                modelo.objects.bulk_update(
+                    list(alterados.values()),
+                    sorted(campos_alterados),
+                    batch_size=TAMANHO_LOTE_BANCO
+                )
+                LoteService._apos_escrita(entregador, dias)
+
+        logger.info(f"Lote de {modelo.__name__}: {len(alterados)}/{len(itens)} atualizados para usuário {entregador.id}")
+        return resultados
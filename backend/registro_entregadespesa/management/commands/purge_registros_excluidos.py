@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from registro_entregadespesa.models import RegistroExcluido
+from registro_entregadespesa.sync_service import SyncService
+
+
+class Command(BaseCommand):
+    help = 'Remove os tombstones de exclusão mais antigos que a retenção da sincronização'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra quantos registros seriam removidos',
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - SyncService.retencao_exclusoes()
+        antigos = RegistroExcluido.objects.filter(excluido_em__lt=limite)
+
+        if options['dry_run']:
+            self.stdout.write(f'{antigos.count()} tombstones seriam removidos (anteriores a {limite:%d/%m/%Y})')
+            return
+
+        total, _ = antigos.delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} tombstones removidos'))
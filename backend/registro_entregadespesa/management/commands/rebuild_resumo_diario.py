@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from registro_entregadespesa.rollup_service import reconstruir_resumos_diarios
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a tabela de resumos diários a partir dos registros de trabalho e despesas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entregador',
+            type=int,
+            help='ID do entregador (padrão: todos)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tamanho dos lotes de inserção',
+        )
+
+    def handle(self, *args, **options):
+        entregador = None
+        if options['entregador']:
+            try:
+                entregador = User.objects.get(pk=options['entregador'])
+            except User.DoesNotExist:
+                raise CommandError(f'Entregador {options["entregador"]} não encontrado')
+            self.stdout.write(f'Reconstruindo resumos de {entregador.nome}...')
+        else:
+            self.stdout.write('Reconstruindo resumos de todos os entregadores...')
+
+        total = reconstruir_resumos_diarios(entregador=entregador, tamanho_lote=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} resumos diários reconstruídos'))
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:46
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def popular_resumos(apps, schema_editor):
+    """
+    Preenche os resumos diários com os registros já existentes.
+
+    Cópia congelada da lógica de rollup_service.calcular_resumos nesta versão:
+    a migration não deve depender do código atual do app.
+    """
+    RegistroTrabalho = apps.get_model('registro_entregadespesa', 'RegistroTrabalho')
+    Despesa = apps.get_model('registro_entregadespesa', 'Despesa')
+    ResumoDiario = apps.get_model('registro_entregadespesa', 'ResumoDiario')
+
+    def resumo_vazio():
+        return {
+            'registros_trabalho': 0,
+            'quantidade_entregues': 0,
+            'quantidade_nao_entregues': 0,
+            'ganho': Decimal('0'),
+            'horas_trabalhadas': 0.0,
+            'registros_despesa': 0,
+            'despesa_total': Decimal('0'),
+            'despesas_por_categoria': defaultdict(Decimal),
+        }
+
+    resumos = defaultdict(resumo_vazio)
+
+    linhas_trabalho = RegistroTrabalho.objects.values_list(
+        'entregador_id', 'data', 'quantidade_entregues', 'quantidade_nao_entregues',
+        'valor', 'hora_inicio', 'hora_fim'
+    ).order_by()
+    for entregador_id, dia, entregues, nao_entregues, valor, hora_inicio, hora_fim in linhas_trabalho.iterator():
+        inicio = datetime.combine(dia, hora_inicio)
+        fim = datetime.combine(dia, hora_fim)
+        if fim < inicio:  # Virada de dia
+            fim += timedelta(days=1)
+
+        resumo = resumos[(entregador_id, dia)]
+        resumo['registros_trabalho'] += 1
+        resumo['quantidade_entregues'] += entregues
+        resumo['quantidade_nao_entregues'] += nao_entregues
+        resumo['ganho'] += valor
+        resumo['horas_trabalhadas'] += (fim - inicio).total_seconds() / 3600
+
+    linhas_despesa = (
+        Despesa.objects.values('entregador_id', 'data', 'tipo_despesa')
+        .annotate(total=models.Sum('valor'), quantidade=models.Count('id'))
+        .order_by()
+    )
+    for linha in linhas_despesa:
+        resumo = resumos[(linha['entregador_id'], linha['data'])]
+        resumo['registros_despesa'] += linha['quantidade']
+        resumo['despesa_total'] += linha['total']
+        resumo['despesas_por_categoria'][linha['tipo_despesa']] += linha['total']
+
+    novos = []
+    for (entregador_id, dia), campos in resumos.items():
+        campos['horas_trabalhadas'] = Decimal(str(round(campos['horas_trabalhadas'], 2)))
+        campos['despesas_por_categoria'] = {
+            categoria: str(total.quantize(Decimal('0.01')))
+            for categoria, total in campos['despesas_por_categoria'].items()
+        }
+        novos.append(ResumoDiario(entregador_id=entregador_id, data=dia, **campos))
+    ResumoDiario.objects.bulk_create(novos, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_entregadespesa', '0007_alter_categoriadespesa_nome'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('registros_trabalho', models.PositiveIntegerField(default=0)),
+                ('quantidade_entregues', models.PositiveIntegerField(default=0)),
+                ('quantidade_nao_entregues', models.PositiveIntegerField(default=0)),
+                ('ganho', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('horas_trabalhadas', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('registros_despesa', models.PositiveIntegerField(default=0)),
+                ('despesa_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('despesas_por_categoria', models.JSONField(blank=True, default=dict)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('entregador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_diarios', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-data'],
+                'unique_together': {('entregador', 'data')},
+            },
+        ),
+        migrations.RunPython(popular_resumos, migrations.RunPython.noop),
+    ]
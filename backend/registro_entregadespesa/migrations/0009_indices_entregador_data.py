@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_entregadespesa', '0008_resumodiario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['entregador', 'data'], name='despesa_entregador_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['entregador', 'data', 'tipo_despesa'], name='despesa_entreg_data_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotrabalho',
+            index=models.Index(fields=['entregador', 'data'], name='regtrab_entregador_data_idx'),
+        ),
+    ]
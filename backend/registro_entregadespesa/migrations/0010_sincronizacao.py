@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_entregadespesa', '0009_indices_entregador_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroExcluido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entidade', models.CharField(choices=[('registro_trabalho', 'Registro de Trabalho'), ('despesa', 'Despesa'), ('categoria_despesa', 'Categoria de Despesa'), ('veiculo', 'Veículo')], max_length=30)),
+                ('objeto_id', models.BigIntegerField()),
+                ('excluido_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-excluido_em'],
+            },
+        ),
+        migrations.AddField(
+            model_name='categoriadespesa',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='despesa',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='registrotrabalho',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='categoriadespesa',
+            index=models.Index(fields=['entregador', 'atualizado_em'], name='categoria_entreg_atualiz_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['entregador', 'atualizado_em'], name='despesa_entreg_atualiz_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotrabalho',
+            index=models.Index(fields=['entregador', 'atualizado_em'], name='regtrab_entreg_atualiz_idx'),
+        ),
+        migrations.AddField(
+            model_name='registroexcluido',
+            name='entregador',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registros_excluidos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='registroexcluido',
+            index=models.Index(fields=['entregador', 'excluido_em'], name='excluido_entreg_data_idx'),
+        ),
+    ]
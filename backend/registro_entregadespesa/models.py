@@ -1,5 +1,20 @@
+from datetime import datetime, timedelta
+
 from django.db import models
 
+
+def calcular_horas(hora_inicio, hora_fim):
+    """Calcula as horas entre dois horários em decimal (virada de dia incluída)"""
+    inicio = datetime.combine(datetime.today(), hora_inicio)
+    fim = datetime.combine(datetime.today(), hora_fim)
+
+    if fim < inicio:  # Trabalhou até o dia seguinte
+        fim += timedelta(days=1)
+
+    diferenca = fim - inicio
+    return diferenca.total_seconds() / 3600  # Converte para horas
+
+
 class RegistroEntregaDespesa(models.Model):
     TIPO_RENDIMENTO_CHOICES = [
         ('unitario', 'Valor Unitário por Pacote'),
@@ -69,25 +84,23 @@ class RegistroTrabalho(models.Model):
     valor = models.DecimalField(max_digits=8, decimal_places=2)
     entregador = models.ForeignKey('usuarios.Entregador', on_delete=models.CASCADE)
     data_criacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-data', '-hora_inicio']
+        indexes = [
+            # Consultas por entregador + intervalo de datas
+            models.Index(fields=['entregador', 'data'], name='regtrab_entregador_data_idx'),
+            # Sincronização incremental
+            models.Index(fields=['entregador', 'atualizado_em'], name='regtrab_entreg_atualiz_idx'),
+        ]
 
     def __str__(self):
         return f"Trabalho {self.data} - {self.entregador.nome}"
 
     def calcular_horas_trabalhadas(self):
         """Calcula as horas trabalhadas em decimal"""
-        from datetime import datetime, timedelta
-        
-        inicio = datetime.combine(datetime.today(), self.hora_inicio)
-        fim = datetime.combine(datetime.today(), self.hora_fim)
-        
-        if fim < inicio:  # Trabalhou até o dia seguinte
-            fim += timedelta(days=1)
-        
-        diferenca = fim - inicio
-        return diferenca.total_seconds() / 3600  # Converte para horas
+        return calcular_horas(self.hora_inicio, self.hora_fim)
 
 class CategoriaDespesa(models.Model):
     """Modelo para categorias personalizadas de despesas"""
@@ -95,11 +108,16 @@ class CategoriaDespesa(models.Model):
     descricao = models.TextField(blank=True, null=True)
     entregador = models.ForeignKey('usuarios.Entregador', on_delete=models.CASCADE)
     data_criacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
     ativa = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['nome']
         unique_together = ['nome', 'entregador']  # Nome único por entregador
+        indexes = [
+            # Sincronização incremental
+            models.Index(fields=['entregador', 'atualizado_em'], name='categoria_entreg_atualiz_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nome} - {self.entregador.nome}"
@@ -134,9 +152,17 @@ class Despesa(models.Model):
     data = models.DateField()
     entregador = models.ForeignKey('usuarios.Entregador', on_delete=models.CASCADE)
     data_criacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-data', '-data_criacao']
+        indexes = [
+            # Consultas por entregador + intervalo de datas (e por categoria)
+            models.Index(fields=['entregador', 'data'], name='despesa_entregador_data_idx'),
+            models.Index(fields=['entregador', 'data', 'tipo_despesa'], name='despesa_entreg_data_tipo_idx'),
+            # Sincronização incremental
+            models.Index(fields=['entregador', 'atualizado_em'], name='despesa_entreg_atualiz_idx'),
+        ]
 
     def __str__(self):
         categoria = self.categoria_personalizada.nome if self.categoria_personalizada else self.get_tipo_despesa_display()
@@ -148,3 +174,60 @@ class Despesa(models.Model):
         if self.categoria_personalizada:
             return self.categoria_personalizada.nome
         return self.get_tipo_despesa_display()
+
+class ResumoDiario(models.Model):
+    """
+    Totais diários materializados por entregador.
+
+    Mantido incrementalmente pelos signals de RegistroTrabalho e Despesa e
+    reconstruído pelo comando `rebuild_resumo_diario`. Os relatórios leem
+    desta tabela para que o custo dependa do número de dias, não de registros.
+    """
+    entregador = models.ForeignKey('usuarios.Entregador', on_delete=models.CASCADE, related_name='resumos_diarios')
+    data = models.DateField()
+
+    registros_trabalho = models.PositiveIntegerField(default=0)
+    quantidade_entregues = models.PositiveIntegerField(default=0)
+    quantidade_nao_entregues = models.PositiveIntegerField(default=0)
+    ganho = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    horas_trabalhadas = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    registros_despesa = models.PositiveIntegerField(default=0)
+    despesa_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # {tipo_despesa: "valor"}; sem quebra por categoria personalizada (ver rollup_service)
+    despesas_por_categoria = models.JSONField(default=dict, blank=True)
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-data']
+        unique_together = ['entregador', 'data']  # Um resumo por dia por entregador
+
+    def __str__(self):
+        return f"Resumo {self.data} - entregador {self.entregador_id}"
+
+class RegistroExcluido(models.Model):
+    """
+    Marcador (tombstone) de registro excluído, usado pela sincronização
+    offline para avisar o app de exclusões feitas em outro dispositivo
+    """
+    ENTIDADE_CHOICES = [
+        ('registro_trabalho', 'Registro de Trabalho'),
+        ('despesa', 'Despesa'),
+        ('categoria_despesa', 'Categoria de Despesa'),
+        ('veiculo', 'Veículo'),
+    ]
+
+    entregador = models.ForeignKey('usuarios.Entregador', on_delete=models.CASCADE, related_name='registros_excluidos')
+    entidade = models.CharField(max_length=30, choices=ENTIDADE_CHOICES)
+    objeto_id = models.BigIntegerField()
+    excluido_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-excluido_em']
+        indexes = [
+            models.Index(fields=['entregador', 'excluido_em'], name='excluido_entreg_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entidade} #{self.objeto_id} excluído em {self.excluido_em}"
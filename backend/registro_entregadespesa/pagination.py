@@ -0,0 +1,110 @@
+"""
+Paginação por cursor (keyset) das listagens de registros.
+
+A ordenação é sempre (-data, -id). O cursor guarda a última posição entregue,
+então cada página é um `WHERE (data, id) < (cursor)` sem OFFSET, com custo
+constante independente da profundidade da página.
+"""
+import base64
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+PAGE_SIZE_PADRAO = 50
+PAGE_SIZE_MAXIMO = 500
+
+VALORES_VERDADEIROS = ('1', 'true', 'yes', 'on', 'sim')
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro de paginação inválido (cursor, page_size ou since)"""
+
+
+def codificar_cursor(data, registro_id):
+    bruto = f'{data.isoformat()}|{registro_id}'.encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento).decode()
+        data_texto, registro_id = bruto.split('|')
+        return date.fromisoformat(data_texto), int(registro_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+def lista_completa_solicitada(params):
+    """Indica se o cliente pediu explicitamente a listagem completa (sem paginação)"""
+    return (params.get('completo') or '').strip().lower() in VALORES_VERDADEIROS
+
+
+def obter_page_size(params):
+    padrao = getattr(settings, 'REGISTROS_PAGE_SIZE', PAGE_SIZE_PADRAO)
+    valor = params.get('page_size')
+    if not valor:
+        return padrao
+    try:
+        page_size = int(valor)
+    except ValueError:
+        raise ParametroInvalido('page_size deve ser um número inteiro')
+    if page_size < 1:
+        raise ParametroInvalido('page_size deve ser maior que zero')
+    return min(page_size, PAGE_SIZE_MAXIMO)
+
+
+def filtrar_since(queryset, params, campo='atualizado_em'):
+    """
+    Aplica o filtro `since` (data ou data/hora ISO) para sincronização
+    incremental: apenas registros criados ou alterados depois do instante informado
+    """
+    since = params.get('since')
+    if not since:
+        return queryset
+
+    # parse_* devolvem None para formato inválido, mas levantam ValueError
+    # para datas impossíveis (ex.: 2024-13-45)
+    try:
+        instante = parse_datetime(since)
+        if instante is None:
+            dia = parse_date(since)
+            if dia is not None:
+                instante = datetime.combine(dia, time.min)
+    except ValueError:
+        instante = None
+    if instante is None:
+        raise ParametroInvalido('since deve ser uma data ou data/hora ISO 8601')
+    if timezone.is_naive(instante):
+        instante = timezone.make_aware(instante)
+    return queryset.filter(**{f'{campo}__gt': instante})
+
+
+def paginar_por_cursor(queryset, params):
+    """
+    Pagina um queryset de `.values()` ordenado por (-data, -id).
+
+    Returns:
+        tuple: (linhas da página, próximo cursor ou None)
+    """
+    page_size = obter_page_size(params)
+    queryset = queryset.order_by('-data', '-id')
+
+    cursor = params.get('cursor')
+    if cursor:
+        data_cursor, id_cursor = decodificar_cursor(cursor)
+        queryset = queryset.filter(
+            Q(data__lt=data_cursor) | Q(data=data_cursor, id__lt=id_cursor)
+        )
+
+    # Buscar um item a mais para saber se há próxima página
+    linhas = list(queryset[:page_size + 1])
+    proximo_cursor = None
+    if len(linhas) > page_size:
+        linhas = linhas[:page_size]
+        ultima = linhas[-1]
+        proximo_cursor = codificar_cursor(ultima['data'], ultima['id'])
+    return linhas, proximo_cursor
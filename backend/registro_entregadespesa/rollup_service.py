@@ -0,0 +1,165 @@
+"""
+Manutenção da tabela de resumos diários (ResumoDiario).
+
+Cada alteração em RegistroTrabalho ou Despesa recalcula apenas o dia afetado
+do entregador; a reconstrução completa fica com o comando
+`rebuild_resumo_diario`.
+
+`despesas_por_categoria` é agrupado só por `tipo_despesa`: despesas de
+categorias personalizadas ficam no tipo em que foram lançadas (normalmente
+'outros'). O resumo não serve para quebras por categoria personalizada; o
+relatório de despesas agrupa a tabela Despesa diretamente
+(relatorios_dashboard.categorias_service).
+
+A migration 0008 tem uma cópia congelada de calcular_resumos: alterações aqui
+não mudam o preenchimento inicial.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import RegistroTrabalho, Despesa, ResumoDiario, calcular_horas
+
+logger = logging.getLogger(__name__)
+
+DUAS_CASAS = Decimal('0.01')
+
+
+def _resumo_vazio():
+    return {
+        'registros_trabalho': 0,
+        'quantidade_entregues': 0,
+        'quantidade_nao_entregues': 0,
+        'ganho': Decimal('0'),
+        'horas_trabalhadas': 0.0,
+        'registros_despesa': 0,
+        'despesa_total': Decimal('0'),
+        'despesas_por_categoria': defaultdict(Decimal),
+    }
+
+
+def calcular_resumos(registros_trabalho, despesas):
+    """
+    Agrupa registros e despesas em totais por (entregador_id, data).
+
+    Recebe querysets (também funciona com os modelos históricos das migrations)
+    e devolve um dicionário {(entregador_id, data): campos do ResumoDiario}.
+    """
+    resumos = defaultdict(_resumo_vazio)
+
+    linhas_trabalho = registros_trabalho.values_list(
+        'entregador_id', 'data', 'quantidade_entregues', 'quantidade_nao_entregues',
+        'valor', 'hora_inicio', 'hora_fim'
+    ).order_by()
+    for entregador_id, dia, entregues, nao_entregues, valor, hora_inicio, hora_fim in linhas_trabalho.iterator():
+        resumo = resumos[(entregador_id, dia)]
+        resumo['registros_trabalho'] += 1
+        resumo['quantidade_entregues'] += entregues
+        resumo['quantidade_nao_entregues'] += nao_entregues
+        resumo['ganho'] += valor
+        resumo['horas_trabalhadas'] += calcular_horas(hora_inicio, hora_fim)
+
+    linhas_despesa = (
+        despesas.values('entregador_id', 'data', 'tipo_despesa')
+        .annotate(total=Sum('valor'), quantidade=Count('id'))
+        .order_by()
+    )
+    for linha in linhas_despesa:
+        resumo = resumos[(linha['entregador_id'], linha['data'])]
+        resumo['registros_despesa'] += linha['quantidade']
+        resumo['despesa_total'] += linha['total']
+        resumo['despesas_por_categoria'][linha['tipo_despesa']] += linha['total']
+
+    for resumo in resumos.values():
+        resumo['horas_trabalhadas'] = Decimal(str(round(resumo['horas_trabalhadas'], 2)))
+        resumo['despesas_por_categoria'] = {
+            categoria: str(total.quantize(DUAS_CASAS))
+            for categoria, total in resumo['despesas_por_categoria'].items()
+        }
+    return resumos
+
+
+def recalcular_resumo_diario(entregador_id, dia):
+    """Recalcula o resumo de um único dia de um entregador"""
+    resumos = calcular_resumos(
+        RegistroTrabalho.objects.filter(entregador_id=entregador_id, data=dia),
+        Despesa.objects.filter(entregador_id=entregador_id, data=dia),
+    )
+    campos = resumos.get((entregador_id, dia))
+
+    if campos is None:
+        # Nenhum registro restante no dia: remover o resumo
+        ResumoDiario.objects.filter(entregador_id=entregador_id, data=dia).delete()
+        return None
+
+    resumo, _ = ResumoDiario.objects.update_or_create(
+        entregador_id=entregador_id,
+        data=dia,
+        defaults=campos
+    )
+    return resumo
+
+
+def recalcular_resumos_dias(entregador_id, dias):
+    """
+    Recalcula vários dias de um entregador de uma vez.
+
+    Usado pelas gravações em lote (bulk_create/bulk_update não disparam os
+    signals): duas consultas de agregação e um bulk_create, independente da
+    quantidade de dias.
+    """
+    dias = set(dias)
+    if not dias:
+        return 0
+
+    resumos = calcular_resumos(
+        RegistroTrabalho.objects.filter(entregador_id=entregador_id, data__in=dias),
+        Despesa.objects.filter(entregador_id=entregador_id, data__in=dias),
+    )
+
+    with transaction.atomic():
+        ResumoDiario.objects.filter(entregador_id=entregador_id, data__in=dias).delete()
+        ResumoDiario.objects.bulk_create([
+            ResumoDiario(entregador_id=entregador_id, data=dia, **campos)
+            for (_, dia), campos in resumos.items()
+        ])
+    return len(resumos)
+
+
+def reconstruir_resumos_diarios(entregador=None, tamanho_lote=500):
+    """
+    Reconstrói os resumos diários a partir dos registros brutos.
+
+    Args:
+        entregador: Limita a reconstrução a um entregador (opcional)
+        tamanho_lote: Tamanho dos lotes do bulk_create
+
+    Returns:
+        int: Quantidade de resumos criados
+    """
+    registros_trabalho = RegistroTrabalho.objects.all()
+    despesas = Despesa.objects.all()
+    resumos_existentes = ResumoDiario.objects.all()
+
+    if entregador is not None:
+        registros_trabalho = registros_trabalho.filter(entregador=entregador)
+        despesas = despesas.filter(entregador=entregador)
+        resumos_existentes = resumos_existentes.filter(entregador=entregador)
+
+    resumos = calcular_resumos(registros_trabalho, despesas)
+
+    with transaction.atomic():
+        resumos_existentes.delete()
+        ResumoDiario.objects.bulk_create(
+            [
+                ResumoDiario(entregador_id=entregador_id, data=dia, **campos)
+                for (entregador_id, dia), campos in resumos.items()
+            ],
+            batch_size=tamanho_lote
+        )
+
+    logger.info(f"Resumos diários reconstruídos: {len(resumos)}")
+    return len(resumos)
@@ -0,0 +1,73 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from cadastro_veiculo.models import Veiculo
+from usuarios.models import Entregador
+from .models import RegistroTrabalho, Despesa, CategoriaDespesa
+from .rollup_service import recalcular_resumo_diario
+from .sync_service import SyncService
+
+
+def _chave_resumo(instance):
+    """(entregador_id, data) do registro, aceitando data ainda em texto"""
+    data = instance._meta.get_field('data').to_python(instance.data)
+    return instance.entregador_id, data
+
+
+def _exclusao_de_entregador(origin):
+    """
+    Se a exclusão partiu de entregadores (instância ou QuerySet, ex.: ação
+    "excluir selecionados" do admin) e chegou aqui em cascata
+    """
+    if isinstance(origin, Entregador):
+        return True
+    modelo = getattr(origin, 'model', None)
+    return isinstance(modelo, type) and issubclass(modelo, Entregador)
+
+
+@receiver(pre_save, sender=RegistroTrabalho)
+@receiver(pre_save, sender=Despesa)
+def guardar_dia_anterior(sender, instance, **kwargs):
+    """
+    Guarda o dia original do registro para recalcular também o resumo antigo
+    quando a data (ou o entregador) for alterada
+    """
+    instance._resumo_chave_anterior = None
+    if instance.pk:
+        instance._resumo_chave_anterior = (
+            sender.objects.filter(pk=instance.pk).values_list('entregador_id', 'data').first()
+        )
+
+
+@receiver(post_save, sender=RegistroTrabalho)
+@receiver(post_save, sender=Despesa)
+def atualizar_resumo_apos_salvar(sender, instance, **kwargs):
+    """Recalcula o resumo diário do dia afetado"""
+    chave = _chave_resumo(instance)
+    recalcular_resumo_diario(*chave)
+
+    chave_anterior = getattr(instance, '_resumo_chave_anterior', None)
+    if chave_anterior and chave_anterior != chave:
+        recalcular_resumo_diario(*chave_anterior)
+
+
+@receiver(post_delete, sender=RegistroTrabalho)
+@receiver(post_delete, sender=Despesa)
+def atualizar_resumo_apos_excluir(sender, instance, origin=None, **kwargs):
+    """Recalcula o resumo diário após exclusão"""
+    # Exclusão em cascata do entregador: os resumos também são removidos
+    if _exclusao_de_entregador(origin):
+        return
+    recalcular_resumo_diario(*_chave_resumo(instance))
+
+
+@receiver(post_delete, sender=RegistroTrabalho)
+@receiver(post_delete, sender=Despesa)
+@receiver(post_delete, sender=CategoriaDespesa)
+@receiver(post_delete, sender=Veiculo)
+def registrar_exclusao_para_sync(sender, instance, origin=None, **kwargs):
+    """Registra o tombstone usado pela sincronização incremental"""
+    # Conta excluída: não há mais cliente para sincronizar
+    if _exclusao_de_entregador(origin):
+        return
+    SyncService.registrar_exclusao(instance)
@@ -0,0 +1,332 @@
+"""
+Sincronização incremental para o app offline.
+
+O cliente envia o watermark da última sincronização e recebe apenas o que foi
+criado, alterado (campo `atualizado_em`) ou excluído (RegistroExcluido) depois
+dele. Na mesma chamada pode enviar um lote de mutações feitas offline.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from cadastro_veiculo.models import Veiculo
+from cadastro_veiculo.serializers import VeiculoSerializer
+from .models import RegistroTrabalho, Despesa, CategoriaDespesa, RegistroExcluido
+from .validacao import (
+    DadosInvalidos,
+    carregar_categorias,
+    dados_despesa,
+    dados_registro_trabalho,
+    validar_despesa,
+    validar_registro_trabalho,
+)
+
+logger = logging.getLogger(__name__)
+
+OPERACOES = ('criar', 'atualizar', 'excluir')
+
+
+def _iso(valor):
+    return valor.isoformat() if valor else None
+
+
+def _hora(valor):
+    return valor.strftime('%H:%M') if valor else None
+
+
+def _serializar_trabalho(linha):
+    return {
+        'id': linha['id'],
+        'data': _iso(linha['data']),
+        'hora_inicio': _hora(linha['hora_inicio']),
+        'hora_fim': _hora(linha['hora_fim']),
+        'quantidade_entregues': linha['quantidade_entregues'],
+        'quantidade_nao_entregues': linha['quantidade_nao_entregues'],
+        'tipo_pagamento': linha['tipo_pagamento'],
+        'valor': float(linha['valor']),
+        'atualizado_em': _iso(linha['atualizado_em']),
+    }
+
+
+def _serializar_despesa(linha):
+    return {
+        'id': linha['id'],
+        'tipo_despesa': linha['tipo_despesa'],
+        'categoria_personalizada_id': linha['categoria_personalizada_id'],
+        'categoria_personalizada': linha['categoria_personalizada__nome'],
+        'descricao': linha['descricao'],
+        'valor': float(linha['valor']),
+        'data': _iso(linha['data']),
+        'atualizado_em': _iso(linha['atualizado_em']),
+    }
+
+
+def _serializar_categoria(linha):
+    return {
+        'id': linha['id'],
+        'nome': linha['nome'],
+        'descricao': linha['descricao'],
+        'ativa': linha['ativa'],
+        'atualizado_em': _iso(linha['atualizado_em']),
+    }
+
+
+def _serializar_veiculo(linha):
+    return {
+        'id': linha['id'],
+        'tipo': linha['tipo'],
+        'modelo': linha['modelo'],
+        'placa': linha['placa'],
+        'categoria': linha['categoria'],
+        'km_por_l': float(linha['km_por_l']),
+        'data_cadastro': _iso(linha['data_cadastro']),
+        'atualizado_em': _iso(linha['atualizado_em']),
+    }
+
+
+# entidade -> (modelo, campos projetados, serializador)
+ENTIDADES = {
+    'registro_trabalho': (
+        RegistroTrabalho,
+        ('id', 'data', 'hora_inicio', 'hora_fim', 'quantidade_entregues',
+         'quantidade_nao_entregues', 'tipo_pagamento', 'valor', 'atualizado_em'),
+        _serializar_trabalho,
+    ),
+    'despesa': (
+        Despesa,
+        ('id', 'tipo_despesa', 'categoria_personalizada_id', 'categoria_personalizada__nome',
+         'descricao', 'valor', 'data', 'atualizado_em'),
+        _serializar_despesa,
+    ),
+    'categoria_despesa': (
+        CategoriaDespesa,
+        ('id', 'nome', 'descricao', 'ativa', 'atualizado_em'),
+        _serializar_categoria,
+    ),
+    'veiculo': (
+        Veiculo,
+        ('id', 'tipo', 'modelo', 'placa', 'categoria', 'km_por_l', 'data_cadastro', 'atualizado_em'),
+        _serializar_veiculo,
+    ),
+}
+
+ENTIDADE_POR_MODELO = {modelo: entidade for entidade, (modelo, _, _) in ENTIDADES.items()}
+
+
+class SyncService:
+    """
+    Serviço de sincronização incremental (pull de alterações + push de mutações)
+    """
+
+    @staticmethod
+    def retencao_exclusoes():
+        return timedelta(days=getattr(settings, 'SYNC_RETENCAO_EXCLUSOES_DIAS', 90))
+
+    @staticmethod
+    def parse_watermark(valor):
+        """
+        Converte o watermark enviado pelo cliente
+
+        Raises:
+            DadosInvalidos: Se não for uma data/hora ISO 8601
+        """
+        if not valor:
+            return None
+        try:
+            instante = parse_datetime(str(valor))
+        except ValueError:
+            # Formato ISO válido com data/hora impossível (ex.: 2024-13-45T00:00:00)
+            instante = None
+        if instante is None:
+            raise DadosInvalidos('watermark deve ser uma data/hora ISO 8601')
+        if timezone.is_naive(instante):
+            instante = timezone.make_aware(instante)
+        return instante
+
+    @staticmethod
+    def registrar_exclusao(instance):
+        """Cria o tombstone de um registro excluído"""
+        entidade = ENTIDADE_POR_MODELO.get(type(instance))
+        if entidade is None:
+            return
+        RegistroExcluido.objects.create(
+            entregador_id=instance.entregador_id,
+            entidade=entidade,
+            objeto_id=instance.pk
+        )
+
+    @staticmethod
+    def coletar_alteracoes(entregador, desde):
+        """
+        Coleta alterações e exclusões do entregador desde o watermark
+
+        Args:
+            entregador: Usuário autenticado
+            desde: Watermark do cliente (None para sincronização completa)
+
+        Returns:
+            dict: Alterações por entidade, exclusões e indicador de sincronização completa
+        """
+        completo = desde is None or desde < timezone.now() - SyncService.retencao_exclusoes()
+
+        alteracoes = {}
+        for entidade, (modelo, campos, serializar) in ENTIDADES.items():
+            queryset = modelo.objects.filter(entregador=entregador)
+            if not completo:
+                queryset = queryset.filter(atualizado_em__gt=desde)
+            linhas = queryset.order_by('atualizado_em', 'id').values(*campos)
+            alteracoes[entidade] = [serializar(linha) for linha in linhas]
+
+        exclusoes = {entidade: [] for entidade in ENTIDADES}
+        if not completo:
+            tombstones = RegistroExcluido.objects.filter(
+                entregador=entregador,
+                excluido_em__gt=desde
+            ).values_list('entidade', 'objeto_id')
+            for entidade, objeto_id in tombstones:
+                exclusoes[entidade].append(objeto_id)
+
+        return {
+            'completo': completo,
+            'alteracoes': alteracoes,
+            'exclusoes': exclusoes,
+        }
+
+    @staticmethod
+    def aplicar_mutacoes(request, mutacoes):
+        """
+        Aplica um lote de mutações feitas offline
+
+        Cada mutação roda em seu próprio savepoint: uma falha não desfaz as
+        demais. Formato de cada item:
+            {"entidade": "despesa", "operacao": "criar|atualizar|excluir",
+             "id": 10, "client_id": "tmp-1", "dados": {...}}
+
+        Returns:
+            list: Um resultado por mutação, na mesma ordem
+        """
+        user = request.user
+        categorias = None
+        resultados = []
+
+        with transaction.atomic():
+            for indice, mutacao in enumerate(mutacoes):
+                resultado = {
+                    'indice': indice,
+                    'client_id': mutacao.get('client_id') if isinstance(mutacao, dict) else None,
+                }
+                try:
+                    if not isinstance(mutacao, dict):
+                        raise DadosInvalidos('Mutação deve ser um objeto')
+
+                    entidade = mutacao.get('entidade')
+                    operacao = mutacao.get('operacao')
+                    if entidade not in ENTIDADES:
+                        raise DadosInvalidos(f'Entidade inválida: {entidade}')
+                    if operacao not in OPERACOES:
+                        raise DadosInvalidos(f'Operação inválida: {operacao}')
+
+                    if entidade == 'despesa' and categorias is None:
+                        categorias = carregar_categorias(user)
+
+                    with transaction.atomic():
+                        objeto_id = SyncService._aplicar(
+                            request, entidade, operacao, mutacao.get('id'),
+                            mutacao.get('dados') or {}, categorias
+                        )
+
+                    resultado.update({'success': True, 'id': objeto_id})
+                except DadosInvalidos as e:
+                    resultado.update({'success': False, 'error': str(e)})
+                except Exception as e:
+                    logger.error(f"Erro ao aplicar mutação {indice}: {str(e)}", exc_info=True)
+                    resultado.update({'success': False, 'error': str(e)})
+                resultados.append(resultado)
+
+        return resultados
+
+    @staticmethod
+    def _obter(modelo, user, objeto_id):
+        try:
+            return modelo.objects.get(pk=objeto_id, entregador=user)
+        except (modelo.DoesNotExist, ValueError, TypeError):
+            raise DadosInvalidos('Registro não encontrado')
+
+    @staticmethod
+    def _aplicar(request, entidade, operacao, objeto_id, dados, categorias):
+        user = request.user
+        modelo = ENTIDADES[entidade][0]
+
+        if operacao == 'excluir':
+            # Exclusão é idempotente: registro inexistente conta como sucesso
+            objeto = modelo.objects.filter(pk=objeto_id, entregador=user).first()
+            if objeto is not None:
+                if entidade == 'categoria_despesa' and Despesa.objects.filter(categoria_personalizada=objeto).exists():
+                    # Mesmo comportamento da API: categoria em uso é apenas desativada
+                    objeto.ativa = False
+                    objeto.save()
+                else:
+                    objeto.delete()
+            return objeto_id
+
+        if entidade == 'veiculo':
+            instancia = SyncService._obter(modelo, user, objeto_id) if operacao == 'atualizar' else None
+            serializer = VeiculoSerializer(
+                instancia, data=dados, partial=instancia is not None, context={'request': request}
+            )
+            if not serializer.is_valid():
+                raise DadosInvalidos('; '.join(
+                    f"{campo}: {' '.join(str(erro) for erro in erros)}"
+                    for campo, erros in serializer.errors.items()
+                ))
+            return serializer.save().pk
+
+        if entidade == 'categoria_despesa':
+            return SyncService._salvar_categoria(user, operacao, objeto_id, dados)
+
+        if operacao == 'atualizar':
+            objeto = SyncService._obter(modelo, user, objeto_id)
+            # Completa o payload parcial com os valores atuais antes de validar
+            atuais = dados_registro_trabalho(objeto) if entidade == 'registro_trabalho' else dados_despesa(objeto)
+            dados = {**atuais, **dados}
+        else:
+            objeto = modelo(entregador=user)
+
+        if entidade == 'registro_trabalho':
+            campos = validar_registro_trabalho(dados)
+        else:
+            campos = validar_despesa(dados, user, categorias)
+
+        for campo, valor in campos.items():
+            setattr(objeto, campo, valor)
+        objeto.save()
+        return objeto.pk
+
+    @staticmethod
+    def _salvar_categoria(user, operacao, objeto_id, dados):
+        if operacao == 'atualizar':
+            categoria = SyncService._obter(CategoriaDespesa, user, objeto_id)
+        else:
+            categoria = CategoriaDespesa(entregador=user)
+
+        nome = (dados.get('nome', categoria.nome) or '').strip()
+        if not nome:
+            raise DadosInvalidos('Nome da categoria é obrigatório')
+
+        duplicada = CategoriaDespesa.objects.filter(nome__iexact=nome, entregador=user)
+        if categoria.pk:
+            duplicada = duplicada.exclude(pk=categoria.pk)
+        if duplicada.exists():
+            raise DadosInvalidos('Já existe uma categoria com esse nome')
+
+        categoria.nome = nome
+        if 'descricao' in dados:
+            categoria.descricao = (dados.get('descricao') or '').strip()
+        if 'ativa' in dados:
+            categoria.ativa = bool(dados['ativa'])
+        categoria.save()
+        return categoria.pk
@@ -0,0 +1,403 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from cadastro_veiculo.models import Veiculo
+from usuarios.models import Entregador
+from .models import RegistroTrabalho, Despesa, CategoriaDespesa, RegistroExcluido, ResumoDiario
+from .rollup_service import calcular_resumos
+
+
+def criar_entregador(email, **extra):
+    return Entregador.objects.create_user(
+        email=email, password='senha-teste', nome='Teste', telefone='11999999999', **extra
+    )
+
+
+def criar_registros(entregador, dias=3, inicio=None):
+    inicio = inicio or date.today()
+    for indice in range(dias):
+        dia = inicio - timedelta(days=indice)
+        RegistroTrabalho.objects.create(
+            entregador=entregador, data=dia, hora_inicio=time(8), hora_fim=time(17),
+            quantidade_entregues=10, quantidade_nao_entregues=1,
+            tipo_pagamento='diaria', valor=Decimal('120.00')
+        )
+        Despesa.objects.create(
+            entregador=entregador, data=dia, tipo_despesa='combustivel',
+            descricao='Gasolina', valor=Decimal('30.00')
+        )
+
+
+class ExclusaoEntregadoresTests(TestCase):
+    """Exclusão em cascata de entregadores com registros"""
+
+    def setUp(self):
+        self.entregadores = [criar_entregador(f'entregador{indice}@teste.com') for indice in range(2)]
+        for entregador in self.entregadores:
+            criar_registros(entregador)
+        self.outro = criar_entregador('outro@teste.com')
+        criar_registros(self.outro)
+
+    def test_exclusao_em_lote_nao_cria_tombstones_dos_excluidos(self):
+        ids = [entregador.pk for entregador in self.entregadores]
+
+        Entregador.objects.filter(pk__in=ids).delete()
+
+        self.assertFalse(Entregador.objects.filter(pk__in=ids).exists())
+        self.assertFalse(RegistroExcluido.objects.filter(entregador_id__in=ids).exists())
+        # Nenhuma linha órfã apontando para os entregadores excluídos
+        connection.check_constraints()
+
+    def test_exclusao_em_lote_nao_recalcula_resumos_dos_excluidos(self):
+        ids = [entregador.pk for entregador in self.entregadores]
+        resumos_do_outro = ResumoDiario.objects.filter(entregador=self.outro).count()
+        tabela = ResumoDiario._meta.db_table
+
+        with CaptureQueriesContext(connection) as consultas:
+            Entregador.objects.filter(pk__in=ids).delete()
+
+        # Os resumos saem só pela cascata: nenhum recálculo (SELECT/INSERT/UPDATE) por registro excluído
+        acessos = [consulta['sql'] for consulta in consultas.captured_queries if tabela in consulta['sql']]
+        self.assertTrue(all(sql.startswith('DELETE') for sql in acessos), acessos)
+        self.assertFalse(ResumoDiario.objects.filter(entregador_id__in=ids).exists())
+        self.assertEqual(ResumoDiario.objects.filter(entregador=self.outro).count(), resumos_do_outro)
+        connection.check_constraints()
+
+    def test_exclusao_de_um_entregador_nao_cria_tombstones(self):
+        entregador = self.entregadores[0]
+        entregador_id = entregador.pk
+
+        entregador.delete()
+
+        self.assertFalse(RegistroExcluido.objects.filter(entregador_id=entregador_id).exists())
+        connection.check_constraints()
+
+    def test_exclusao_de_registro_continua_criando_tombstone(self):
+        registro = RegistroTrabalho.objects.filter(entregador=self.outro).first()
+        registro_id = registro.pk
+
+        registro.delete()
+
+        self.assertTrue(RegistroExcluido.objects.filter(
+            entregador=self.outro, entidade='registro_trabalho', objeto_id=registro_id
+        ).exists())
+
+
+class DashboardDataConsultasTests(TestCase):
+    """dashboard_data monta as séries com consultas agrupadas, não uma por dia"""
+
+    url = '/registro/api/dashboard-data/'
+    # Validador (GET condicional), resumos diários, veículos por tipo e últimos registros
+    CONSULTAS = 4
+
+    def setUp(self):
+        self.entregador = criar_entregador('dashboard@teste.com')
+        Veiculo.objects.create(entregador=self.entregador, tipo='moto', modelo='CG 160')
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _get_sem_cache(self, periodo):
+        cache.clear()
+        with self.assertNumQueries(self.CONSULTAS):
+            resposta = self.client.get(self.url, {'periodo': periodo})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['data']
+
+    def test_quantidade_de_consultas_por_periodo(self):
+        criar_registros(self.entregador, dias=30)
+
+        for periodo in ('semana', 'mes', 'ano'):
+            with self.subTest(periodo=periodo):
+                self._get_sem_cache(periodo)
+
+    def test_quantidade_de_consultas_nao_cresce_com_os_dias(self):
+        criar_registros(self.entregador, dias=3)
+        self._get_sem_cache('ano')
+
+        criar_registros(self.entregador, dias=120, inicio=date.today() - timedelta(days=3))
+        dados = self._get_sem_cache('ano')
+        self.assertEqual(dados['indicadores_performance']['dias_trabalhados'], 123)
+        self.assertEqual(dados['indicadores_performance']['entregas_realizadas'], 123 * 10)
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class IndicesEntregadorDataTests(TestCase):
+    """Filtros por entregador e intervalo de datas usam os índices (entregador, data)"""
+
+    def setUp(self):
+        self.entregador = criar_entregador('indices@teste.com')
+        criar_registros(self.entregador, dias=40)
+        for indice in range(3):
+            criar_registros(criar_entregador(f'outro{indice}@teste.com'), dias=40)
+        self.inicio = date.today() - timedelta(days=30)
+        self.fim = date.today()
+
+    @staticmethod
+    def _indices_entregador_data(modelo):
+        return {
+            indice.name for indice in modelo._meta.indexes
+            if list(indice.fields[:2]) == ['entregador', 'data']
+        }
+
+    def _plano(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tabelas pequenas de teste: sem isso o planejador prefere varredura sequencial
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_intervalo_de_datas_usa_indice_composto(self):
+        consultas = {
+            RegistroTrabalho: RegistroTrabalho.objects.filter(
+                entregador=self.entregador, data__range=(self.inicio, self.fim)
+            ),
+            Despesa: Despesa.objects.filter(
+                entregador=self.entregador, data__gte=self.inicio, data__lte=self.fim
+            ),
+        }
+        for modelo, queryset in consultas.items():
+            with self.subTest(modelo=modelo.__name__):
+                indices = self._indices_entregador_data(modelo)
+                self.assertTrue(indices)
+                plano = self._plano(queryset)
+                self.assertTrue(any(nome in plano for nome in indices), plano)
+
+
+class ListagemPorCursorTests(TestCase):
+    """Listagens de registros paginadas por cursor (data, id)"""
+
+    def setUp(self):
+        self.entregador = criar_entregador('cursor@teste.com')
+        criar_registros(self.entregador, dias=7)
+        # Mais de uma despesa no mesmo dia: o desempate é pelo id
+        criar_registros(criar_entregador('outro-cursor@teste.com'), dias=2)
+        for _ in range(2):
+            Despesa.objects.create(
+                entregador=self.entregador, data=date.today() - timedelta(days=3),
+                tipo_despesa='alimentacao', descricao='Almoço', valor=Decimal('25.00')
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _percorrer(self, url):
+        ids = []
+        cursor = None
+        while True:
+            parametros = {'page_size': 3, **({'cursor': cursor} if cursor else {})}
+            dados = self.client.get(url, parametros).json()
+            self.assertLessEqual(dados['count'], 3)
+            ids.extend(item['id'] for item in dados['results'])
+            cursor = dados['next_cursor']
+            self.assertEqual(dados['has_more'], cursor is not None)
+            if cursor is None:
+                return ids
+
+    def test_cursor_percorre_tudo_sem_repetir_na_ordem(self):
+        for url, modelo in (
+            ('/registro/api/registro-trabalho/', RegistroTrabalho),
+            ('/registro/api/registro-despesa/', Despesa),
+        ):
+            with self.subTest(url=url):
+                esperado = list(
+                    modelo.objects.filter(entregador=self.entregador)
+                    .order_by('-data', '-id').values_list('id', flat=True)
+                )
+                self.assertEqual(self._percorrer(url), esperado)
+
+    def test_completo_devolve_tudo(self):
+        dados = self.client.get('/registro/api/registro-despesa/', {'completo': 'true'}).json()
+
+        self.assertEqual(dados['count'], 9)
+        self.assertIsNone(dados['next_cursor'])
+
+    def test_parametros_invalidos_respondem_400(self):
+        for parametros in ({'cursor': 'invalido'}, {'page_size': '0'}, {'page_size': 'dez'}):
+            with self.subTest(parametros=parametros):
+                resposta = self.client.get('/registro/api/registro-trabalho/', parametros)
+                self.assertEqual(resposta.status_code, 400)
+
+
+class FiltroSinceTests(TestCase):
+    """Filtro `since` das listagens para sincronização incremental"""
+
+    def setUp(self):
+        self.entregador = criar_entregador('since@teste.com')
+        criar_registros(self.entregador, dias=2, inicio=date.today() - timedelta(days=10))
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def test_data_impossivel_responde_400(self):
+        for url in ('/registro/api/registro-trabalho/', '/registro/api/registro-despesa/'):
+            for since in ('2024-13-45', '2024-02-30T10:00:00', 'ontem'):
+                with self.subTest(url=url, since=since):
+                    resposta = self.client.get(url, {'since': since})
+                    self.assertEqual(resposta.status_code, 400)
+                    self.assertFalse(resposta.json()['success'])
+
+    def test_registro_editado_aparece_no_since(self):
+        marca = timezone.now()
+        despesa = Despesa.objects.filter(entregador=self.entregador).first()
+        despesa.valor = Decimal('35.00')
+        despesa.save()
+
+        resposta = self.client.get('/registro/api/registro-despesa/', {'since': marca.isoformat()})
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([item['id'] for item in resposta.json()['results']], [despesa.pk])
+
+
+class SincronizacaoTests(TestCase):
+    """Sincronização incremental do app offline (/registro/api/sync/)"""
+
+    url = '/registro/api/sync/'
+
+    def setUp(self):
+        self.entregador = criar_entregador('sync@teste.com')
+        criar_registros(self.entregador, dias=2)
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def test_watermark_impossivel_responde_400(self):
+        for watermark in ('2024-13-45T00:00:00', '2024-02-30T10:00:00Z', 'ontem'):
+            with self.subTest(watermark=watermark):
+                resposta = self.client.get(self.url, {'watermark': watermark})
+                self.assertEqual(resposta.status_code, 400)
+                self.assertFalse(resposta.json()['success'])
+
+                resposta = self.client.post(self.url, {'watermark': watermark, 'mutacoes': []}, format='json')
+                self.assertEqual(resposta.status_code, 400)
+
+    def test_devolve_apenas_alteracoes_e_exclusoes_desde_o_watermark(self):
+        watermark = self.client.get(self.url).json()['watermark']
+        despesa, excluida = Despesa.objects.filter(entregador=self.entregador)[:2]
+        despesa.valor = Decimal('45.00')
+        despesa.save()
+        excluida_id = excluida.pk
+        excluida.delete()
+
+        dados = self.client.get(self.url, {'watermark': watermark}).json()
+
+        self.assertFalse(dados['completo'])
+        self.assertEqual([item['id'] for item in dados['alteracoes']['despesa']], [despesa.pk])
+        self.assertEqual(dados['alteracoes']['registro_trabalho'], [])
+        self.assertEqual(dados['exclusoes']['despesa'], [excluida_id])
+
+
+class GravacaoEmLoteTests(TestCase):
+    """Endpoints em lote de despesas"""
+
+    url = '/registro/api/registro-despesa/lote/'
+
+    def setUp(self):
+        cache.clear()
+        self.entregador = criar_entregador('lote@teste.com')
+        self.categoria = CategoriaDespesa.objects.create(nome='Pedágio', entregador=self.entregador)
+        self.despesa = Despesa.objects.create(
+            entregador=self.entregador, data=date.today(), tipo_despesa='outros',
+            categoria_personalizada=self.categoria, descricao='Ponte', valor=Decimal('12.50')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def test_criar_devolve_client_id_e_atualiza_resumo(self):
+        hoje = date.today().isoformat()
+        resposta = self.client.post(self.url, [
+            {'client_id': 'tmp-1', 'tipo_despesa': 'combustivel', 'descricao': 'Gasolina', 'valor': '50', 'data': hoje},
+            {'client_id': 'tmp-2', 'tipo_despesa': 'combustivel', 'descricao': 'Gasolina', 'valor': '0', 'data': hoje},
+        ], format='json')
+
+        self.assertEqual(resposta.status_code, 201)
+        resultados = resposta.json()['resultados']
+        self.assertEqual([r['client_id'] for r in resultados], ['tmp-1', 'tmp-2'])
+        self.assertEqual([r['success'] for r in resultados], [True, False])
+        resumo = ResumoDiario.objects.get(entregador=self.entregador, data=date.today())
+        self.assertEqual(resumo.despesa_total, Decimal('62.50'))
+
+    def test_atualizar_sem_categoria_mantem_categoria_desativada(self):
+        self.categoria.ativa = False
+        self.categoria.save()
+
+        resposta = self.client.patch(self.url, [{'id': self.despesa.pk, 'valor': '15.00'}], format='json')
+
+        self.assertEqual(resposta.status_code, 200)
+        self.despesa.refresh_from_db()
+        self.assertEqual(self.despesa.valor, Decimal('15.00'))
+        self.assertEqual(self.despesa.categoria_personalizada, self.categoria)
+
+    def test_sync_atualizar_sem_categoria_mantem_categoria_desativada(self):
+        self.categoria.ativa = False
+        self.categoria.save()
+
+        resposta = self.client.post('/registro/api/sync/', {'mutacoes': [{
+            'entidade': 'despesa', 'operacao': 'atualizar', 'id': self.despesa.pk,
+            'dados': {'descricao': 'Ponte Rio-Niterói'}
+        }]}, format='json')
+
+        self.assertTrue(resposta.json()['resultados'][0]['success'])
+        self.despesa.refresh_from_db()
+        self.assertEqual(self.despesa.descricao, 'Ponte Rio-Niterói')
+        self.assertEqual(self.despesa.categoria_personalizada, self.categoria)
+
+
+class MigrationResumoDiarioTests(TransactionTestCase):
+    """Preenchimento inicial dos resumos diários (migration 0008)"""
+
+    antes = [('registro_entregadespesa', '0007_alter_categoriadespesa_nome')]
+    depois = [('registro_entregadespesa', '0008_resumodiario')]
+
+    def tearDown(self):
+        # Volta o banco de teste para o estado atual das migrations
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_igual_ao_calculo_atual(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.antes)
+        # Demais apps no estado atual, este app em 0007
+        outros = [no for no in executor.loader.graph.leaf_nodes() if no[0] != 'registro_entregadespesa']
+        apps = executor.loader.project_state(outros + self.antes).apps
+        Entregador = apps.get_model('usuarios', 'Entregador')
+        RegistroHistorico = apps.get_model('registro_entregadespesa', 'RegistroTrabalho')
+        DespesaHistorica = apps.get_model('registro_entregadespesa', 'Despesa')
+
+        entregador = Entregador.objects.create(email='migration@teste.com', nome='Teste', telefone='11999999999')
+        hoje = date.today()
+        RegistroHistorico.objects.create(
+            entregador_id=entregador.pk, data=hoje, hora_inicio=time(22), hora_fim=time(2, 30),
+            quantidade_entregues=12, quantidade_nao_entregues=1, tipo_pagamento='diaria', valor=Decimal('150.00')
+        )
+        for tipo, valor in (('combustivel', '30.00'), ('combustivel', '12.35'), ('alimentacao', '20.00')):
+            DespesaHistorica.objects.create(
+                entregador_id=entregador.pk, data=hoje - timedelta(days=1), tipo_despesa=tipo,
+                descricao='Teste', valor=Decimal(valor)
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.depois)
+        ResumoHistorico = executor.loader.project_state(self.depois).apps.get_model(
+            'registro_entregadespesa', 'ResumoDiario'
+        )
+
+        esperado = calcular_resumos(RegistroTrabalho.objects.all(), Despesa.objects.all())
+        gravado = {
+            (linha.pop('entregador_id'), linha.pop('data')): linha
+            for linha in ResumoHistorico.objects.values(*(['entregador_id', 'data'] + list(_campos_resumo())))
+        }
+        self.assertEqual(gravado, esperado)
+        self.assertEqual(gravado[(entregador.pk, hoje)]['horas_trabalhadas'], Decimal('4.50'))
+
+
+def _campos_resumo():
+    return (
+        'registros_trabalho', 'quantidade_entregues', 'quantidade_nao_entregues', 'ganho',
+        'horas_trabalhadas', 'registros_despesa', 'despesa_total', 'despesas_por_categoria',
+    )
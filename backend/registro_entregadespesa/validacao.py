@@ -0,0 +1,208 @@
+"""
+Validação e conversão dos dados de entrada de registros de trabalho e despesas.
+
+Compartilhado pelas views de criação, pela sincronização offline e pelos
+endpoints em lote, para que todos apliquem exatamente as mesmas regras.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from .models import CategoriaDespesa
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_DATA = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+FORMATOS_HORA = ('%H:%M', '%H:%M:%S')
+
+CAMPOS_OBRIGATORIOS_TRABALHO = ['data', 'hora_inicio', 'hora_fim', 'quantidade_entregues',
+                                'tipo_pagamento', 'valor']
+CAMPOS_OBRIGATORIOS_DESPESA = ['tipo_despesa', 'descricao', 'valor', 'data']
+
+
+class DadosInvalidos(ValueError):
+    """Erro de validação com mensagem pronta para a resposta da API"""
+
+
+def parse_data(valor):
+    """
+    Converte uma data em DD/MM/YYYY, YYYY-MM-DD ou DD-MM-YYYY
+
+    Raises:
+        DadosInvalidos: Se nenhum formato for aceito
+    """
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(str(valor), formato).date()
+        except ValueError:
+            continue
+    logger.warning(f"Erro na data: {valor}")
+    raise DadosInvalidos(f"Formato de data inválido: {valor}. Use DD/MM/YYYY ou YYYY-MM-DD")
+
+
+def parse_hora(valor):
+    """Converte um horário HH:MM (ou HH:MM:SS)"""
+    for formato in FORMATOS_HORA:
+        try:
+            return datetime.strptime(str(valor), formato).time()
+        except ValueError:
+            continue
+    raise DadosInvalidos('Formato de hora invalido. Use HH:MM')
+
+
+def parse_valor(valor):
+    """Converte um valor monetário para Decimal com duas casas"""
+    try:
+        return Decimal(str(valor)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError, TypeError):
+        logger.warning(f"Erro no valor: {valor}")
+        raise DadosInvalidos('Valor invalido')
+
+
+def validar_registro_trabalho(dados):
+    """
+    Valida os dados de um dia de trabalho
+
+    Returns:
+        dict: Campos prontos para RegistroTrabalho (sem o entregador)
+
+    Raises:
+        DadosInvalidos: Com a mensagem do primeiro problema encontrado
+    """
+    # Validar campos obrigatórios (exceto quantidade_nao_entregues que pode ser 0)
+    for campo in CAMPOS_OBRIGATORIOS_TRABALHO:
+        if campo not in dados or dados[campo] is None:
+            logger.warning(f"Campo obrigatório faltando: {campo}")
+            raise DadosInvalidos(f'Campo obrigatorio nao informado: {campo}')
+
+    # Validar quantidade_nao_entregues separadamente (pode ser 0)
+    if 'quantidade_nao_entregues' not in dados:
+        logger.warning("Campo obrigatório faltando: quantidade_nao_entregues")
+        raise DadosInvalidos('Campo obrigatorio nao informado: quantidade_nao_entregues')
+
+    # Validar se as quantidades são números válidos
+    try:
+        quantidade_entregues = int(dados['quantidade_entregues'])
+        quantidade_nao_entregues = int(dados['quantidade_nao_entregues'])
+    except (ValueError, TypeError):
+        raise DadosInvalidos('Quantidades devem ser números válidos')
+
+    if quantidade_entregues < 0:
+        raise DadosInvalidos('Quantidade de entregas deve ser maior ou igual a zero')
+    if quantidade_nao_entregues < 0:
+        raise DadosInvalidos('Quantidade de não entregas deve ser maior ou igual a zero')
+
+    data_obj = parse_data(dados['data'])
+
+    try:
+        hora_inicio = parse_hora(dados['hora_inicio'])
+        hora_fim = parse_hora(dados['hora_fim'])
+    except DadosInvalidos:
+        logger.warning(f"Erro nas horas: {dados['hora_inicio']} - {dados['hora_fim']}")
+        raise
+
+    return {
+        'data': data_obj,
+        'hora_inicio': hora_inicio,
+        'hora_fim': hora_fim,
+        'quantidade_entregues': quantidade_entregues,
+        'quantidade_nao_entregues': quantidade_nao_entregues,
+        'tipo_pagamento': dados['tipo_pagamento'],
+        'valor': parse_valor(dados['valor']),
+    }
+
+
+def dados_registro_trabalho(registro):
+    """
+    Valores atuais de um RegistroTrabalho no formato de entrada, usados para
+    completar atualizações parciais antes de validar
+    """
+    return {
+        'data': registro.data.isoformat(),
+        'hora_inicio': registro.hora_inicio.strftime('%H:%M') if registro.hora_inicio else None,
+        'hora_fim': registro.hora_fim.strftime('%H:%M') if registro.hora_fim else None,
+        'quantidade_entregues': registro.quantidade_entregues,
+        'quantidade_nao_entregues': registro.quantidade_nao_entregues,
+        'tipo_pagamento': registro.tipo_pagamento,
+        'valor': registro.valor,
+    }
+
+
+def carregar_categorias(entregador):
+    """Categorias personalizadas ativas do entregador indexadas pelo nome"""
+    return {
+        categoria.nome: categoria
+        for categoria in CategoriaDespesa.objects.filter(entregador=entregador, ativa=True)
+    }
+
+
+def validar_despesa(dados, entregador, categorias=None):
+    """
+    Valida os dados de uma despesa
+
+    Args:
+        dados: Payload recebido
+        entregador: Dono da despesa
+        categorias: Resultado de carregar_categorias() (evita uma consulta
+            por item quando várias despesas são validadas juntas)
+
+    Returns:
+        dict: Campos prontos para Despesa (sem o entregador)
+
+    Raises:
+        DadosInvalidos: Com a mensagem do primeiro problema encontrado
+    """
+    for campo in CAMPOS_OBRIGATORIOS_DESPESA:
+        if campo not in dados or not dados[campo]:
+            logger.warning(f"Campo obrigatório faltando: {campo}")
+            raise DadosInvalidos(f'Campo obrigatorio nao informado: {campo}')
+
+    data_obj = parse_data(dados['data'])
+
+    valor = parse_valor(dados['valor'])
+    if valor <= 0:
+        logger.warning(f"Valor inválido: {valor}")
+        raise DadosInvalidos('Valor deve ser maior que zero')
+
+    # Verificar se é categoria personalizada
+    categoria_personalizada = None
+    nome_categoria = dados.get('categoria_personalizada')
+    if isinstance(nome_categoria, CategoriaDespesa):
+        # Categoria atual de uma despesa sendo atualizada (ver dados_despesa)
+        categoria_personalizada = nome_categoria
+    elif nome_categoria:
+        if categorias is None:
+            categoria_personalizada = CategoriaDespesa.objects.filter(
+                nome=nome_categoria,
+                entregador=entregador,
+                ativa=True
+            ).first()
+        else:
+            categoria_personalizada = categorias.get(nome_categoria)
+        if categoria_personalizada is None:
+            logger.warning(f"Categoria personalizada não encontrada: {nome_categoria}")
+
+    return {
+        'tipo_despesa': dados['tipo_despesa'],
+        'categoria_personalizada': categoria_personalizada,
+        'descricao': dados['descricao'],
+        'valor': valor,
+        'data': data_obj,
+    }
+
+
+def dados_despesa(despesa):
+    """
+    Valores atuais de uma Despesa no formato de entrada (ver dados_registro_trabalho).
+
+    A categoria personalizada vai como instância, não pelo nome: carregar_categorias
+    só conhece as ativas, e uma atualização que não mexe na categoria não deve
+    perder a categoria atual só porque ela foi desativada
+    """
+    return {
+        'tipo_despesa': despesa.tipo_despesa,
+        'categoria_personalizada': despesa.categoria_personalizada,
+        'descricao': despesa.descricao,
+        'valor': despesa.valor,
+        'data': despesa.data.isoformat(),
+    }
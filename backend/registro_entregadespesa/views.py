@@ -4,8 +4,10 @@ Views para registro de entregas, trabalho e despesas
 import json
 import logging
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
@@ -16,9 +18,91 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
 from .models import RegistroEntregaDespesa, RegistroTrabalho, Despesa, CategoriaDespesa
+from .lote_service import LoteService
+from .pagination import ParametroInvalido, filtrar_since, lista_completa_solicitada, paginar_por_cursor
+from .sync_service import SyncService
+from .validacao import DadosInvalidos, validar_registro_trabalho, validar_despesa
+from relatorios_dashboard.cache_service import cache_relatorio
+from relatorios_dashboard.report_service import ContextoRelatorio, PeriodoInvalido, validador_relatorio
+from relatorios_dashboard.secoes_service import dados_dashboard
+from sistema.condicional import get_condicional, validador_entregador
 from usuarios.models import Entregador
 
 logger = logging.getLogger(__name__)
+
+# Campos projetados nas listagens (evita instanciar os modelos)
+CAMPOS_LISTA_TRABALHO = (
+    'id', 'data', 'hora_inicio', 'hora_fim', 'quantidade_entregues',
+    'quantidade_nao_entregues', 'tipo_pagamento', 'valor',
+)
+CAMPOS_LISTA_DESPESA = (
+    'id', 'data', 'tipo_despesa', 'descricao', 'valor', 'categoria_personalizada__nome',
+)
+TIPOS_DESPESA_DISPLAY = dict(Despesa.CATEGORIA_CHOICES)
+
+
+def _serializar_registro_trabalho(linha):
+    """Formata uma linha de RegistroTrabalho.values() para a listagem"""
+    return {
+        'id': linha['id'],
+        'data': linha['data'].strftime('%d/%m/%Y'),
+        'hora_inicio': str(linha['hora_inicio']),
+        'hora_fim': str(linha['hora_fim']),
+        'quantidade_entregues': linha['quantidade_entregues'],
+        'quantidade_nao_entregues': linha['quantidade_nao_entregues'],
+        'tipo_pagamento': linha['tipo_pagamento'],
+        'valor': float(linha['valor']),
+        'total_pacotes': linha['quantidade_entregues'] + linha['quantidade_nao_entregues'],
+        'pacotes_entregues': linha['quantidade_entregues'],
+        'pacotes_nao_entregues': linha['quantidade_nao_entregues'],
+        'ganho': float(linha['valor']),
+        'lucro': float(linha['valor'])  # Para compatibilidade com o frontend
+    }
+
+
+def _serializar_despesa(linha):
+    """Formata uma linha de Despesa.values() para a listagem"""
+    categoria_display = (
+        linha['categoria_personalizada__nome']
+        or TIPOS_DESPESA_DISPLAY.get(linha['tipo_despesa'], linha['tipo_despesa'])
+    )
+    return {
+        'id': linha['id'],
+        'tipo_despesa': linha['tipo_despesa'],
+        'categoria_display': categoria_display,
+        'descricao': linha['descricao'],
+        'valor': float(linha['valor']),
+        'data': linha['data'].strftime('%d/%m/%Y'),
+        'categoria_despesa': categoria_display,  # Para compatibilidade com frontend
+        'valor_despesa': float(linha['valor']),  # Para compatibilidade com frontend
+        'descricao_outros': linha['descricao'] if linha['tipo_despesa'] == 'outros' else None
+    }
+
+
+def _validador_registros_trabalho(request):
+    """Validador da listagem de registros de trabalho (GET condicional)"""
+    return validador_entregador(
+        request.user,
+        RegistroTrabalho.objects.all(),
+        escopo=(sorted(request.GET.lists()),)
+    )
+
+
+def _validador_despesas(request):
+    """Validador da listagem de despesas (o nome das categorias aparece na lista)"""
+    return validador_entregador(
+        request.user,
+        Despesa.objects.all(),
+        CategoriaDespesa.objects.all(),
+        escopo=(sorted(request.GET.lists()),)
+    )
+
+
+def _validador_categorias(request):
+    """Validador da listagem de categorias ativas"""
+    return validador_entregador(request.user, CategoriaDespesa.objects.filter(ativa=True))
+
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def registro_trabalho_detail(request, registro_id):
@@ -102,6 +186,64 @@ def registro_despesa_detail(request, despesa_id):
         }
     })
 
+def _gravar_lote(request, modelo):
+    """
+    Corpo comum dos endpoints em lote: POST cria, PUT/PATCH atualiza.
+    Aceita uma lista ou {"registros": [...]}. O `client_id` de cada item
+    volta no resultado correspondente.
+    """
+    itens = request.data
+    if isinstance(itens, dict):
+        itens = itens.get('registros')
+    if not isinstance(itens, list) or not itens:
+        return Response({
+            'success': False,
+            'error': 'Envie uma lista de registros'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    limite = LoteService.limite()
+    if len(itens) > limite:
+        return Response({
+            'success': False,
+            'error': f'Máximo de {limite} registros por lote'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if request.method == 'POST':
+            resultados = LoteService.criar(request.user, modelo, itens)
+            status_sucesso = status.HTTP_201_CREATED
+        else:
+            resultados = LoteService.atualizar(request.user, modelo, itens)
+            status_sucesso = status.HTTP_200_OK
+    except Exception as e:
+        logger.error(f"Erro na gravação em lote: {str(e)}", exc_info=True)
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    gravados = sum(1 for resultado in resultados if resultado['success'])
+    return Response({
+        'success': gravados > 0,
+        'gravados': gravados,
+        'erros': len(resultados) - gravados,
+        'resultados': resultados
+    }, status=status_sucesso if gravados else status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST', 'PUT', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def registro_trabalho_lote(request):
+    """Cria (POST) ou atualiza (PUT/PATCH) vários registros de trabalho de uma vez"""
+    return _gravar_lote(request, RegistroTrabalho)
+
+
+@api_view(['POST', 'PUT', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def registro_despesa_lote(request):
+    """Cria (POST) ou atualiza (PUT/PATCH) várias despesas de uma vez"""
+    return _gravar_lote(request, Despesa)
+
 @csrf_exempt
 def registro_entrega_despesa(request):
     if request.method == 'POST':
@@ -116,6 +258,7 @@ def registro_entrega_despesa(request):
 
 @api_view(['POST', 'GET'])
 @permission_classes([IsAuthenticated])
+@get_condicional(_validador_registros_trabalho)
 def registro_trabalho(request):
     logger.info(f"Registro trabalho chamado - Método: {request.method}, URL: {request.path}")
     
@@ -124,101 +267,21 @@ def registro_trabalho(request):
             data = request.data
             logger.debug(f"Dados recebidos: {data}")
             
-            # Validar dados obrigatórios
-            campos_obrigatorios = ['data', 'hora_inicio', 'hora_fim', 'quantidade_entregues', 
-                                  'tipo_pagamento', 'valor']
-            
-            # Validar campos obrigatórios (exceto quantidade_nao_entregues que pode ser 0)
-            for campo in campos_obrigatorios:
-                if campo not in data or (data[campo] is None and campo != 'quantidade_nao_entregues'):
-                    logger.warning(f"Campo obrigatório faltando: {campo}")
-                    return Response({
-                        'success': False, 
-                        'error': f'Campo obrigatorio nao informado: {campo}'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Validar quantidade_nao_entregues separadamente (pode ser 0)
-            if 'quantidade_nao_entregues' not in data:
-                logger.warning("Campo obrigatório faltando: quantidade_nao_entregues")
-                return Response({
-                    'success': False, 
-                    'error': 'Campo obrigatorio nao informado: quantidade_nao_entregues'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Validar se as quantidades são números válidos
-            try:
-                quantidade_entregues = int(data['quantidade_entregues'])
-                quantidade_nao_entregues = int(data['quantidade_nao_entregues'])
-                
-                if quantidade_entregues < 0:
-                    return Response({
-                        'success': False, 
-                        'error': 'Quantidade de entregas deve ser maior ou igual a zero'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                if quantidade_nao_entregues < 0:
-                    return Response({
-                        'success': False, 
-                        'error': 'Quantidade de não entregas deve ser maior ou igual a zero'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                    
-            except (ValueError, TypeError):
-                return Response({
-                    'success': False, 
-                    'error': 'Quantidades devem ser números válidos'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
             # Usar o usuário autenticado
             user = request.user
             logger.debug(f"Entregador autenticado: {user.nome}")
             
-            # Validar formato da data
+            # Validar dados (campos obrigatórios, quantidades, data e horas)
             try:
-                from datetime import datetime
-                
-                # Tentar formato brasileiro primeiro (DD/MM/YYYY)
-                try:
-                    data_obj = datetime.strptime(data['data'], '%d/%m/%Y').date()
-                except ValueError:
-                    # Tentar formato internacional (YYYY-MM-DD)
-                    try:
-                        data_obj = datetime.strptime(data['data'], '%Y-%m-%d').date()
-                    except ValueError:
-                        # Tentar outros formatos comuns
-                        try:
-                            data_obj = datetime.strptime(data['data'], '%d-%m-%Y').date()
-                        except ValueError:
-                            raise ValueError(f"Formato de data inválido: {data['data']}. Use DD/MM/YYYY ou YYYY-MM-DD")
-                
-            except ValueError as e:
-                logger.warning(f"Erro na data: {data['data']}")
+                campos = validar_registro_trabalho(data)
+            except DadosInvalidos as e:
                 return Response({
                     'success': False, 
                     'error': str(e)
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Validar formato das horas
-            try:
-                hora_inicio = datetime.strptime(data['hora_inicio'], '%H:%M').time()
-                hora_fim = datetime.strptime(data['hora_fim'], '%H:%M').time()
-            except ValueError:
-                logger.warning(f"Erro nas horas: {data['hora_inicio']} - {data['hora_fim']}")
-                return Response({
-                    'success': False, 
-                    'error': 'Formato de hora invalido. Use HH:MM'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
             # Criar registro de trabalho
-            registro = RegistroTrabalho.objects.create(
-                data=data_obj,
-                hora_inicio=hora_inicio,
-                hora_fim=hora_fim,
-                quantidade_entregues=quantidade_entregues,
-                quantidade_nao_entregues=quantidade_nao_entregues,
-                tipo_pagamento=data['tipo_pagamento'],
-                valor=float(data['valor']),
-                entregador=user
-            )
+            registro = RegistroTrabalho.objects.create(entregador=user, **campos)
             
             logger.info(f"Registro criado com sucesso! ID: {registro.id}")
             
@@ -235,33 +298,31 @@ def registro_trabalho(request):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     elif request.method == 'GET':
-        # Listar registros do usuário
+        # Listar registros do usuário (paginado por cursor; ?completo=true devolve tudo)
         try:
-            registros = RegistroTrabalho.objects.filter(entregador=request.user).order_by('-data', '-hora_inicio')
-            
-            registros_data = []
-            for registro in registros:
-                registros_data.append({
-                    'id': registro.id,
-                    'data': registro.data.strftime('%d/%m/%Y'),
-                    'hora_inicio': str(registro.hora_inicio),
-                    'hora_fim': str(registro.hora_fim),
-                    'quantidade_entregues': registro.quantidade_entregues,
-                    'quantidade_nao_entregues': registro.quantidade_nao_entregues,
-                    'tipo_pagamento': registro.tipo_pagamento,
-                    'valor': float(registro.valor),
-                    'total_pacotes': registro.quantidade_entregues + registro.quantidade_nao_entregues,
-                    'pacotes_entregues': registro.quantidade_entregues,
-                    'pacotes_nao_entregues': registro.quantidade_nao_entregues,
-                    'ganho': float(registro.valor),
-                    'lucro': float(registro.valor)  # Para compatibilidade com o frontend
-                })
+            registros = RegistroTrabalho.objects.filter(entregador=request.user).values(*CAMPOS_LISTA_TRABALHO)
+            registros = filtrar_since(registros, request.GET)
+            
+            if lista_completa_solicitada(request.GET):
+                linhas = registros.order_by('-data', '-hora_inicio')
+                proximo_cursor = None
+            else:
+                linhas, proximo_cursor = paginar_por_cursor(registros, request.GET)
+            
+            registros_data = [_serializar_registro_trabalho(linha) for linha in linhas]
             
             return Response({
                 'success': True,
                 'results': registros_data,
-                'count': len(registros_data)
+                'count': len(registros_data),
+                'next_cursor': proximo_cursor,
+                'has_more': proximo_cursor is not None
             })
+        except ParametroInvalido as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Erro ao listar registros: {str(e)}", exc_info=True)
             return Response({
@@ -278,6 +339,7 @@ def registro_trabalho(request):
 
 @api_view(['POST', 'GET'])
 @permission_classes([IsAuthenticated])
+@get_condicional(_validador_despesas)
 def registro_despesa(request):
     logger.info(f"Registro despesa chamado - Método: {request.method}, URL: {request.path}")
     
@@ -286,83 +348,21 @@ def registro_despesa(request):
             data = request.data
             logger.debug(f"Dados recebidos: {data}")
             
-            # Validar dados obrigatórios
-            campos_obrigatorios = ['tipo_despesa', 'descricao', 'valor', 'data']
-            
-            for campo in campos_obrigatorios:
-                if campo not in data or not data[campo]:
-                    logger.warning(f"Campo obrigatório faltando: {campo}")
-                    return Response({
-                        'success': False, 
-                        'error': f'Campo obrigatorio nao informado: {campo}'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            
             # Usar o usuário autenticado
             user = request.user
             logger.debug(f"Entregador autenticado: {user.nome}")
             
-            # Validar formato da data
+            # Validar dados (campos obrigatórios, data, valor e categoria personalizada)
             try:
-                from datetime import datetime
-                
-                # Tentar formato brasileiro primeiro (DD/MM/YYYY)
-                try:
-                    data_obj = datetime.strptime(data['data'], '%d/%m/%Y').date()
-                except ValueError:
-                    # Tentar formato internacional (YYYY-MM-DD)
-                    try:
-                        data_obj = datetime.strptime(data['data'], '%Y-%m-%d').date()
-                    except ValueError:
-                        # Tentar outros formatos comuns
-                        try:
-                            data_obj = datetime.strptime(data['data'], '%d-%m-%Y').date()
-                        except ValueError:
-                            raise ValueError(f"Formato de data inválido: {data['data']}. Use DD/MM/YYYY ou YYYY-MM-DD")
-                
-            except ValueError as e:
-                logger.warning(f"Erro na data: {data['data']}")
+                campos = validar_despesa(data, user)
+            except DadosInvalidos as e:
                 return Response({
                     'success': False, 
                     'error': str(e)
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Validar valor
-            try:
-                valor = float(data['valor'])
-                if valor <= 0:
-                    logger.warning(f"Valor inválido: {valor}")
-                    return Response({
-                        'success': False, 
-                        'error': 'Valor deve ser maior que zero'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            except ValueError:
-                logger.warning(f"Erro no valor: {data['valor']}")
-                return Response({
-                    'success': False, 
-                    'error': 'Valor invalido'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Verificar se é categoria personalizada
-            categoria_personalizada = None
-            if 'categoria_personalizada' in data and data['categoria_personalizada']:
-                try:
-                    categoria_personalizada = CategoriaDespesa.objects.get(
-                        nome=data['categoria_personalizada'],
-                        entregador=user,
-                        ativa=True
-                    )
-                except CategoriaDespesa.DoesNotExist:
-                    logger.warning(f"Categoria personalizada não encontrada: {data['categoria_personalizada']}")
-            
             # Criar registro de despesa
-            despesa = Despesa.objects.create(
-                tipo_despesa=data['tipo_despesa'],
-                categoria_personalizada=categoria_personalizada,
-                descricao=data['descricao'],
-                valor=valor,
-                data=data_obj,
-                entregador=user
-            )
+            despesa = Despesa.objects.create(entregador=user, **campos)
             
             logger.info(f"Despesa criada com sucesso! ID: {despesa.id}")
             
@@ -378,30 +378,31 @@ def registro_despesa(request):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     elif request.method == 'GET':
-        # Listar despesas do usuário
+        # Listar despesas do usuário (paginado por cursor; ?completo=true devolve tudo)
         try:
-            despesas = Despesa.objects.filter(entregador=request.user).order_by('-data')
-            
-            despesas_data = []
-            for despesa in despesas:
-                categoria_display = despesa.categoria_display
-                despesas_data.append({
-                    'id': despesa.id,
-                    'tipo_despesa': despesa.tipo_despesa,
-                    'categoria_display': categoria_display,
-                    'descricao': despesa.descricao,
-                    'valor': float(despesa.valor),
-                    'data': despesa.data.strftime('%d/%m/%Y'),
-                    'categoria_despesa': categoria_display,  # Para compatibilidade com frontend
-                    'valor_despesa': float(despesa.valor),  # Para compatibilidade com frontend
-                    'descricao_outros': despesa.descricao if despesa.tipo_despesa == 'outros' else None
-                })
+            despesas = Despesa.objects.filter(entregador=request.user).values(*CAMPOS_LISTA_DESPESA)
+            despesas = filtrar_since(despesas, request.GET)
+            
+            if lista_completa_solicitada(request.GET):
+                linhas = despesas.order_by('-data')
+                proximo_cursor = None
+            else:
+                linhas, proximo_cursor = paginar_por_cursor(despesas, request.GET)
+            
+            despesas_data = [_serializar_despesa(linha) for linha in linhas]
             
             return Response({
                 'success': True,
                 'results': despesas_data,
-                'count': len(despesas_data)
+                'count': len(despesas_data),
+                'next_cursor': proximo_cursor,
+                'has_more': proximo_cursor is not None
             })
+        except ParametroInvalido as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Erro ao listar despesas: {str(e)}", exc_info=True)
             return Response({
@@ -418,13 +419,11 @@ def registro_despesa(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@get_condicional(validador_relatorio)
+@cache_relatorio('dashboard')
 def dashboard_data(request):
     if request.method == 'GET':
         try:
-            from datetime import datetime, timedelta
-            from django.utils import timezone
-            from django.db.models import Sum, Count, Q
-            
             # Debug: verificar autenticação
             logger.debug(f"Usuário autenticado: {request.user.email}")
             
@@ -439,267 +438,18 @@ def dashboard_data(request):
             
             logger.debug(f"Usuário validado: {user.nome}")
             
-            # Parâmetros de período e filtros de data
-            periodo = request.GET.get('periodo', 'mes')
-            data_inicio_param = request.GET.get('data_inicio')
-            data_fim_param = request.GET.get('data_fim')
-            
-            # Calcular datas base
-            hoje = timezone.now().date()
-            
-            if data_inicio_param and data_fim_param:
-                # Filtro personalizado por data
-                from datetime import date
-                data_inicio = date.fromisoformat(data_inicio_param)
-                data_fim = date.fromisoformat(data_fim_param)
-                logger.debug(f"Filtro personalizado: {data_inicio} até {data_fim}")
-            else:
-                # Período automático
-                if periodo == 'semana':
-                    data_inicio = hoje - timedelta(days=7)
-                else:  # mês
-                    data_inicio = hoje - timedelta(days=30)
-                data_fim = hoje
-                logger.debug(f"Período automático: {data_inicio} até {data_fim}")
-            
-            # Filtrar registros por período e pelo entregador autenticado
-            registros_trabalho = RegistroTrabalho.objects.filter(
-                entregador=user,
-                data__gte=data_inicio,
-                data__lte=data_fim
-            )
-            
-            despesas = Despesa.objects.filter(
-                entregador=user,
-                data__gte=data_inicio,
-                data__lte=data_fim
-            )
-            
-            logger.debug(f"Registros encontrados: {registros_trabalho.count()}, Despesas: {despesas.count()}")
-            
-            # Dados do período selecionado
-            total_entregas_realizadas = registros_trabalho.aggregate(
-                total=Sum('quantidade_entregues')
-            )['total'] or 0
-            
-            total_entregas_nao_realizadas = registros_trabalho.aggregate(
-                total=Sum('quantidade_nao_entregues')
-            )['total'] or 0
-            
-            total_ganhos = registros_trabalho.aggregate(
-                total=Sum('valor')
-            )['total'] or 0
-            
-            total_despesas = despesas.aggregate(
-                total=Sum('valor')
-            )['total'] or 0
-            
-            lucro_liquido = total_ganhos - total_despesas
-            dias_trabalhados = registros_trabalho.count()
-            
-            # Dados do período filtrado (se for um dia específico, será "hoje")
-            registros_hoje = RegistroTrabalho.objects.filter(
-                entregador=user,
-                data=data_fim
-            )
-            
-            entregas_hoje = registros_hoje.aggregate(
-                total=Sum('quantidade_entregues')
-            )['total'] or 0
-            
-            nao_entregas_hoje = registros_hoje.aggregate(
-                total=Sum('quantidade_nao_entregues')
-            )['total'] or 0
-            
-            ganhos_hoje = registros_hoje.aggregate(
-                total=Sum('valor')
-            )['total'] or 0
-            
-            despesas_hoje = Despesa.objects.filter(
-                entregador=user,
-                data=data_fim
-            ).aggregate(
-                total=Sum('valor')
-            )['total'] or 0
-            
-            lucro_hoje = ganhos_hoje - despesas_hoje
-            
-            # Dados para gráficos - Entregas por dia da semana
-            from django.db.models import Sum
-            from datetime import datetime, timedelta
-            
-            # Calcular entregas por dia da semana (últimos 7 dias)
-            entregas_por_dia = []
-            dias_semana = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-            
-            for i in range(7):
-                data_dia = hoje - timedelta(days=6-i)
-                registros_dia = registros_trabalho.filter(data=data_dia)
-                total_entregas_dia = registros_dia.aggregate(total=Sum('quantidade_entregues'))['total'] or 0
-                total_ganho_dia = registros_dia.aggregate(total=Sum('valor'))['total'] or 0
-                
-                entregas_por_dia.append({
-                    'dia': dias_semana[data_dia.weekday()],
-                    'entregas': total_entregas_dia,
-                    'ganho': float(total_ganho_dia)
-                })
-            
-            # Dados para gráfico de ganhos por semana (últimas 4 semanas)
-            ganhos_por_semana = []
-            for i in range(4):
-                semana_inicio = hoje - timedelta(days=(i+1)*7)
-                semana_fim = hoje - timedelta(days=i*7)
-                
-                registros_semana = registros_trabalho.filter(
-                    data__gte=semana_inicio,
-                    data__lt=semana_fim
-                )
-                despesas_semana = despesas.filter(
-                    data__gte=semana_inicio,
-                    data__lt=semana_fim
-                )
-                
-                ganho_semana = registros_semana.aggregate(total=Sum('valor'))['total'] or 0
-                despesa_semana = despesas_semana.aggregate(total=Sum('valor'))['total'] or 0
-                
-                ganhos_por_semana.append({
-                    'semana': f'Sem {4-i}',
-                    'ganho': float(ganho_semana),
-                    'despesa': float(despesa_semana)
-                })
-            
-            # Dados para performance mensal (últimos 6 meses)
-            performance_mensal = []
-            meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-            
-            for i in range(6):
-                # Calcular início e fim do mês
-                if hoje.month - i <= 0:
-                    mes = 12 + (hoje.month - i)
-                    ano = hoje.year - 1
-                else:
-                    mes = hoje.month - i
-                    ano = hoje.year
-                
-                # Primeiro dia do mês
-                mes_inicio = datetime(ano, mes, 1).date()
-                # Último dia do mês
-                if mes == 12:
-                    mes_fim = datetime(ano + 1, 1, 1).date() - timedelta(days=1)
-                else:
-                    mes_fim = datetime(ano, mes + 1, 1).date() - timedelta(days=1)
-                
-                registros_mes = registros_trabalho.filter(
-                    data__gte=mes_inicio,
-                    data__lte=mes_fim
-                )
-                
-                entregas_mes = registros_mes.aggregate(total=Sum('quantidade_entregues'))['total'] or 0
-                ganho_mes = registros_mes.aggregate(total=Sum('valor'))['total'] or 0
-                
-                performance_mensal.append({
-                    'mes': meses_nomes[mes-1],
-                    'entregas': entregas_mes,
-                    'ganho': float(ganho_mes)
-                })
-            
-            # Distribuição de veículos
+            # Período resolvido uma única vez (contexto compartilhado dos relatórios)
             try:
-                from cadastro_veiculo.models import Veiculo
-                
-                veiculos = Veiculo.objects.filter(entregador=user)
-                total_veiculos = veiculos.count()
-                logger.debug(f"Total de veículos: {total_veiculos}")
-                
-                distribuicao_veiculos = []
-                tipos_veiculos = {}
-                
-                for veiculo in veiculos:
-                    tipo = veiculo.tipo  # Campo correto do modelo
-                    if tipo in tipos_veiculos:
-                        tipos_veiculos[tipo] += 1
-                    else:
-                        tipos_veiculos[tipo] = 1
-                
-                
-                cores = ['#8884d8', '#82ca9d', '#ffc658', '#ff7300', '#00ff00']
-                for i, (tipo, quantidade) in enumerate(tipos_veiculos.items()):
-                    # Usar o display name do modelo
-                    nome_tipo = dict(Veiculo.TIPO_CHOICES).get(tipo, tipo.title())
-                    distribuicao_veiculos.append({
-                        'name': nome_tipo,
-                        'value': quantidade,
-                        'color': cores[i % len(cores)]
-                    })
-                
-            except ImportError as e:
-                logger.error(f"Erro ao importar modelo Veiculo: {e}", exc_info=True)
-                total_veiculos = 0
-                distribuicao_veiculos = []
-            except Exception as e:
-                logger.error(f"Erro ao buscar veículos: {e}", exc_info=True)
-                total_veiculos = 0
-                distribuicao_veiculos = []
-            
-            # Últimos registros para a tabela
-            ultimos_registros = []
-            for registro in registros_trabalho.order_by('-data', '-hora_inicio')[:5]:
-                # Buscar despesas do mesmo dia
-                despesas_dia = despesas.filter(data=registro.data).aggregate(total=Sum('valor'))['total'] or 0
-                lucro_dia = float(registro.valor) - float(despesas_dia)
-                
-                ultimos_registros.append({
-                    'data': registro.data.strftime('%d/%m/%Y'),
-                    'tipo_rendimento': 'unitario' if registro.tipo_pagamento == 'por_entrega' else 'diaria',
-                    'ganho': float(registro.valor),
-                    'despesa': float(despesas_dia),
-                    'lucro': lucro_dia
-                })
-            
-            # Calcular métricas adicionais
-            taxa_sucesso = 0
-            if total_entregas_realizadas + total_entregas_nao_realizadas > 0:
-                taxa_sucesso = (total_entregas_realizadas / (total_entregas_realizadas + total_entregas_nao_realizadas)) * 100
-            
-            ganho_medio_dia = 0
-            if dias_trabalhados > 0:
-                ganho_medio_dia = total_ganhos / dias_trabalhados
-
-            dashboard_data = {
-                # Resumo diário (hoje)
-                'resumo_diario': {
-                    'entregas_hoje': entregas_hoje,
-                    'nao_entregas_hoje': nao_entregas_hoje,
-                    'ganhos_hoje': float(ganhos_hoje),
-                    'despesas_hoje': float(despesas_hoje),
-                    'lucro_hoje': float(lucro_hoje)
-                },
-                
-                # Indicadores de performance (período selecionado)
-                'indicadores_performance': {
-                    'dias_trabalhados': dias_trabalhados,
-                    'entregas_realizadas': total_entregas_realizadas,
-                    'entregas_nao_realizadas': total_entregas_nao_realizadas,
-                    'ganho_total': float(total_ganhos),
-                    'despesas_total': float(total_despesas),
-                    'lucro_liquido': float(lucro_liquido),
-                    'taxa_sucesso': round(taxa_sucesso, 1),
-                    'ganho_medio_dia': round(ganho_medio_dia, 2),
-                    'veiculos_cadastrados': total_veiculos
-                },
-                
-                # Dados para gráficos
-                'entregas_por_dia': entregas_por_dia,
-                'ganhos_por_semana': ganhos_por_semana,
-                'performance_mensal': performance_mensal,
-                'distribuicao_veiculos': distribuicao_veiculos,
-                'ultimos_registros': ultimos_registros,
-                
-                'periodo': periodo,
-                'data_inicio': data_inicio.strftime('%d/%m/%Y'),
-                'data_fim': hoje.strftime('%d/%m/%Y')
-            }
-            
+                contexto = ContextoRelatorio.da_requisicao(request)
+            except PeriodoInvalido as e:
+                return Response({
+                    'success': False,
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Séries e indicadores montados pela seção compartilhada com o pacote
+            dashboard_data = dados_dashboard(contexto, request.GET.get('periodo', 'mes'))
+
             return Response({
                 'success': True,
                 'data': dashboard_data
@@ -719,6 +469,7 @@ def dashboard_data(request):
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@get_condicional(_validador_categorias)
 def categorias_despesas(request):
     """API para listar e criar categorias de despesas"""
     logger.info(f"Categorias despesas chamado - Método: {request.method}, URL: {request.path}")
@@ -916,3 +667,71 @@ def categoria_despesa_detail(request, categoria_id):
         }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def sincronizar(request):
+    """
+    Sincronização incremental do app offline.
+
+    GET  ?watermark=<ISO>: alterações e exclusões desde o watermark
+    POST {"watermark": ..., "mutacoes": [...]}: aplica as mutações e devolve
+         o resultado de cada uma junto com as alterações
+
+    Sem watermark (ou com watermark mais antigo que a retenção dos tombstones)
+    a resposta traz todos os registros e `completo: true`; o cliente deve então
+    substituir a base local. O `watermark` da resposta é o próximo a enviar.
+    """
+    user = request.user
+    # Capturado antes de ler/alterar qualquer coisa: o que mudar durante esta
+    # requisição volta na próxima sincronização
+    novo_watermark = timezone.now()
+
+    if request.method == 'GET':
+        watermark = request.GET.get('watermark')
+        mutacoes = []
+    else:
+        watermark = request.data.get('watermark')
+        mutacoes = request.data.get('mutacoes') or []
+
+    try:
+        desde = SyncService.parse_watermark(watermark)
+    except DadosInvalidos as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if not isinstance(mutacoes, list):
+        return Response({
+            'success': False,
+            'error': 'mutacoes deve ser uma lista'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    limite = getattr(settings, 'SYNC_MAX_MUTACOES', 500)
+    if len(mutacoes) > limite:
+        return Response({
+            'success': False,
+            'error': f'Máximo de {limite} mutações por sincronização'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        resultados = SyncService.aplicar_mutacoes(request, mutacoes) if mutacoes else []
+        dados = SyncService.coletar_alteracoes(user, desde)
+
+        logger.debug(f"Sync usuário {user.id}: {len(mutacoes)} mutações, completo={dados['completo']}")
+
+        return Response({
+            'success': True,
+            'watermark': novo_watermark.isoformat(),
+            'resultados': resultados,
+            **dados
+        })
+    except Exception as e:
+        logger.error(f"Erro na sincronização: {str(e)}", exc_info=True)
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
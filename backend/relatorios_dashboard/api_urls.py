@@ -7,6 +7,7 @@ urlpatterns = [
     path('relatorios/estatisticas/', api_views.EstatisticasUsuarioView.as_view(), name='estatisticas_usuario'),
     path('relatorios/trabalho/', api_views.relatorio_trabalho, name='relatorio_trabalho'),
     path('relatorios/despesas/', api_views.relatorio_despesas, name='relatorio_despesas'),
+    path('relatorios/pacote/', api_views.pacote_inicio, name='pacote_inicio'),
 ]
 
 
@@ -7,98 +7,29 @@ from rest_framework import permissions, status
 from django.db import models
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.utils.decorators import method_decorator
 
+from sistema.condicional import get_condicional
+from .cache_service import cache_relatorio
+from .report_service import ContextoRelatorio, PeriodoInvalido, validador_relatorio
+from .secoes_service import (
+    AGRUPAMENTOS_DESPESAS, PacoteService, dados_despesas, dados_estatisticas, dados_trabalho,
+    etags_conhecidas,
+)
 
+
+@method_decorator(get_condicional(validador_relatorio), name='get')
+@method_decorator(cache_relatorio('estatisticas'), name='get')
 class EstatisticasUsuarioView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         try:
-            user = request.user
-            
-            # Obter parâmetros de filtro
-            periodo = request.GET.get('periodo', 'mes')
-            data_inicio = request.GET.get('data_inicio')
-            data_fim = request.GET.get('data_fim')
-            
-            from datetime import timedelta, date
-            from django.utils import timezone
-            
-            # Definir período baseado nos parâmetros
-            hoje = timezone.now().date()
-            
-            if data_inicio and data_fim:
-                # Período personalizado
-                data_inicio_filtro = date.fromisoformat(data_inicio)
-                data_fim_filtro = date.fromisoformat(data_fim)
-            else:
-                # Período automático
-                if periodo == 'semana':
-                    data_inicio_filtro = hoje - timedelta(days=7)
-                    data_fim_filtro = hoje
-                elif periodo == 'ano':
-                    data_inicio_filtro = hoje - timedelta(days=365)
-                    data_fim_filtro = hoje
-                else:  # mês
-                    data_inicio_filtro = hoje - timedelta(days=30)
-                    data_fim_filtro = hoje
-
-            from cadastro_veiculo.models import Veiculo
-            veiculos_count = Veiculo.objects.filter(entregador=user).count()
-
-            from registro_entregadespesa.models import RegistroTrabalho, Despesa
-
-            # Filtrar registros por período
-            registros_trabalho = RegistroTrabalho.objects.filter(
-                entregador=user,
-                data__gte=data_inicio_filtro,
-                data__lte=data_fim_filtro
-            )
-            
-            registros_despesa = Despesa.objects.filter(
-                entregador=user,
-                data__gte=data_inicio_filtro,
-                data__lte=data_fim_filtro
-            )
-
-            total_entregas = (
-                registros_trabalho.aggregate(total=models.Sum('quantidade_entregues'))['total']
-                or 0
-            )
-
-            total_ganhos = 0
-            for registro in registros_trabalho:
-                total_ganhos += float(registro.valor)
-
-            total_despesas = sum(float(reg.valor) for reg in registros_despesa)
-
-            lucro_total = total_ganhos - total_despesas
-
-            dias_trabalhados = (
-                registros_trabalho.values('data').distinct().count()
-            )
-
-            if hasattr(user, 'date_joined') and user.date_joined:
-                data_primeiro_acesso = user.date_joined.date()
-                dias_conectado = (date.today() - data_primeiro_acesso).days
-            else:
-                dias_conectado = 0
-
-            return Response({
-                'totalEntregas': total_entregas,
-                'totalGanhos': round(total_ganhos, 2),
-                'totalDespesas': round(total_despesas, 2),
-                'lucroLiquido': round(lucro_total, 2),
-                'veiculosCadastrados': veiculos_count,
-                'diasTrabalhados': dias_trabalhados,
-                'diasConectado': dias_conectado,
-                'periodo': {
-                    'inicio': data_inicio_filtro.strftime('%Y-%m-%d'),
-                    'fim': data_fim_filtro.strftime('%Y-%m-%d')
-                },
-                'foto': user.foto.url if getattr(user, 'foto', None) else None
-            })
+            contexto = ContextoRelatorio.da_requisicao(request)
+            return Response(dados_estatisticas(contexto))
 
+        except PeriodoInvalido as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': f'Erro ao buscar estatísticas: {str(e)}'},
@@ -108,84 +39,15 @@ class EstatisticasUsuarioView(APIView):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@get_condicional(validador_relatorio)
+@cache_relatorio('trabalho')
 def relatorio_trabalho(request):
     if request.method == 'GET':
         try:
-            from datetime import timedelta
-            from django.utils import timezone
-            from django.db.models import Sum
-            from registro_entregadespesa.models import RegistroTrabalho
-
-            user = request.user
-            periodo = request.GET.get('periodo', 'mes')
-            data_inicio_param = request.GET.get('data_inicio')
-            data_fim_param = request.GET.get('data_fim')
-
-            hoje = timezone.now().date()
-            
-            if data_inicio_param and data_fim_param:
-                # Período personalizado
-                data_inicio = date.fromisoformat(data_inicio_param)
-                data_fim = date.fromisoformat(data_fim_param)
-            else:
-                # Período automático
-                if periodo == 'semana':
-                    data_inicio = hoje - timedelta(days=7)
-                elif periodo == 'ano':
-                    data_inicio = hoje - timedelta(days=365)
-                else:
-                    data_inicio = hoje - timedelta(days=30)
-                data_fim = hoje
-
-            registros_trabalho = (
-                RegistroTrabalho.objects.filter(
-                    entregador=user,
-                    data__gte=data_inicio,
-                    data__lte=data_fim
-                ).order_by('data')
-            )
-
-            total_dias = registros_trabalho.count()
-            total_entregas = registros_trabalho.aggregate(total=Sum('quantidade_entregues'))['total'] or 0
-
-            entregas_realizadas = registros_trabalho.aggregate(total=Sum('quantidade_entregues'))['total'] or 0
-            entregas_nao_realizadas = registros_trabalho.aggregate(total=Sum('quantidade_nao_entregues'))['total'] or 0
-            ganho_total = registros_trabalho.aggregate(total=Sum('valor'))['total'] or 0
-
-            media_entregas_dia = entregas_realizadas / max(total_dias, 1)
-
-            dias_com_entregas = registros_trabalho.filter(quantidade_entregues__gt=0)
-            if dias_com_entregas.exists():
-                melhor_dia_obj = dias_com_entregas.order_by('-quantidade_entregues').first()
-                pior_dia_obj = dias_com_entregas.order_by('quantidade_entregues').first()
-                melhor_dia = melhor_dia_obj.data.strftime('%d/%m/%Y') if melhor_dia_obj else 'N/A'
-                pior_dia = pior_dia_obj.data.strftime('%d/%m/%Y') if pior_dia_obj else 'N/A'
-            else:
-                melhor_dia = 'N/A'
-                pior_dia = 'N/A'
-
-            dias_trabalhados = []
-            for registro in registros_trabalho:
-                dias_trabalhados.append({
-                    'id': registro.id,
-                    'data': registro.data.strftime('%Y-%m-%d'),
-                    'entregas': registro.quantidade_entregues,
-                    'ganho': float(registro.valor)
-                })
-
-            relatorio_data = {
-                'total_dias': total_dias,
-                'total_entregas': total_entregas,
-                'entregas_realizadas': entregas_realizadas,
-                'entregas_nao_realizadas': entregas_nao_realizadas,
-                'ganho_total': float(ganho_total),
-                'media_entregas_dia': float(media_entregas_dia),
-                'melhor_dia': melhor_dia,
-                'pior_dia': pior_dia,
-                'dias_trabalhados': dias_trabalhados
-            }
-
-            return Response({'success': True, 'data': relatorio_data})
+            contexto = ContextoRelatorio.da_requisicao(request)
+            return Response({'success': True, 'data': dados_trabalho(contexto)})
+        except PeriodoInvalido as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -194,95 +56,61 @@ def relatorio_trabalho(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@get_condicional(validador_relatorio)
+@cache_relatorio('despesas', parametros=('agrupar',))
 def relatorio_despesas(request):
     if request.method == 'GET':
         try:
-            from datetime import timedelta
-            from django.utils import timezone
-            from django.db.models import Sum
-            from registro_entregadespesa.models import Despesa
-
-            user = request.user
-            periodo = request.GET.get('periodo', 'mes')
-            data_inicio_param = request.GET.get('data_inicio')
-            data_fim_param = request.GET.get('data_fim')
-
-            hoje = timezone.now().date()
-            
-            if data_inicio_param and data_fim_param:
-                # Período personalizado
-                data_inicio = date.fromisoformat(data_inicio_param)
-                data_fim = date.fromisoformat(data_fim_param)
-            else:
-                # Período automático
-                if periodo == 'semana':
-                    data_inicio = hoje - timedelta(days=7)
-                elif periodo == 'ano':
-                    data_inicio = hoje - timedelta(days=365)
-                else:
-                    data_inicio = hoje - timedelta(days=30)
-                data_fim = hoje
-
-            despesas = (
-                Despesa.objects.filter(
-                    entregador=user,
-                    data__gte=data_inicio,
-                    data__lte=data_fim
-                ).order_by('data')
-            )
-
-            total_despesas = despesas.aggregate(total=Sum('valor'))['total'] or 0
-            dias_periodo = (data_fim - data_inicio).days + 1
-            media_despesas_dia = total_despesas / max(dias_periodo, 1)
-
-            maior_despesa_obj = despesas.order_by('-valor').first()
-            maior_despesa = float(maior_despesa_obj.valor) if maior_despesa_obj else 0
-
-            categoria_mapping = {
-                'alimentacao': 'Alimentação',
-                'combustivel': 'Combustível',
-                'manutencao': 'Manutenção',
-                'pedagio': 'Pedágio',
-                'estacionamento': 'Estacionamento',
-                'seguro': 'Seguro',
-                'licenciamento': 'Licenciamento',
-                'outros': 'Outros'
-            }
-
-            despesas_por_categoria = []
-            categorias = despesas.values('tipo_despesa').distinct()
-            for categoria in categorias:
-                cat_key = categoria['tipo_despesa']
-                cat_nome = categoria_mapping.get(cat_key, cat_key)
-                total_cat = despesas.filter(tipo_despesa=cat_key).aggregate(total=Sum('valor'))['total'] or 0
-                despesas_por_categoria.append({'nome': cat_nome, 'total': float(total_cat)})
-
-            despesas_por_categoria.sort(key=lambda x: x['total'], reverse=True)
-            categoria_mais_cara = despesas_por_categoria[0]['nome'] if despesas_por_categoria else 'N/A'
-
-            despesas_por_dia = []
-            for despesa in despesas:
-                despesas_por_dia.append({
-                    'id': despesa.id,
-                    'data': despesa.data.strftime('%Y-%m-%d'),
-                    'categoria': categoria_mapping.get(despesa.tipo_despesa, despesa.tipo_despesa),
-                    'valor': float(despesa.valor),
-                    'descricao': despesa.descricao or ''
-                })
-
-            relatorio_data = {
-                'total_despesas': float(total_despesas),
-                'media_despesas_dia': float(media_despesas_dia),
-                'maior_despesa': float(maior_despesa),
-                'categoria_mais_cara': categoria_mais_cara,
-                'despesas_por_categoria': despesas_por_categoria,
-                'despesas_por_dia': despesas_por_dia
-            }
-
-            return Response({'success': True, 'data': relatorio_data})
+            agrupar = request.GET.get('agrupar') or None
+            if agrupar not in AGRUPAMENTOS_DESPESAS:
+                return Response({
+                    'success': False,
+                    'error': "agrupar deve ser 'semana' ou 'mes'"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            contexto = ContextoRelatorio.da_requisicao(request)
+            return Response({'success': True, 'data': dados_despesas(contexto, agrupar)})
+        except PeriodoInvalido as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     return Response({'success': False, 'error': 'Método não permitido'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def pacote_inicio(request):
+    """
+    Seções da tela inicial em uma única requisição
+
+    Query params:
+        secoes: estatisticas,dashboard,trabalho,despesas,veiculos (padrão: todas)
+        periodo / data_inicio / data_fim / agrupar: como nos endpoints próprios
+
+    Cada seção traz o corpo que o endpoint próprio devolveria e um ETag;
+    seções cujo ETag veio em If-None-Match retornam com status 304 e sem dados.
+    """
+    try:
+        nomes = PacoteService.secoes_solicitadas(request.GET.get('secoes'))
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if (request.GET.get('agrupar') or None) not in AGRUPAMENTOS_DESPESAS:
+        return Response({
+            'success': False,
+            'error': "agrupar deve ser 'semana' ou 'mes'"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        contexto = ContextoRelatorio.da_requisicao(request)
+    except PeriodoInvalido as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    secoes = PacoteService.montar(
+        contexto,
+        request.GET,
+        nomes,
+        etags_conhecidas(request.META.get('HTTP_IF_NONE_MATCH'))
+    )
+    return Response({'success': True, 'secoes': secoes})
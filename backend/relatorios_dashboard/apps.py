@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RelatoriosDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'relatorios_dashboard'
+
+    def ready(self):
+        import relatorios_dashboard.signals
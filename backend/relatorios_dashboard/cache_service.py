@@ -0,0 +1,156 @@
+"""
+Cache versionado dos relatórios por entregador.
+
+As chaves incluem o id do usuário, um contador de versão dos dados e o período
+normalizado. Qualquer alteração em RegistroTrabalho, Despesa, Veiculo ou
+CategoriaDespesa (os nomes entram no detalhamento de despesas) incrementa a
+versão do entregador (ver relatorios_dashboard/signals.py), o que torna todas
+as entradas anteriores inalcançáveis sem precisar apagá-las.
+"""
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .report_service import resolver_periodo
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'relatorios'
+
+
+class ReportCache:
+    """
+    Serviço de cache dos relatórios com invalidação por versão
+    """
+
+    _lock = threading.Lock()
+    _contadores = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'RELATORIOS_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def _chave_versao(user_id):
+        return f'{PREFIXO}:versao:{user_id}'
+
+    @staticmethod
+    def versao(user_id):
+        """Versão atual dos dados do entregador"""
+        chave = ReportCache._chave_versao(user_id)
+        versao = cache.get(chave)
+        if versao is None:
+            # Começar a partir do relógio evita reaproveitar entradas antigas
+            # caso a chave de versão tenha sido expulsa do cache
+            cache.add(chave, int(time.time() * 1000), None)
+            versao = cache.get(chave)
+        return versao
+
+    @staticmethod
+    def invalidar(user_id):
+        """Incrementa a versão dos dados do entregador"""
+        chave = ReportCache._chave_versao(user_id)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            # Chave inexistente: a próxima leitura cria uma versão nova
+            cache.add(chave, int(time.time() * 1000), None)
+        logger.debug(f"Cache de relatórios invalidado para usuário {user_id}")
+
+    @staticmethod
+    def periodo_normalizado(params):
+        """
+        Normaliza os parâmetros de período para uso na chave.
+
+        Usa o intervalo já resolvido (datas de início e fim) e a data atual,
+        então todas as chaves mudam a cada dia (inclusive as de períodos
+        personalizados, cujas séries recentes dependem de hoje).
+
+        Raises:
+            ValueError: Se as datas personalizadas forem inválidas
+        """
+        return resolver_periodo(params).chave
+
+    @staticmethod
+    def chave(user_id, nome, periodo):
+        return f'{PREFIXO}:{nome}:{user_id}:v{ReportCache.versao(user_id)}:{periodo}'
+
+    @classmethod
+    def _contar(cls, tipo):
+        with cls._lock:
+            cls._contadores[tipo] += 1
+
+    @classmethod
+    def estatisticas(cls):
+        """Contadores de acertos e falhas deste processo"""
+        with cls._lock:
+            hits = cls._contadores['hits']
+            misses = cls._contadores['misses']
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0
+        }
+
+    @classmethod
+    def zerar_estatisticas(cls):
+        with cls._lock:
+            cls._contadores = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def get(cls, user_id, nome, periodo):
+        dados = cache.get(cls.chave(user_id, nome, periodo))
+        cls._contar('hits' if dados is not None else 'misses')
+        return dados
+
+    @classmethod
+    def set(cls, user_id, nome, periodo, dados):
+        cache.set(cls.chave(user_id, nome, periodo), dados, cls.timeout())
+
+
+def cache_relatorio(nome, parametros=()):
+    """
+    Decorator para views de relatório: devolve o payload em cache quando a
+    versão dos dados e o período não mudaram.
+
+    Args:
+        nome: Nome do relatório na chave
+        parametros: Outros parâmetros da query string que alteram a resposta
+            e por isso entram na chave (ex.: 'agrupar')
+
+    Apenas respostas 200 são armazenadas. O cabeçalho X-Cache indica HIT/MISS.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            user = getattr(request, 'user', None)
+            if request.method != 'GET' or not user or not user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            try:
+                periodo = ReportCache.periodo_normalizado(request.GET)
+            except ValueError:
+                # Datas inválidas: a própria view responde com o erro
+                return view_func(request, *args, **kwargs)
+            for parametro in parametros:
+                periodo += f':{parametro}={request.GET.get(parametro, "")}'
+
+            dados = ReportCache.get(user.id, nome, periodo)
+            if dados is not None:
+                response = Response(dados)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'data'):
+                ReportCache.set(user.id, nome, periodo, response.data)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,159 @@
+"""
+Agrupamento de despesas por categoria para os relatórios.
+
+Uma única consulta com GROUP BY (tipo_despesa, categoria personalizada e,
+opcionalmente, semana/mês) devolve tudo que o relatório precisa: total,
+quantidade, média, maior despesa e participação de cada categoria, além da
+tabela dinâmica por período.
+"""
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from registro_entregadespesa.models import Despesa
+
+logger = logging.getLogger(__name__)
+
+# Nomes curtos usados nos relatórios; as demais categorias usam o display do modelo
+NOMES_CATEGORIA = {
+    'alimentacao': 'Alimentação',
+    'combustivel': 'Combustível',
+    'manutencao': 'Manutenção',
+    'pedagio': 'Pedágio',
+    'estacionamento': 'Estacionamento',
+    'seguro': 'Seguro',
+    'licenciamento': 'Licenciamento',
+    'outros': 'Outros'
+}
+NOMES_CATEGORIA_MODELO = dict(Despesa.CATEGORIA_CHOICES)
+
+AGRUPAMENTOS = {
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+
+
+def nome_categoria(tipo_despesa, nome_personalizada=None):
+    """Nome exibido de uma despesa: categoria personalizada ou nome do tipo"""
+    if nome_personalizada:
+        return nome_personalizada
+    return NOMES_CATEGORIA.get(tipo_despesa) or NOMES_CATEGORIA_MODELO.get(tipo_despesa, tipo_despesa)
+
+
+def _chave_categoria(linha):
+    if linha['categoria_personalizada_id']:
+        return f"personalizada:{linha['categoria_personalizada_id']}"
+    return linha['tipo_despesa']
+
+
+class CategoriasDespesas:
+    """
+    Resultado do agrupamento de um queryset de despesas por categoria
+
+    Args:
+        despesas: Queryset de Despesa já filtrado (entregador/período)
+        agrupar: None, 'semana' ou 'mes' para incluir a tabela dinâmica
+    """
+
+    def __init__(self, despesas, agrupar=None):
+        if agrupar is not None and agrupar not in AGRUPAMENTOS:
+            raise ValueError(f"Agrupamento inválido: {agrupar}. Use 'semana' ou 'mes'")
+        self.agrupar = agrupar
+        self._linhas = self._consultar(despesas)
+
+    def _consultar(self, despesas):
+        campos = ['tipo_despesa', 'categoria_personalizada_id', 'categoria_personalizada__nome']
+        if self.agrupar:
+            despesas = despesas.annotate(periodo=AGRUPAMENTOS[self.agrupar]('data'))
+            campos.append('periodo')
+        return list(
+            despesas.order_by()
+            .values(*campos)
+            .annotate(total=Sum('valor'), quantidade=Count('id'), maior=Max('valor'))
+        )
+
+    @property
+    def total(self):
+        return sum((linha['total'] for linha in self._linhas), Decimal('0'))
+
+    @property
+    def quantidade(self):
+        return sum(linha['quantidade'] for linha in self._linhas)
+
+    @property
+    def maior_despesa(self):
+        return max((linha['maior'] for linha in self._linhas), default=Decimal('0'))
+
+    def categorias(self):
+        """
+        Totais por categoria (padrão e personalizada), do maior para o menor
+
+        Returns:
+            list: [{'chave', 'nome', 'personalizada', 'total', 'quantidade',
+                    'media', 'maior', 'percentual'}]
+        """
+        acumulado = OrderedDict()
+        for linha in self._linhas:
+            chave = _chave_categoria(linha)
+            categoria = acumulado.get(chave)
+            if categoria is None:
+                categoria = acumulado[chave] = {
+                    'chave': chave,
+                    'nome': nome_categoria(linha['tipo_despesa'], linha['categoria_personalizada__nome']),
+                    'personalizada': bool(linha['categoria_personalizada_id']),
+                    'total': Decimal('0'),
+                    'quantidade': 0,
+                    'maior': Decimal('0'),
+                }
+            categoria['total'] += linha['total']
+            categoria['quantidade'] += linha['quantidade']
+            categoria['maior'] = max(categoria['maior'], linha['maior'])
+
+        total_geral = self.total
+        resultado = []
+        for categoria in acumulado.values():
+            resultado.append({
+                'chave': categoria['chave'],
+                'nome': categoria['nome'],
+                'personalizada': categoria['personalizada'],
+                'total': float(categoria['total']),
+                'quantidade': categoria['quantidade'],
+                'media': round(float(categoria['total']) / categoria['quantidade'], 2),
+                'maior': float(categoria['maior']),
+                'percentual': round(float(categoria['total'] / total_geral * 100), 1) if total_geral else 0.0,
+            })
+        resultado.sort(key=lambda item: item['total'], reverse=True)
+        return resultado
+
+    def pivot(self):
+        """
+        Tabela dinâmica período x categoria (requer `agrupar`)
+
+        Returns:
+            list: [{'periodo': 'YYYY-MM-DD', 'total': float, 'categorias': {chave: total}}]
+            em ordem cronológica; `periodo` é o início da semana/mês
+        """
+        if not self.agrupar:
+            return []
+
+        periodos = {}
+        for linha in self._linhas:
+            inicio = linha['periodo']
+            if hasattr(inicio, 'date'):
+                inicio = inicio.date()
+            periodo = periodos.setdefault(inicio, {'total': Decimal('0'), 'categorias': {}})
+            chave = _chave_categoria(linha)
+            periodo['total'] += linha['total']
+            periodo['categorias'][chave] = periodo['categorias'].get(chave, Decimal('0')) + linha['total']
+
+        return [
+            {
+                'periodo': inicio.isoformat(),
+                'total': float(dados['total']),
+                'categorias': {chave: float(total) for chave, total in dados['categorias'].items()},
+            }
+            for inicio, dados in sorted(periodos.items())
+        ]
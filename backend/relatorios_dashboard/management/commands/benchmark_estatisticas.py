@@ -0,0 +1,172 @@
+import random
+import time
+import tracemalloc
+from datetime import time as hora
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+
+from cadastro_veiculo.models import Veiculo
+from registro_entregadespesa.models import RegistroTrabalho, Despesa
+from registro_entregadespesa.rollup_service import recalcular_resumos_dias
+from relatorios_dashboard.report_service import ContextoRelatorio, resolver_periodo
+
+User = get_user_model()
+
+TIPOS_DESPESA = ('combustivel', 'manutencao', 'alimentacao', 'outros')
+
+
+def totais_legado(user, periodo):
+    """Implementação anterior: instancia cada registro do período e soma em Python (float)"""
+    registros_trabalho = RegistroTrabalho.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    )
+    registros_despesa = Despesa.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    )
+
+    total_ganhos = 0
+    for registro in registros_trabalho:
+        total_ganhos += float(registro.valor)
+
+    return {
+        'entregas': registros_trabalho.aggregate(total=models.Sum('quantidade_entregues'))['total'] or 0,
+        'ganho': round(total_ganhos, 2),
+        'despesa': round(sum(float(registro.valor) for registro in registros_despesa), 2),
+        'dias_trabalhados': registros_trabalho.values('data').distinct().count(),
+        'veiculos': Veiculo.objects.filter(entregador=user).count(),
+    }
+
+
+def totais_atual(user, periodo):
+    """Implementação atual: um agregado Decimal sobre os resumos diários"""
+    return ContextoRelatorio(user, periodo).totais
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara tempo, consultas e memória dos totais de /api/relatorios/estatisticas/ '
+        '(soma em Python x agregado Decimal) para volumes crescentes de registros. '
+        'Os dados gerados são descartados ao final (transação revertida).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quantidades',
+            default='1000,10000,100000',
+            help='Registros de trabalho (e o mesmo número de despesas) no período, separados por vírgula',
+        )
+        parser.add_argument(
+            '--periodo',
+            default='ano',
+            choices=['semana', 'mes', 'ano'],
+            help='Período das estatísticas',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Execuções por implementação para o tempo médio',
+        )
+
+    def _medir(self, funcao, user, periodo, repeticoes):
+        """
+        Returns:
+            tuple: (resultado, consultas, tempo médio em ms, pico de memória em KiB)
+        """
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao(user, periodo)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as capturadas:
+                resultado = funcao(user, periodo)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return resultado, len(capturadas), sum(tempos) / len(tempos), pico / 1024
+
+    @staticmethod
+    def _gerar(user, periodo, quantidade, aleatorio):
+        """Cria `quantidade` registros de trabalho e despesas espalhados pelos dias do período"""
+        dias = [periodo.inicio + timedelta(days=indice) for indice in range(periodo.dias)]
+        trabalho = []
+        despesas = []
+        for _ in range(quantidade):
+            dia = aleatorio.choice(dias)
+            trabalho.append(RegistroTrabalho(
+                entregador=user, data=dia, hora_inicio=hora(8), hora_fim=hora(17),
+                quantidade_entregues=aleatorio.randint(5, 60),
+                quantidade_nao_entregues=aleatorio.randint(0, 5),
+                tipo_pagamento='diaria',
+                valor=Decimal(aleatorio.randint(5000, 30000)) / 100
+            ))
+            despesas.append(Despesa(
+                entregador=user, data=aleatorio.choice(dias),
+                tipo_despesa=aleatorio.choice(TIPOS_DESPESA), descricao='Benchmark',
+                valor=Decimal(aleatorio.randint(100, 15000)) / 100
+            ))
+        RegistroTrabalho.objects.bulk_create(trabalho, batch_size=2000)
+        Despesa.objects.bulk_create(despesas, batch_size=2000)
+        # bulk_create não dispara os signals do resumo diário
+        recalcular_resumos_dias(user.id, set(dias))
+
+    def handle(self, *args, **options):
+        try:
+            quantidades = sorted({int(valor) for valor in options['quantidades'].split(',') if valor.strip()})
+        except ValueError:
+            raise CommandError('--quantidades deve ser uma lista de inteiros separados por vírgula')
+        if not quantidades or quantidades[0] < 1:
+            raise CommandError('--quantidades deve ter valores maiores que zero')
+
+        periodo = resolver_periodo({'periodo': options['periodo']})
+        aleatorio = random.Random(42)
+        self.stdout.write(
+            f'📊 Estatísticas de {periodo.inicio} a {periodo.fim} '
+            f'(N registros de trabalho + N despesas)\n'
+        )
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email='benchmark-estatisticas@example.com', password=None,
+                nome='Benchmark', telefone='11999999999'
+            )
+            Veiculo.objects.create(entregador=user, tipo='moto', modelo='Benchmark')
+
+            gerados = 0
+            for quantidade in quantidades:
+                # Cada N reaproveita os registros do anterior e completa o volume
+                self._gerar(user, periodo, quantidade - gerados, aleatorio)
+                gerados = quantidade
+
+                medicoes = {}
+                for nome, funcao in (('soma em Python', totais_legado), ('agregado Decimal', totais_atual)):
+                    medicoes[nome] = self._medir(funcao, user, periodo, options['repeticoes'])
+                    _, consultas, tempo, pico = medicoes[nome]
+                    self.stdout.write(
+                        f'N={quantidade:<8} {nome:18} consultas: {consultas:3}  '
+                        f'tempo médio: {tempo:9.2f} ms  pico de memória: {pico:10.1f} KiB'
+                    )
+
+                legado = medicoes['soma em Python'][0]
+                atual = medicoes['agregado Decimal'][0]
+                divergentes = [
+                    campo for campo in legado
+                    if Decimal(str(legado[campo])) != Decimal(str(atual[campo]))
+                ]
+                if divergentes:
+                    self.stdout.write(self.style.WARNING(
+                        f'⚠️ Totais diferentes em: {", ".join(divergentes)}'
+                    ))
+                self.stdout.write('')
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('✅ Medição concluída (dados gerados descartados)'))
@@ -0,0 +1,255 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from cadastro_veiculo.models import Veiculo
+from registro_entregadespesa.models import RegistroTrabalho, Despesa
+from relatorios_dashboard.categorias_service import nome_categoria
+from relatorios_dashboard.report_service import ContextoRelatorio, resolver_periodo
+from relatorios_dashboard.secoes_service import (
+    dados_dashboard, dados_despesas, dados_estatisticas, dados_trabalho,
+)
+from .benchmark_estatisticas import totais_legado
+
+User = get_user_model()
+
+
+# ----------------------------------------------------------------------
+# Implementações anteriores (uma consulta por agregado, dia, semana e mês)
+# ----------------------------------------------------------------------
+
+def estatisticas_legado(user, periodo):
+    totais = totais_legado(user, periodo)
+    return {
+        'totalEntregas': totais['entregas'],
+        'totalGanhos': totais['ganho'],
+        'totalDespesas': totais['despesa'],
+        'lucroLiquido': round(totais['ganho'] - totais['despesa'], 2),
+        'veiculosCadastrados': totais['veiculos'],
+        'diasTrabalhados': totais['dias_trabalhados'],
+    }
+
+
+def trabalho_legado(user, periodo):
+    registros = RegistroTrabalho.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    ).order_by('data')
+
+    total_dias = registros.count()
+    # total_entregas e entregas_realizadas eram agregados separadamente
+    entregas = registros.aggregate(total=Sum('quantidade_entregues'))['total'] or 0
+    registros.aggregate(total=Sum('quantidade_entregues'))
+    nao_entregas = registros.aggregate(total=Sum('quantidade_nao_entregues'))['total'] or 0
+    ganho = registros.aggregate(total=Sum('valor'))['total'] or 0
+
+    com_entregas = registros.filter(quantidade_entregues__gt=0)
+    melhor = pior = None
+    if com_entregas.exists():
+        melhor = com_entregas.order_by('-quantidade_entregues').first()
+        pior = com_entregas.order_by('quantidade_entregues').first()
+
+    return {
+        'total_dias': total_dias,
+        'entregas_realizadas': entregas,
+        'entregas_nao_realizadas': nao_entregas,
+        'ganho_total': float(ganho),
+        'melhor_dia': melhor.data.strftime('%d/%m/%Y') if melhor else 'N/A',
+        'pior_dia': pior.data.strftime('%d/%m/%Y') if pior else 'N/A',
+        'dias_trabalhados': [
+            {'id': registro.id, 'data': registro.data.strftime('%Y-%m-%d'),
+             'entregas': registro.quantidade_entregues, 'ganho': float(registro.valor)}
+            for registro in registros
+        ],
+    }
+
+
+def despesas_legado(user, periodo):
+    despesas = Despesa.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    ).order_by('data')
+
+    total = despesas.aggregate(total=Sum('valor'))['total'] or 0
+    maior = despesas.order_by('-valor').first()
+
+    por_categoria = []
+    for categoria in despesas.values('tipo_despesa').distinct():
+        tipo = categoria['tipo_despesa']
+        total_categoria = despesas.filter(tipo_despesa=tipo).aggregate(total=Sum('valor'))['total'] or 0
+        por_categoria.append({'nome': nome_categoria(tipo), 'total': float(total_categoria)})
+    por_categoria.sort(key=lambda item: item['total'], reverse=True)
+
+    return {
+        'total_despesas': float(total),
+        'maior_despesa': float(maior.valor) if maior else 0,
+        'despesas_por_categoria': por_categoria,
+        'despesas_por_dia': [
+            {'id': despesa.id, 'data': despesa.data.strftime('%Y-%m-%d'),
+             'categoria': nome_categoria(despesa.tipo_despesa), 'valor': float(despesa.valor)}
+            for despesa in despesas
+        ],
+    }
+
+
+def dashboard_legado(user, periodo):
+    hoje = periodo.hoje
+    registros = RegistroTrabalho.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    )
+    despesas = Despesa.objects.filter(
+        entregador=user, data__gte=periodo.inicio, data__lte=periodo.fim
+    )
+
+    indicadores = {
+        'entregas_realizadas': registros.aggregate(total=Sum('quantidade_entregues'))['total'] or 0,
+        'entregas_nao_realizadas': registros.aggregate(total=Sum('quantidade_nao_entregues'))['total'] or 0,
+        'ganho_total': float(registros.aggregate(total=Sum('valor'))['total'] or 0),
+        'despesas_total': float(despesas.aggregate(total=Sum('valor'))['total'] or 0),
+        'dias_trabalhados': registros.count(),
+    }
+
+    do_dia = RegistroTrabalho.objects.filter(entregador=user, data=periodo.fim)
+    resumo_diario = {
+        'entregas_hoje': do_dia.aggregate(total=Sum('quantidade_entregues'))['total'] or 0,
+        'nao_entregas_hoje': do_dia.aggregate(total=Sum('quantidade_nao_entregues'))['total'] or 0,
+        'ganhos_hoje': float(do_dia.aggregate(total=Sum('valor'))['total'] or 0),
+        'despesas_hoje': float(
+            Despesa.objects.filter(entregador=user, data=periodo.fim).aggregate(total=Sum('valor'))['total'] or 0
+        ),
+    }
+
+    entregas_por_dia = []
+    for indice in range(7):
+        dia = registros.filter(data=hoje - timedelta(days=6 - indice))
+        entregas_por_dia.append({
+            'entregas': dia.aggregate(total=Sum('quantidade_entregues'))['total'] or 0,
+            'ganho': float(dia.aggregate(total=Sum('valor'))['total'] or 0),
+        })
+
+    ganhos_por_semana = []
+    for indice in range(4):
+        inicio = hoje - timedelta(days=(indice + 1) * 7)
+        fim = hoje - timedelta(days=indice * 7)
+        ganhos_por_semana.append({
+            'ganho': float(registros.filter(data__gte=inicio, data__lt=fim).aggregate(total=Sum('valor'))['total'] or 0),
+            'despesa': float(despesas.filter(data__gte=inicio, data__lt=fim).aggregate(total=Sum('valor'))['total'] or 0),
+        })
+
+    performance_mensal = []
+    for indice in range(6):
+        mes = hoje.month - indice
+        ano = hoje.year
+        if mes <= 0:
+            mes += 12
+            ano -= 1
+        inicio = date(ano, mes, 1)
+        fim = date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1)
+        do_mes = registros.filter(data__gte=inicio, data__lte=fim)
+        performance_mensal.append({
+            'entregas': do_mes.aggregate(total=Sum('quantidade_entregues'))['total'] or 0,
+            'ganho': float(do_mes.aggregate(total=Sum('valor'))['total'] or 0),
+        })
+
+    veiculos = Veiculo.objects.filter(entregador=user)
+    indicadores['veiculos_cadastrados'] = veiculos.count()
+    tipos = {}
+    for veiculo in veiculos:
+        tipos[veiculo.tipo] = tipos.get(veiculo.tipo, 0) + 1
+
+    ultimos_registros = []
+    for registro in registros.order_by('-data', '-hora_inicio')[:5]:
+        despesa_dia = despesas.filter(data=registro.data).aggregate(total=Sum('valor'))['total'] or 0
+        ultimos_registros.append({'ganho': float(registro.valor), 'despesa': float(despesa_dia)})
+
+    return {
+        'resumo_diario': resumo_diario,
+        'indicadores_performance': indicadores,
+        'entregas_por_dia': entregas_por_dia,
+        'ganhos_por_semana': ganhos_por_semana,
+        'performance_mensal': performance_mensal,
+        'distribuicao_veiculos': tipos,
+        'ultimos_registros': ultimos_registros,
+    }
+
+
+# Endpoint -> (implementação anterior ou None, implementação atual)
+ENDPOINTS = [
+    ('/api/relatorios/estatisticas/', estatisticas_legado, dados_estatisticas),
+    ('/api/relatorios/trabalho/', trabalho_legado, dados_trabalho),
+    ('/api/relatorios/despesas/', despesas_legado, dados_despesas),
+    ('/api/relatorios/despesas/?agrupar=mes', None, lambda contexto: dados_despesas(contexto, 'mes')),
+    ('/registro/api/dashboard-data/', dashboard_legado, dados_dashboard),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara consultas SQL e tempo de cada relatório (sem cache) entre a '
+        'implementação anterior e a atual para um entregador'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entregador',
+            type=int,
+            required=True,
+            help='ID do entregador usado na medição',
+        )
+        parser.add_argument(
+            '--periodo',
+            default='mes',
+            choices=['semana', 'mes', 'ano'],
+            help='Período dos relatórios',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Execuções por implementação para o tempo médio',
+        )
+
+    @staticmethod
+    def _medir(funcao, repeticoes):
+        """
+        Returns:
+            tuple: (consultas da última execução, tempo médio em ms)
+        """
+        tempos = []
+        consultas = 0
+        for _ in range(repeticoes):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                funcao()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            consultas = len(capturadas)
+        return consultas, sum(tempos) / len(tempos)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(pk=options['entregador'])
+        except User.DoesNotExist:
+            raise CommandError(f'Entregador {options["entregador"]} não encontrado')
+
+        periodo = resolver_periodo({'periodo': options['periodo']})
+        repeticoes = options['repeticoes']
+        self.stdout.write(
+            f'📊 Relatórios de {user.nome} ({periodo.inicio} a {periodo.fim}): anterior x atual\n'
+        )
+
+        for endpoint, legado, atual in ENDPOINTS:
+            if legado is None:
+                coluna_legado = f'{"sem equivalente":>33}'
+            else:
+                consultas, tempo = self._medir(lambda: legado(user, periodo), repeticoes)
+                coluna_legado = f'consultas: {consultas:3}  {tempo:8.1f} ms'
+
+            # Contexto novo a cada execução: nada memoizado entre repetições
+            consultas, tempo = self._medir(lambda: atual(ContextoRelatorio(user, periodo)), repeticoes)
+            self.stdout.write(
+                f'{endpoint:40} anterior {coluna_legado}  |  '
+                f'atual consultas: {consultas:3}  {tempo:8.1f} ms'
+            )
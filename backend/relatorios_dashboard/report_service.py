@@ -0,0 +1,278 @@
+"""
+Camada comum dos relatórios: resolução do período e contexto por requisição.
+
+`resolver_periodo` interpreta `periodo` (semana/mes/ano) ou `data_inicio` +
+`data_fim` uma única vez. `ContextoRelatorio` reúne as consultas usadas pelos
+endpoints (estatísticas, relatório de trabalho, de despesas e dashboard); cada
+uma só é executada quando acessada e o resultado fica memorizado, então
+endpoints que compartilham dados não repetem consultas.
+"""
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from cadastro_veiculo.models import Veiculo
+from registro_entregadespesa.aggregation_service import DashboardAggregator
+from registro_entregadespesa.models import RegistroTrabalho, Despesa, CategoriaDespesa, ResumoDiario
+from sistema.condicional import validador_entregador
+from usuarios.models import Entregador
+from .categorias_service import CategoriasDespesas
+
+logger = logging.getLogger(__name__)
+
+DIAS_POR_PERIODO = {
+    'semana': 7,
+    'mes': 30,
+    'ano': 365,
+}
+PERIODO_PADRAO = 'mes'
+CENTAVOS = Decimal('0.01')
+
+
+class PeriodoInvalido(ValueError):
+    """Datas do período personalizado inválidas"""
+
+
+class Periodo:
+    """Intervalo fechado [inicio, fim] de um relatório"""
+
+    def __init__(self, inicio, fim, nome, hoje):
+        self.inicio = inicio
+        self.fim = fim
+        self.nome = nome
+        self.hoje = hoje
+
+    @property
+    def dias(self):
+        return (self.fim - self.inicio).days + 1
+
+    @property
+    def chave(self):
+        """
+        Identificação estável do intervalo (usada nas chaves de cache e ETags)
+
+        Inclui `hoje` também nos períodos personalizados: séries como os
+        últimos 7 dias e diasConectado dependem da data atual.
+        """
+        return f'{self.nome}:{self.inicio.isoformat()}:{self.fim.isoformat()}:{self.hoje.isoformat()}'
+
+    def __repr__(self):
+        return f'Periodo({self.nome}, {self.inicio} a {self.fim})'
+
+
+def resolver_periodo(params, hoje=None):
+    """
+    Resolve o período dos parâmetros da requisição
+
+    Args:
+        params: QueryDict/dict com `periodo` ou `data_inicio` e `data_fim`
+        hoje: Data de referência (padrão: data atual)
+
+    Returns:
+        Periodo: Período personalizado ou os últimos 7/30/365 dias até hoje
+
+    Raises:
+        PeriodoInvalido: Se as datas personalizadas não forem ISO (YYYY-MM-DD)
+    """
+    hoje = hoje or timezone.now().date()
+    data_inicio = params.get('data_inicio')
+    data_fim = params.get('data_fim')
+
+    if data_inicio and data_fim:
+        try:
+            inicio = date.fromisoformat(data_inicio)
+            fim = date.fromisoformat(data_fim)
+        except ValueError:
+            raise PeriodoInvalido('Datas inválidas. Use o formato YYYY-MM-DD')
+        return Periodo(inicio, fim, 'personalizado', hoje)
+
+    nome = (params.get('periodo') or PERIODO_PADRAO).strip().lower()
+    if nome not in DIAS_POR_PERIODO:
+        nome = PERIODO_PADRAO
+    return Periodo(hoje - timedelta(days=DIAS_POR_PERIODO[nome]), hoje, nome, hoje)
+
+
+def validador_relatorio(request, *args, **kwargs):
+    """
+    Validador (ETag) dos endpoints de relatório
+
+    Usa o maior `atualizado_em` e a quantidade de registros de trabalho,
+    despesas, categorias e veículos do entregador em uma única consulta; o
+    período resolvido (que muda a cada dia nos períodos relativos), os demais
+    parâmetros e a foto do usuário entram no escopo.
+
+    Returns:
+        Validador ou None se o período for inválido (a view responde 400)
+    """
+    try:
+        periodo = resolver_periodo(request.GET)
+    except PeriodoInvalido:
+        return None
+    user = request.user
+    foto = user.foto.name if getattr(user, 'foto', None) else ''
+    return validador_entregador(
+        user,
+        RegistroTrabalho.objects.all(),
+        Despesa.objects.all(),
+        CategoriaDespesa.objects.all(),
+        Veiculo.objects.all(),
+        escopo=(request.path, periodo.chave, sorted(request.GET.lists()), foto)
+    )
+
+
+class ContextoRelatorio:
+    """
+    Dados de relatório de um entregador em um período, carregados sob demanda
+    """
+
+    def __init__(self, entregador, periodo):
+        self.entregador = entregador
+        self.periodo = periodo
+        self._categorias = {}
+
+    @classmethod
+    def da_requisicao(cls, request):
+        """
+        Contexto da requisição atual (criado uma vez por requisição)
+
+        Raises:
+            PeriodoInvalido: Se o período informado for inválido
+        """
+        contexto = getattr(request, '_contexto_relatorio', None)
+        if contexto is None:
+            contexto = cls(request.user, resolver_periodo(request.GET))
+            request._contexto_relatorio = contexto
+        return contexto
+
+    # ------------------------------------------------------------------
+    # Querysets base (não executam consultas por si só)
+    # ------------------------------------------------------------------
+
+    def _no_periodo(self, queryset):
+        return queryset.filter(
+            entregador=self.entregador,
+            data__gte=self.periodo.inicio,
+            data__lte=self.periodo.fim
+        )
+
+    @cached_property
+    def resumos(self):
+        return self._no_periodo(ResumoDiario.objects.all())
+
+    @cached_property
+    def registros_trabalho(self):
+        return self._no_periodo(RegistroTrabalho.objects.all())
+
+    @cached_property
+    def despesas(self):
+        return self._no_periodo(Despesa.objects.all())
+
+    # ------------------------------------------------------------------
+    # Dados memorizados
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def totais(self):
+        """
+        Totais do período (resumos diários) e quantidade de veículos em uma
+        única consulta; valores monetários em Decimal com duas casas
+        """
+        no_periodo = models.Q(
+            resumos_diarios__data__gte=self.periodo.inicio,
+            resumos_diarios__data__lte=self.periodo.fim
+        )
+        veiculos = (
+            Veiculo.objects.filter(entregador=models.OuterRef('pk'))
+            .order_by()
+            .values('entregador')
+            .annotate(total=models.Count('id'))
+            .values('total')
+        )
+        totais = Entregador.objects.filter(pk=self.entregador.pk).annotate(
+            total_registros=models.Sum('resumos_diarios__registros_trabalho', filter=no_periodo),
+            total_entregas=models.Sum('resumos_diarios__quantidade_entregues', filter=no_periodo),
+            total_nao_entregas=models.Sum('resumos_diarios__quantidade_nao_entregues', filter=no_periodo),
+            total_ganhos=models.Sum('resumos_diarios__ganho', filter=no_periodo),
+            total_despesas=models.Sum('resumos_diarios__despesa_total', filter=no_periodo),
+            dias_trabalhados=models.Count(
+                'resumos_diarios',
+                filter=no_periodo & models.Q(resumos_diarios__registros_trabalho__gt=0)
+            ),
+            veiculos_count=models.Subquery(veiculos, output_field=models.IntegerField()),
+        ).values(
+            'total_registros', 'total_entregas', 'total_nao_entregas', 'total_ganhos',
+            'total_despesas', 'dias_trabalhados', 'veiculos_count'
+        ).get()
+
+        return {
+            'registros_trabalho': totais['total_registros'] or 0,
+            'entregas': totais['total_entregas'] or 0,
+            'nao_entregas': totais['total_nao_entregas'] or 0,
+            'ganho': (totais['total_ganhos'] or Decimal('0')).quantize(CENTAVOS),
+            'despesa': (totais['total_despesas'] or Decimal('0')).quantize(CENTAVOS),
+            'dias_trabalhados': totais['dias_trabalhados'],
+            'veiculos': totais['veiculos_count'] or 0,
+        }
+
+    @cached_property
+    def melhor_pior_dia(self):
+        """
+        Dias com mais e menos entregas (empates: o dia mais recente)
+
+        Returns:
+            tuple: (melhor, pior) como datas, ou (None, None)
+        """
+        dias = list(
+            self.resumos.filter(registros_trabalho__gt=0, quantidade_entregues__gt=0)
+            .order_by()
+            .values_list('data', 'quantidade_entregues')
+        )
+        if not dias:
+            return None, None
+        melhor = max(dias, key=lambda dia: (dia[1], dia[0]))
+        pior = min(dias, key=lambda dia: (dia[1], -dia[0].toordinal()))
+        return melhor[0], pior[0]
+
+    @cached_property
+    def dias_trabalhados(self):
+        """Registros de trabalho do período em ordem cronológica"""
+        return list(
+            self.registros_trabalho.order_by('data')
+            .values('id', 'data', 'quantidade_entregues', 'valor')
+        )
+
+    @cached_property
+    def lista_despesas(self):
+        """Despesas do período em ordem cronológica"""
+        return list(
+            self.despesas.order_by('data').values(
+                'id', 'data', 'tipo_despesa', 'categoria_personalizada__nome', 'valor', 'descricao'
+            )
+        )
+
+    def categorias(self, agrupar=None):
+        """Agrupamento das despesas por categoria (memorizado por agrupamento)"""
+        if agrupar not in self._categorias:
+            self._categorias[agrupar] = CategoriasDespesas(self.despesas, agrupar=agrupar)
+        return self._categorias[agrupar]
+
+    @cached_property
+    def dashboard(self):
+        """Agregador das séries do dashboard"""
+        return DashboardAggregator(
+            self.entregador, self.periodo.inicio, self.periodo.fim, self.periodo.hoje
+        )
+
+    @cached_property
+    def distribuicao_veiculos(self):
+        """Quantidade de veículos por tipo, do cadastro mais recente ao mais antigo"""
+        return list(
+            Veiculo.objects.filter(entregador=self.entregador)
+            .values('tipo')
+            .annotate(quantidade=models.Count('id'), ultimo_cadastro=models.Max('data_cadastro'))
+            .order_by('-ultimo_cadastro')
+        )
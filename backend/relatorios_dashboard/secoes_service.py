@@ -0,0 +1,404 @@
+"""
+Seções de relatório e pacote da tela inicial.
+
+Cada seção (estatísticas, dashboard, relatório de trabalho, de despesas e
+veículos) é montada aqui a partir de um `ContextoRelatorio`; os endpoints
+individuais e o pacote (`/api/relatorios/pacote/`) usam as mesmas funções, então
+o corpo de uma seção no pacote é idêntico à resposta do endpoint próprio e as
+duas rotas compartilham as entradas do ReportCache.
+
+O pacote calcula todas as seções pedidas com um único contexto (consultas
+compartilhadas) e devolve um ETag por seção. O ETag vem do validador barato de
+sistema.condicional (maior `atualizado_em` e contagem dos modelos de que a seção
+depende, mais período e parâmetros), calculado para todas as seções em uma
+única consulta: seções cujo ETag o cliente já conhece (cabeçalho
+If-None-Match) voltam sem corpo e nem chegam a ser montadas.
+"""
+import logging
+from datetime import date
+
+from cadastro_veiculo.models import Veiculo
+from cadastro_veiculo.serializers import VeiculoSerializer
+from registro_entregadespesa.models import RegistroTrabalho, Despesa, CategoriaDespesa
+from sistema.condicional import Validador, validador_entregador
+from .cache_service import ReportCache
+from .categorias_service import nome_categoria
+
+logger = logging.getLogger(__name__)
+
+AGRUPAMENTOS_DESPESAS = (None, 'semana', 'mes')
+# Modelos cujas alterações podem mudar as seções do pacote
+MODELOS_PACOTE = (RegistroTrabalho, Despesa, CategoriaDespesa, Veiculo)
+CORES_VEICULOS = ['#8884d8', '#82ca9d', '#ffc658', '#ff7300', '#00ff00']
+
+
+# ----------------------------------------------------------------------
+# Montagem das seções
+# ----------------------------------------------------------------------
+
+def dados_estatisticas(contexto):
+    """Corpo de /api/relatorios/estatisticas/"""
+    user = contexto.entregador
+    periodo = contexto.periodo
+
+    # Totais do período e veículos em uma única consulta (Decimal)
+    totais = contexto.totais
+    total_ganhos = totais['ganho']
+    total_despesas = totais['despesa']
+
+    if getattr(user, 'date_joined', None):
+        dias_conectado = (date.today() - user.date_joined.date()).days
+    else:
+        dias_conectado = 0
+
+    return {
+        'totalEntregas': totais['entregas'],
+        'totalGanhos': total_ganhos,
+        'totalDespesas': total_despesas,
+        'lucroLiquido': total_ganhos - total_despesas,
+        'veiculosCadastrados': totais['veiculos'],
+        'diasTrabalhados': totais['dias_trabalhados'],
+        'diasConectado': dias_conectado,
+        'periodo': {
+            'inicio': periodo.inicio.strftime('%Y-%m-%d'),
+            'fim': periodo.fim.strftime('%Y-%m-%d')
+        },
+        'foto': user.foto.url if getattr(user, 'foto', None) else None
+    }
+
+
+def dados_trabalho(contexto):
+    """Dados de /api/relatorios/trabalho/"""
+    # Totais e melhor/pior dia a partir dos resumos diários
+    totais = contexto.totais
+    total_dias = totais['registros_trabalho']
+    entregas_realizadas = totais['entregas']
+    media_entregas_dia = entregas_realizadas / max(total_dias, 1)
+
+    melhor, pior = contexto.melhor_pior_dia
+
+    # Lista de registros (precisa do id para edição no app)
+    dias_trabalhados = [
+        {
+            'id': registro['id'],
+            'data': registro['data'].strftime('%Y-%m-%d'),
+            'entregas': registro['quantidade_entregues'],
+            'ganho': float(registro['valor'])
+        }
+        for registro in contexto.dias_trabalhados
+    ]
+
+    return {
+        'total_dias': total_dias,
+        'total_entregas': entregas_realizadas,
+        'entregas_realizadas': entregas_realizadas,
+        'entregas_nao_realizadas': totais['nao_entregas'],
+        'ganho_total': float(totais['ganho']),
+        'media_entregas_dia': float(media_entregas_dia),
+        'melhor_dia': melhor.strftime('%d/%m/%Y') if melhor else 'N/A',
+        'pior_dia': pior.strftime('%d/%m/%Y') if pior else 'N/A',
+        'dias_trabalhados': dias_trabalhados
+    }
+
+
+def dados_despesas(contexto, agrupar=None):
+    """Dados de /api/relatorios/despesas/ (agrupar: None, 'semana' ou 'mes')"""
+    # Totais, quantidades e maior valor por categoria em um único GROUP BY
+    agrupamento = contexto.categorias(agrupar)
+    total_despesas = agrupamento.total
+    media_despesas_dia = total_despesas / max(contexto.periodo.dias, 1)
+
+    despesas_por_categoria = agrupamento.categorias()
+    categoria_mais_cara = despesas_por_categoria[0]['nome'] if despesas_por_categoria else 'N/A'
+
+    despesas_por_dia = [
+        {
+            'id': linha['id'],
+            'data': linha['data'].strftime('%Y-%m-%d'),
+            'categoria': nome_categoria(linha['tipo_despesa'], linha['categoria_personalizada__nome']),
+            'valor': float(linha['valor']),
+            'descricao': linha['descricao'] or ''
+        }
+        for linha in contexto.lista_despesas
+    ]
+
+    dados = {
+        'total_despesas': float(total_despesas),
+        'media_despesas_dia': float(media_despesas_dia),
+        'maior_despesa': float(agrupamento.maior_despesa),
+        'categoria_mais_cara': categoria_mais_cara,
+        'despesas_por_categoria': despesas_por_categoria,
+        'despesas_por_dia': despesas_por_dia
+    }
+    if agrupar:
+        dados['despesas_por_periodo'] = {
+            'agrupamento': agrupar,
+            'periodos': agrupamento.pivot()
+        }
+    return dados
+
+
+def dados_dashboard(contexto, periodo_informado='mes'):
+    """
+    Dados de /registro/api/dashboard-data/
+
+    Args:
+        contexto: ContextoRelatorio da requisição
+        periodo_informado: Valor de `periodo` recebido (devolvido como veio)
+    """
+    data_inicio = contexto.periodo.inicio
+    data_fim = contexto.periodo.fim
+    hoje = contexto.periodo.hoje
+    logger.debug(f"Período do dashboard: {data_inicio} até {data_fim}")
+
+    # Todas as séries saem de consultas agrupadas por dia
+    agregador = contexto.dashboard
+
+    # Dados do período selecionado
+    resumo_periodo = agregador.resumo_periodo()
+    total_entregas_realizadas = resumo_periodo['entregas']
+    total_entregas_nao_realizadas = resumo_periodo['nao_entregas']
+    total_ganhos = resumo_periodo['ganho']
+    total_despesas = resumo_periodo['despesa']
+    dias_trabalhados = resumo_periodo['registros']
+
+    # Dados do período filtrado (se for um dia específico, será "hoje")
+    resumo_hoje = agregador.resumo_dia(data_fim)
+    ganhos_hoje = resumo_hoje['ganho']
+    despesas_hoje = resumo_hoje['despesa']
+
+    # Distribuição de veículos
+    distribuicao_veiculos = []
+    total_veiculos = 0
+    try:
+        nomes_tipo = dict(Veiculo.TIPO_CHOICES)
+        for i, linha in enumerate(contexto.distribuicao_veiculos):
+            tipo = linha['tipo']
+            total_veiculos += linha['quantidade']
+            distribuicao_veiculos.append({
+                'name': nomes_tipo.get(tipo, tipo.title()),
+                'value': linha['quantidade'],
+                'color': CORES_VEICULOS[i % len(CORES_VEICULOS)]
+            })
+        logger.debug(f"Total de veículos: {total_veiculos}")
+    except Exception as e:
+        logger.error(f"Erro ao buscar veículos: {e}", exc_info=True)
+        total_veiculos = 0
+        distribuicao_veiculos = []
+
+    # Calcular métricas adicionais
+    taxa_sucesso = 0
+    if total_entregas_realizadas + total_entregas_nao_realizadas > 0:
+        taxa_sucesso = (total_entregas_realizadas / (total_entregas_realizadas + total_entregas_nao_realizadas)) * 100
+
+    ganho_medio_dia = 0
+    if dias_trabalhados > 0:
+        ganho_medio_dia = total_ganhos / dias_trabalhados
+
+    return {
+        # Resumo diário (hoje)
+        'resumo_diario': {
+            'entregas_hoje': resumo_hoje['entregas'],
+            'nao_entregas_hoje': resumo_hoje['nao_entregas'],
+            'ganhos_hoje': float(ganhos_hoje),
+            'despesas_hoje': float(despesas_hoje),
+            'lucro_hoje': float(ganhos_hoje - despesas_hoje)
+        },
+
+        # Indicadores de performance (período selecionado)
+        'indicadores_performance': {
+            'dias_trabalhados': dias_trabalhados,
+            'entregas_realizadas': total_entregas_realizadas,
+            'entregas_nao_realizadas': total_entregas_nao_realizadas,
+            'ganho_total': float(total_ganhos),
+            'despesas_total': float(total_despesas),
+            'lucro_liquido': float(total_ganhos - total_despesas),
+            'taxa_sucesso': round(taxa_sucesso, 1),
+            'ganho_medio_dia': round(ganho_medio_dia, 2),
+            'veiculos_cadastrados': total_veiculos
+        },
+
+        # Dados para gráficos
+        'entregas_por_dia': agregador.entregas_por_dia(),
+        'ganhos_por_semana': agregador.ganhos_por_semana(),
+        'performance_mensal': agregador.performance_mensal(),
+        'distribuicao_veiculos': distribuicao_veiculos,
+        'ultimos_registros': agregador.ultimos_registros(),
+
+        'periodo': periodo_informado,
+        'data_inicio': data_inicio.strftime('%d/%m/%Y'),
+        'data_fim': hoje.strftime('%d/%m/%Y')
+    }
+
+
+def dados_veiculos(entregador):
+    """Corpo de GET /api/veiculos/"""
+    veiculos = Veiculo.objects.filter(entregador=entregador)
+    return list(VeiculoSerializer(veiculos, many=True).data)
+
+
+# ----------------------------------------------------------------------
+# Pacote
+# ----------------------------------------------------------------------
+
+class SecaoPacote:
+    """
+    Seção disponível no pacote
+
+    Args:
+        nome: Nome da seção em `?secoes=`
+        nome_cache: Nome da entrada no ReportCache (o mesmo do endpoint próprio)
+        montar: Função (contexto, params) -> corpo da resposta do endpoint
+        por_periodo: Se o conteúdo depende do período
+        parametros: Outros parâmetros da query string que entram na chave
+        modelos: Modelos de MODELOS_PACOTE dos quais o conteúdo depende
+    """
+
+    def __init__(self, nome, nome_cache, montar, por_periodo=True, parametros=(), modelos=MODELOS_PACOTE):
+        self.nome = nome
+        self.nome_cache = nome_cache
+        self.montar = montar
+        self.por_periodo = por_periodo
+        self.parametros = parametros
+        self.modelos = modelos
+
+    def chave_cache(self, contexto, params):
+        # Mesmo formato do decorator cache_relatorio
+        chave = contexto.periodo.chave if self.por_periodo else ''
+        for parametro in self.parametros:
+            chave += f':{parametro}={params.get(parametro, "")}'
+        return chave
+
+    def etag(self, partes, contexto, params):
+        """
+        ETag da seção sem montar o corpo
+
+        Args:
+            partes: {modelo: (última alteração, quantidade)} do entregador
+        """
+        escopo = [self.nome, contexto.entregador.pk]
+        if self.por_periodo:
+            # Como em validador_relatorio: período resolvido, parâmetros e foto
+            user = contexto.entregador
+            escopo += [
+                contexto.periodo.chave,
+                sorted((chave, valores) for chave, valores in params.lists() if chave != 'secoes'),
+                user.foto.name if getattr(user, 'foto', None) else '',
+            ]
+        return Validador([partes[modelo] for modelo in self.modelos], escopo).etag
+
+
+SECOES = {
+    secao.nome: secao
+    for secao in (
+        SecaoPacote(
+            'estatisticas', 'estatisticas',
+            lambda contexto, params: dados_estatisticas(contexto)
+        ),
+        SecaoPacote(
+            'dashboard', 'dashboard',
+            lambda contexto, params: {
+                'success': True,
+                'data': dados_dashboard(contexto, params.get('periodo', 'mes'))
+            }
+        ),
+        SecaoPacote(
+            'trabalho', 'trabalho',
+            lambda contexto, params: {'success': True, 'data': dados_trabalho(contexto)}
+        ),
+        SecaoPacote(
+            'despesas', 'despesas',
+            lambda contexto, params: {
+                'success': True,
+                'data': dados_despesas(contexto, params.get('agrupar') or None)
+            },
+            parametros=('agrupar',)
+        ),
+        SecaoPacote(
+            'veiculos', 'veiculos',
+            lambda contexto, params: dados_veiculos(contexto.entregador),
+            por_periodo=False,
+            modelos=(Veiculo,)
+        ),
+    )
+}
+
+
+def etags_conhecidas(cabecalho):
+    """ETags enviadas pelo cliente em If-None-Match"""
+    if not cabecalho:
+        return set()
+    return {etag.strip() for etag in cabecalho.split(',') if etag.strip()}
+
+
+class PacoteService:
+    """
+    Montagem do pacote de seções da tela inicial
+    """
+
+    @staticmethod
+    def secoes_solicitadas(valor):
+        """
+        Interpreta `?secoes=` (lista separada por vírgula; vazio = todas)
+
+        Raises:
+            ValueError: Se alguma seção não existir
+        """
+        if not valor:
+            return list(SECOES)
+        nomes = []
+        for nome in valor.split(','):
+            nome = nome.strip().lower()
+            if not nome or nome in nomes:
+                continue
+            if nome not in SECOES:
+                raise ValueError(
+                    f"Seção inválida: {nome}. Use: {', '.join(SECOES)}"
+                )
+            nomes.append(nome)
+        return nomes
+
+    @staticmethod
+    def montar(contexto, params, nomes, conhecidas=frozenset()):
+        """
+        Monta as seções pedidas com um único contexto de relatório
+
+        Os ETags de todas as seções saem de uma única consulta agregada; só as
+        seções que o cliente não tem na versão atual são montadas (ou lidas do
+        ReportCache).
+
+        Args:
+            contexto: ContextoRelatorio da requisição
+            params: QueryDict da query string (periodo, agrupar...)
+            nomes: Seções solicitadas
+            conhecidas: ETags que o cliente já possui
+
+        Returns:
+            dict: {seção: {'status', 'etag', 'data'}}; seções inalteradas
+            voltam com status 304 e sem 'data', seções com erro com status 500
+        """
+        user_id = contexto.entregador.id
+        validador = validador_entregador(
+            contexto.entregador, *(modelo.objects.all() for modelo in MODELOS_PACOTE)
+        )
+        partes = dict(zip(MODELOS_PACOTE, validador.partes))
+
+        resultado = {}
+        for nome in nomes:
+            secao = SECOES[nome]
+            try:
+                etag = secao.etag(partes, contexto, params)
+                if etag in conhecidas:
+                    resultado[nome] = {'status': 304, 'etag': etag}
+                    continue
+
+                chave = secao.chave_cache(contexto, params)
+                corpo = ReportCache.get(user_id, secao.nome_cache, chave)
+                if corpo is None:
+                    corpo = secao.montar(contexto, params)
+                    ReportCache.set(user_id, secao.nome_cache, chave, corpo)
+                resultado[nome] = {'status': 200, 'etag': etag, 'data': corpo}
+            except Exception as e:
+                logger.error(f"Erro ao montar seção {nome} do pacote: {str(e)}", exc_info=True)
+                resultado[nome] = {'status': 500, 'error': str(e)}
+        return resultado
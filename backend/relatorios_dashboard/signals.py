@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from cadastro_veiculo.models import Veiculo
+from registro_entregadespesa.models import RegistroTrabalho, Despesa, CategoriaDespesa
+from .cache_service import ReportCache
+
+
+@receiver(post_save, sender=RegistroTrabalho)
+@receiver(post_save, sender=Despesa)
+@receiver(post_save, sender=Veiculo)
+@receiver(post_save, sender=CategoriaDespesa)
+@receiver(post_delete, sender=RegistroTrabalho)
+@receiver(post_delete, sender=Despesa)
+@receiver(post_delete, sender=Veiculo)
+@receiver(post_delete, sender=CategoriaDespesa)
+def invalidar_cache_relatorios(sender, instance, **kwargs):
+    """Invalida os relatórios em cache do entregador dono do registro"""
+    ReportCache.invalidar(instance.entregador_id)
@@ -0,0 +1,273 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from cadastro_veiculo.models import Veiculo
+from registro_entregadespesa.models import CategoriaDespesa, Despesa, RegistroTrabalho
+from usuarios.models import Entregador
+from .cache_service import ReportCache
+
+
+def criar_entregador(email, **extra):
+    return Entregador.objects.create_user(
+        email=email, password='senha-teste', nome='Teste', telefone='11999999999', **extra
+    )
+
+
+class CacheCategoriasTests(TestCase):
+    """Nomes de categorias personalizadas no relatório de despesas em cache"""
+
+    url = '/api/relatorios/despesas/'
+
+    def setUp(self):
+        cache.clear()
+        self.entregador = criar_entregador('categorias@teste.com')
+        self.categoria = CategoriaDespesa.objects.create(nome='Pedágio', entregador=self.entregador)
+        Despesa.objects.create(
+            entregador=self.entregador, data=date.today(), tipo_despesa='outros',
+            categoria_personalizada=self.categoria, descricao='Ponte', valor=Decimal('12.50')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _nomes(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta.status_code, 200)
+        return [item['nome'] for item in resposta.json()['data']['despesas_por_categoria']]
+
+    def test_renomear_categoria_invalida_o_cache(self):
+        self.assertIn('Pedágio', self._nomes())
+
+        self.categoria.nome = 'Estacionamento'
+        self.categoria.save()
+
+        nomes = self._nomes()
+        self.assertIn('Estacionamento', nomes)
+        self.assertNotIn('Pedágio', nomes)
+
+    def test_excluir_categoria_invalida_o_cache(self):
+        self.assertIn('Pedágio', self._nomes())
+
+        self.categoria.delete()
+
+        self.assertNotIn('Pedágio', self._nomes())
+
+
+class CacheRelatoriosTests(TestCase):
+    """Cache dos relatórios invalidado a cada gravação do entregador"""
+
+    url = '/api/relatorios/estatisticas/'
+
+    def setUp(self):
+        cache.clear()
+        self.entregador = criar_entregador('cache@teste.com')
+        self.outro = criar_entregador('outro@teste.com')
+        self.despesa = Despesa.objects.create(
+            entregador=self.entregador, data=date.today(), tipo_despesa='combustivel',
+            descricao='Gasolina', valor=Decimal('40.00')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _estatisticas(self):
+        resposta = self.client.get(self.url, {'periodo': 'semana'})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_segunda_leitura_vem_do_cache(self):
+        self._estatisticas()
+        # Apenas o validador do GET condicional
+        with self.assertNumQueries(1):
+            self._estatisticas()
+
+    def test_gravacoes_invalidam_o_cache(self):
+        self.assertEqual(Decimal(str(self._estatisticas()['totalDespesas'])), Decimal('40.00'))
+
+        RegistroTrabalho.objects.create(
+            entregador=self.entregador, data=date.today(), hora_inicio=time(8), hora_fim=time(12),
+            quantidade_entregues=7, quantidade_nao_entregues=0, tipo_pagamento='diaria', valor=Decimal('90.00')
+        )
+        self.assertEqual(self._estatisticas()['totalEntregas'], 7)
+
+        self.despesa.valor = Decimal('55.00')
+        self.despesa.save()
+        self.assertEqual(Decimal(str(self._estatisticas()['totalDespesas'])), Decimal('55.00'))
+
+        Veiculo.objects.create(entregador=self.entregador, tipo='moto', modelo='CG 160')
+        self.assertEqual(self._estatisticas()['veiculosCadastrados'], 1)
+
+        self.despesa.delete()
+        self.assertEqual(Decimal(str(self._estatisticas()['totalDespesas'])), Decimal('0'))
+
+    def test_gravacao_de_outro_entregador_mantem_o_cache(self):
+        self._estatisticas()
+        Despesa.objects.create(
+            entregador=self.outro, data=date.today(), tipo_despesa='outros',
+            descricao='Outro', valor=Decimal('10.00')
+        )
+
+        with self.assertNumQueries(1):
+            self._estatisticas()
+
+
+class RelogioFalso:
+    """timezone.now() controlado pelo teste (auto_now e períodos relativos usam o mesmo relógio)"""
+
+    def __init__(self, inicio):
+        self.agora = inicio
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, **intervalo):
+        self.agora += timedelta(**intervalo)
+
+
+class GetCondicionalTests(TestCase):
+    """ETag das APIs de leitura com relógio falso"""
+
+    def setUp(self):
+        cache.clear()
+        self.relogio = RelogioFalso(timezone.make_aware(datetime(2026, 3, 10, 12, 0)))
+        patcher = mock.patch('django.utils.timezone.now', self.relogio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.entregador = criar_entregador('condicional@teste.com')
+        self.despesas = []
+        for indice in range(2):
+            self.despesas.append(Despesa.objects.create(
+                entregador=self.entregador, data=self.relogio().date(), tipo_despesa='combustivel',
+                descricao=f'Abastecimento {indice}', valor=Decimal('40.00')
+            ))
+            self.relogio.avancar(minutes=5)
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _get(self, url, **cabecalhos):
+        return self.client.get(url, **cabecalhos)
+
+    def test_mesma_versao_responde_304(self):
+        for url in ('/api/relatorios/despesas/', '/registro/api/registro-despesa/'):
+            with self.subTest(url=url):
+                primeira = self._get(url)
+                self.assertEqual(primeira.status_code, 200)
+
+                segunda = self._get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+                self.assertEqual(segunda.status_code, 304)
+
+    def test_exclusao_muda_a_etag(self):
+        url = '/registro/api/registro-despesa/'
+        primeira = self._get(url)
+        self.relogio.avancar(minutes=1)
+
+        # A mais antiga: o maior atualizado_em continua o mesmo
+        self.despesas[0].delete()
+
+        resposta = self._get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], primeira['ETag'])
+        self.assertEqual(resposta.json()['count'], 1)
+
+    def test_if_modified_since_nao_gera_304(self):
+        url = '/registro/api/registro-despesa/'
+        primeira = self._get(url)
+        self.assertNotIn('Last-Modified', primeira)
+        self.relogio.avancar(minutes=1)
+
+        self.despesas[0].delete()
+
+        resposta = self._get(url, HTTP_IF_MODIFIED_SINCE=http_date(self.relogio().timestamp()))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['count'], 1)
+
+    def test_virada_do_dia_muda_a_etag_do_periodo_relativo(self):
+        url = '/api/relatorios/despesas/?periodo=semana'
+        primeira = self._get(url)
+
+        self.relogio.avancar(hours=1)
+        self.assertEqual(self._get(url, HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 304)
+
+        # Dia seguinte, sem nenhuma alteração nos dados: a janela de 7 dias andou
+        self.relogio.avancar(days=1)
+        resposta = self._get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], primeira['ETag'])
+
+        resposta = self._get(url, HTTP_IF_MODIFIED_SINCE=http_date(self.relogio().timestamp()))
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_virada_do_dia_muda_a_etag_do_periodo_personalizado(self):
+        for url in ('/api/relatorios/estatisticas/', '/registro/api/dashboard-data/'):
+            with self.subTest(url=url):
+                parametros = {'data_inicio': '2026-03-01', 'data_fim': '2026-03-10'}
+                primeira = self.client.get(url, parametros)
+                self.assertEqual(primeira.status_code, 200)
+
+                # diasConectado e as séries dos últimos dias dependem da data atual
+                self.relogio.avancar(days=1)
+                resposta = self.client.get(url, parametros, HTTP_IF_NONE_MATCH=primeira['ETag'])
+                self.assertEqual(resposta.status_code, 200)
+                self.assertNotEqual(resposta['ETag'], primeira['ETag'])
+
+
+class PacoteCondicionalTests(TestCase):
+    """ETag por seção do pacote da tela inicial"""
+
+    url = '/api/relatorios/pacote/'
+
+    def setUp(self):
+        cache.clear()
+        self.entregador = criar_entregador('pacote@teste.com')
+        self.despesa = Despesa.objects.create(
+            entregador=self.entregador, data=date.today(), tipo_despesa='combustivel',
+            descricao='Gasolina', valor=Decimal('40.00')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.entregador)
+
+    def _secoes(self, etags=(), **params):
+        resposta = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=', '.join(etags))
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['secoes']
+
+    def _etags(self, secoes):
+        return [secao['etag'] for secao in secoes.values()]
+
+    def test_secoes_conhecidas_nao_sao_montadas(self):
+        etags = self._etags(self._secoes(periodo='semana'))
+        cache.clear()
+
+        # Apenas a consulta do validador: nenhuma seção é montada nem lida do cache
+        with self.assertNumQueries(1), mock.patch.object(ReportCache, 'get', wraps=ReportCache.get) as cache_get:
+            secoes = self._secoes(etags, periodo='semana')
+
+        cache_get.assert_not_called()
+        self.assertEqual({secao['status'] for secao in secoes.values()}, {304})
+        self.assertTrue(all('data' not in secao for secao in secoes.values()))
+
+    def test_alteracao_remonta_apenas_as_secoes_afetadas(self):
+        etags = self._etags(self._secoes(periodo='semana'))
+
+        self.despesa.valor = Decimal('55.00')
+        self.despesa.save()
+
+        secoes = self._secoes(etags, periodo='semana')
+        self.assertEqual(secoes['veiculos']['status'], 304)
+        self.assertEqual(secoes['despesas']['status'], 200)
+        self.assertEqual(secoes['despesas']['data']['data']['total_despesas'], 55.0)
+
+    def test_parametros_e_secoes_pedidas(self):
+        completo = self._secoes(periodo='semana')
+        so_despesas = self._secoes(secoes='despesas', periodo='semana')
+        self.assertEqual(so_despesas['despesas']['etag'], completo['despesas']['etag'])
+
+        agrupado = self._secoes(secoes='despesas', periodo='semana', agrupar='mes')
+        self.assertNotEqual(agrupado['despesas']['etag'], completo['despesas']['etag'])
+        self.assertIn('despesas_por_periodo', agrupado['despesas']['data']['data'])
@@ -0,0 +1,49 @@
+"""
+Normalização de texto e busca por prefixo para os índices de busca
+(conteúdo da comunidade e usuários no painel administrativo).
+
+Os termos indexados só têm [0-9a-z] (minúsculas, sem acentos), que ordenam
+igual no ASCII e nas collations Unicode do SQLite, MySQL e PostgreSQL. Assim
+"começa com p" vira o intervalo `termo >= p AND termo < sucessor(p)`, que usa
+um índice B-tree comum em qualquer um dos bancos.
+"""
+import re
+import unicodedata
+
+from django.db.models import Q
+
+ALFABETO = '0123456789abcdefghijklmnopqrstuvwxyz'
+PALAVRA = re.compile(r'[a-z0-9]+')
+
+# Palavras muito frequentes que não ajudam a encontrar nada
+STOPWORDS = frozenset({
+    'a', 'as', 'o', 'os', 'e', 'de', 'da', 'das', 'do', 'dos', 'em', 'no', 'na',
+    'nos', 'nas', 'um', 'uma', 'para', 'por', 'com', 'que', 'se', 'ao', 'ou',
+})
+
+
+def normalizar(texto):
+    """Texto em minúsculas, sem acentos e separado em palavras"""
+    decomposto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return PALAVRA.findall(sem_acentos)
+
+
+def sucessor(prefixo):
+    """
+    Menor string maior que todas as que começam com `prefixo` (None se não
+    houver)
+    """
+    prefixo = prefixo.rstrip(ALFABETO[-1])
+    if not prefixo:
+        return None
+    return prefixo[:-1] + ALFABETO[ALFABETO.index(prefixo[-1]) + 1]
+
+
+def filtro_prefixo(prefixo, campo='termo'):
+    """Q de `campo` começando com `prefixo` como intervalo (usa índice)"""
+    filtro = Q(**{f'{campo}__gte': prefixo})
+    limite = sucessor(prefixo)
+    if limite is not None:
+        filtro &= Q(**{f'{campo}__lt': limite})
+    return filtro
@@ -0,0 +1,147 @@
+"""
+Requisições condicionais (ETag) para as APIs de leitura.
+
+O validador de um recurso vem de uma consulta agregada barata (maior
+`atualizado_em` e quantidade de linhas), sem montar o corpo da resposta. Se o
+cliente já tem a versão atual (If-None-Match), a view não é executada e a
+resposta é 304 sem corpo.
+
+Inserções e edições avançam o maior timestamp, exclusões reduzem a contagem e
+o escopo (usuário, filtros, período resolvido) cobre o resto, então qualquer
+alteração muda a ETag.
+
+Last-Modified não é emitido nem If-Modified-Since avaliado: para recursos
+agregados a data da última alteração sozinha não muda quando uma linha é
+excluída ou quando um período relativo passa para o dia seguinte, e o 304
+devolveria dados desatualizados.
+"""
+import hashlib
+import logging
+from functools import wraps
+
+from django.db import models
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from usuarios.models import Entregador
+
+logger = logging.getLogger(__name__)
+
+METODOS_CONDICIONAIS = ('GET', 'HEAD')
+
+
+class Validador:
+    """
+    ETag de um recurso
+
+    Args:
+        partes: Pares (última alteração, quantidade de linhas) dos conjuntos
+            que compõem a resposta
+        escopo: Outros valores que alteram a resposta (usuário, filtros...)
+    """
+
+    def __init__(self, partes, escopo=()):
+        self.partes = list(partes)
+
+        conteudo = '|'.join(
+            [f"{alteracao.isoformat() if alteracao else '-'}:{quantidade}" for alteracao, quantidade in self.partes]
+            + [str(valor) for valor in escopo]
+        )
+        self.etag = f'W/"{hashlib.sha1(conteudo.encode("utf-8")).hexdigest()[:24]}"'
+
+    def aplicar(self, response):
+        """Grava a ETag na resposta e obriga o cliente a revalidar"""
+        response['ETag'] = self.etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def validador_querysets(*querysets, campo='atualizado_em', escopo=()):
+    """
+    Validador de um ou mais querysets (uma consulta agregada por queryset)
+
+    Args:
+        querysets: Conjuntos já filtrados que compõem a resposta
+        campo: Campo de timestamp atualizado a cada alteração
+        escopo: Outros valores que alteram a resposta
+    """
+    partes = []
+    for queryset in querysets:
+        agregado = queryset.order_by().aggregate(
+            ultima_alteracao=models.Max(campo),
+            quantidade=models.Count('pk')
+        )
+        partes.append((agregado['ultima_alteracao'], agregado['quantidade']))
+    return Validador(partes, escopo)
+
+
+def validador_entregador(entregador, *querysets, campo='atualizado_em', escopo=()):
+    """
+    Validador dos registros de um entregador em vários modelos, em uma única
+    consulta (subconsultas de máximo e contagem por modelo)
+
+    Args:
+        entregador: Dono dos registros
+        querysets: Querysets dos modelos (com FK `entregador`), opcionalmente filtrados
+        campo: Campo de timestamp atualizado a cada alteração
+        escopo: Outros valores que alteram a resposta
+    """
+    anotacoes = {}
+    for indice, queryset in enumerate(querysets):
+        do_entregador = (
+            queryset.filter(entregador=models.OuterRef('pk'))
+            .order_by()
+            .values('entregador')
+        )
+        anotacoes[f'ultima_alteracao_{indice}'] = models.Subquery(
+            do_entregador.annotate(valor=models.Max(campo)).values('valor'),
+            output_field=models.DateTimeField()
+        )
+        anotacoes[f'quantidade_{indice}'] = models.Subquery(
+            do_entregador.annotate(valor=models.Count('pk')).values('valor'),
+            output_field=models.IntegerField()
+        )
+
+    valores = Entregador.objects.filter(pk=entregador.pk).annotate(**anotacoes).values(*anotacoes).get()
+    partes = [
+        (valores[f'ultima_alteracao_{indice}'], valores[f'quantidade_{indice}'] or 0)
+        for indice in range(len(querysets))
+    ]
+    return Validador(partes, (entregador.pk, *escopo))
+
+
+def get_condicional(calcular_validador):
+    """
+    Decorator de views de leitura com suporte a GET condicional
+
+    Args:
+        calcular_validador: Função (request, *args, **kwargs) -> Validador ou
+            None (None desativa a verificação, ex.: parâmetros inválidos que a
+            própria view vai rejeitar)
+
+    Em views DRF deve ficar abaixo de @api_view (ou em método da classe), para
+    que o validador seja calculado com o usuário já autenticado. Métodos que
+    não são GET/HEAD e respostas de erro passam sem alteração.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in METODOS_CONDICIONAIS:
+                return view_func(request, *args, **kwargs)
+
+            try:
+                validador = calcular_validador(request, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Não foi possível calcular o validador de {request.path}: {str(e)}")
+                validador = None
+            if validador is None:
+                return view_func(request, *args, **kwargs)
+
+            # Só a ETag: If-Modified-Since sozinho não detecta exclusões (ver topo do módulo)
+            response = get_conditional_response(request, etag=validador.etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return validador.aplicar(response)
+        return wrapper
+    return decorator
@@ -147,6 +147,45 @@ else:
         }
     }
 
+# Índices parciais (comunidade) não existem no MySQL; lá os índices compostos
+# equivalentes atendem às mesmas consultas
+SILENCED_SYSTEM_CHECKS = ['models.W037']
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+# Redis quando disponível; caso contrário, cache em memória local do processo
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'entregasplus',
+        }
+    }
+
+# Tempo (segundos) dos relatórios em cache por entregador
+RELATORIOS_CACHE_TIMEOUT = int(os.getenv('RELATORIOS_CACHE_TIMEOUT', '300'))
+
+# Feed público da comunidade: itens por página, páginas iniciais em cache e tempo (segundos)
+COMUNIDADE_FEED_PAGE_SIZE = int(os.getenv('COMUNIDADE_FEED_PAGE_SIZE', '20'))
+COMUNIDADE_FEED_PAGINAS_CACHE = int(os.getenv('COMUNIDADE_FEED_PAGINAS_CACHE', '3'))
+COMUNIDADE_FEED_CACHE_TIMEOUT = int(os.getenv('COMUNIDADE_FEED_CACHE_TIMEOUT', '120'))
+
+# Estatísticas de moderação: contadores incrementais (recalcular_contadores_comunidade ao ativar) e cache (segundos)
+COMUNIDADE_ESTATISTICAS_CONTADORES = os.getenv('COMUNIDADE_ESTATISTICAS_CONTADORES', 'False').lower() in ['1', 'true', 'yes', 'on']
+COMUNIDADE_ESTATISTICAS_CACHE_TIMEOUT = int(os.getenv('COMUNIDADE_ESTATISTICAS_CACHE_TIMEOUT', '300'))
+
+# Tempo (segundos) das métricas de entregadores do painel administrativo em cache
+ADMIN_METRICAS_CACHE_TIMEOUT = int(os.getenv('ADMIN_METRICAS_CACHE_TIMEOUT', '30'))
+
 # ============================================================================
 # AUTENTICAÇÃO E SENHAS
 # ============================================================================
@@ -196,10 +235,9 @@ if not DEBUG:
 # ============================================================================
 
 REST_FRAMEWORK = {
+    # Bearer -> JWT, Token -> TokenAuthentication, cookie de sessão -> sessão
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
+        'usuarios.auth.authentication.AutenticacaoPorCabecalho',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -214,6 +252,22 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Tamanho padrão das páginas das listagens de registros (paginação por cursor)
+REGISTROS_PAGE_SIZE = int(os.getenv('REGISTROS_PAGE_SIZE', '50'))
+
+# Quantidade máxima de itens aceitos pelos endpoints de gravação em lote
+REGISTROS_LOTE_MAXIMO = int(os.getenv('REGISTROS_LOTE_MAXIMO', '500'))
+
+# Sincronização offline: por quanto tempo os tombstones de exclusão são mantidos
+# (watermarks mais antigos recebem uma sincronização completa) e tamanho máximo
+# do lote de mutações enviado pelo app
+SYNC_RETENCAO_EXCLUSOES_DIAS = int(os.getenv('SYNC_RETENCAO_EXCLUSOES_DIAS', '90'))
+SYNC_MAX_MUTACOES = int(os.getenv('SYNC_MAX_MUTACOES', '500'))
+
+# Tempo (segundos) dos campos essenciais do usuário autenticado em cache por processo
+# (desligado com LocMemCache: a invalidação precisa de um cache compartilhado)
+AUTH_USUARIO_CACHE_TIMEOUT = int(os.getenv('AUTH_USUARIO_CACHE_TIMEOUT', '60'))
+
 REST_USE_JWT = True
 JWT_AUTH_COOKIE = 'jwt-auth'
 
@@ -232,6 +286,26 @@ if DEBUG and not SENDGRID_API_KEY:
 else:
     logger.info("SendGrid configurado corretamente.")
 
+# Fila de envio (usuarios/email/email_queue.py):
+# 'thread' envia em segundo plano no próprio processo web, 'worker' depende do
+# comando process_email_queue (processo worker do Procfile) e 'sync' envia
+# dentro da requisição (testes). Padrão: 'thread' em desenvolvimento, 'worker'
+# em produção
+EMAIL_QUEUE_MODE = os.getenv('EMAIL_QUEUE_MODE', 'thread' if DEBUG else 'worker')
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', '5'))
+EMAIL_QUEUE_BACKOFF_SECONDS = int(os.getenv('EMAIL_QUEUE_BACKOFF_SECONDS', '30'))
+EMAIL_QUEUE_BACKOFF_MAX_SECONDS = int(os.getenv('EMAIL_QUEUE_BACKOFF_MAX_SECONDS', '3600'))
+# Dias que mensagens enviadas/descartadas ficam na fila antes de serem removidas
+EMAIL_QUEUE_RETENTION_DAYS = int(os.getenv('EMAIL_QUEUE_RETENTION_DAYS', '7'))
+# Backend usado apenas pela fila (ex.: django.core.mail.backends.locmem.EmailBackend
+# em testes); vazio usa EMAIL_BACKEND
+EMAIL_QUEUE_BACKEND = os.getenv('EMAIL_QUEUE_BACKEND') or None
+
+# 2FA: tempo (segundos) da decisão de dispositivo confiável em cache e intervalo
+# mínimo entre gravações de last_used do mesmo dispositivo
+TWO_FACTOR_DISPOSITIVO_CACHE_TIMEOUT = int(os.getenv('TWO_FACTOR_DISPOSITIVO_CACHE_TIMEOUT', '3600'))
+TWO_FACTOR_LAST_USED_INTERVALO_MINUTOS = int(os.getenv('TWO_FACTOR_LAST_USED_INTERVALO_MINUTOS', '15'))
+
 # ============================================================================
 # SEGURANÇA E CSRF
 # ============================================================================
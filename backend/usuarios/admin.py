@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from usuarios.models import Entregador
+from usuarios.email.email_queue import EmailQueueService
+from usuarios.models import Entregador, OutboundEmail
 
 class EntregadorAdmin(UserAdmin):
     model = Entregador
@@ -20,3 +21,17 @@ class EntregadorAdmin(UserAdmin):
     ordering = ('email',)
 
 admin.site.register(Entregador, EntregadorAdmin)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'purpose', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'purpose']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['created_at', 'sent_at', 'locked_at', 'last_error']
+    actions = ['requeue']
+
+    @admin.action(description='Reenfileirar emails que falharam')
+    def requeue(self, request, queryset):
+        total = EmailQueueService.requeue_dead(list(queryset.values_list('id', flat=True)))
+        self.message_user(request, f'{total} email(s) devolvido(s) à fila')
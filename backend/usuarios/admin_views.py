@@ -6,11 +6,11 @@ from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
-from django.db.models import Count, Q
-from django.utils import timezone
-from datetime import timedelta
 from usuarios.models import Entregador
 from usuarios.auth.auth_serializers import UserListSerializer
+from usuarios.busca_service import BuscaUsuarios
+from usuarios.metricas_service import MetricasAdmin
+from registro_entregadespesa.pagination import ParametroInvalido
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,32 +33,18 @@ class AdminDashboardView(APIView):
                     'error': 'Acesso negado. Apenas administradores podem acessar esta funcionalidade.'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Estatísticas básicas
-            total_entregadores = Entregador.objects.count()
-            entregadores_ativos = Entregador.objects.filter(is_active=True).count()
-            entregadores_inativos = Entregador.objects.filter(is_active=False).count()
-            
-            # Entregadores registrados hoje
-            hoje = timezone.now().date()
-            registrados_hoje = Entregador.objects.filter(date_joined__date=hoje).count()
-            
-            # Entregadores registrados na última semana
-            semana_passada = hoje - timedelta(days=7)
-            registrados_semana = Entregador.objects.filter(date_joined__date__gte=semana_passada).count()
-            
-            # Entregadores registrados no último mês
-            mes_passado = hoje - timedelta(days=30)
-            registrados_mes = Entregador.objects.filter(date_joined__date__gte=mes_passado).count()
+            # Totais e cadastros por período (uma consulta, em cache por poucos segundos)
+            metricas = MetricasAdmin.obter()
             
             return Response({
                 'success': True,
                 'data': {
-                    'total_entregadores': total_entregadores,
-                    'entregadores_ativos': entregadores_ativos,
-                    'entregadores_inativos': entregadores_inativos,
-                    'registrados_hoje': registrados_hoje,
-                    'registrados_semana': registrados_semana,
-                    'registrados_mes': registrados_mes,
+                    'total_entregadores': metricas['total_entregadores'],
+                    'entregadores_ativos': metricas['entregadores_ativos'],
+                    'entregadores_inativos': metricas['entregadores_inativos'],
+                    'registrados_hoje': metricas['registrados_hoje'],
+                    'registrados_semana': metricas['registrados_semana'],
+                    'registrados_mes': metricas['registrados_mes'],
                 }
             }, status=status.HTTP_200_OK)
             
@@ -89,48 +75,39 @@ class AdminUsersAPIView(APIView):
                 }, status=status.HTTP_403_FORBIDDEN)
             
             # Parâmetros de filtro
-            search = request.GET.get('search', '')
+            search = request.GET.get('search', '').strip()
             status_filter = request.GET.get('status', 'all')  # all, active, inactive
             page = int(request.GET.get('page', 1))
             per_page = int(request.GET.get('per_page', 10))
+            cursor = request.GET.get('cursor') or None
             
-            # Query base
-            queryset = Entregador.objects.all()
-            
-            # Filtro de busca
-            if search:
-                queryset = queryset.filter(
-                    Q(nome__icontains=search) |
-                    Q(email__icontains=search) |
-                    Q(cpf__icontains=search)
-                )
-            
-            # Filtro de status
-            if status_filter == 'active':
-                queryset = queryset.filter(is_active=True)
-            elif status_filter == 'inactive':
-                queryset = queryset.filter(is_active=False)
-            
-            # Ordenação
-            queryset = queryset.order_by('-date_joined')
-            
-            # Paginação
+            ativo = {'active': True, 'inactive': False}.get(status_filter)
             start = (page - 1) * per_page
-            end = start + per_page
-            entregadores = queryset[start:end]
+            
+            # Busca indexada por nome/email/CPF (relevância) ou listagem por data de cadastro;
+            # `cursor` (next_cursor da página anterior) pagina sem OFFSET
+            try:
+                if search:
+                    resultado = BuscaUsuarios.buscar(search, ativo=ativo, cursor=cursor, inicio=start, limite=per_page)
+                else:
+                    resultado = BuscaUsuarios.listar(ativo=ativo, cursor=cursor, inicio=start, limite=per_page)
+            except ParametroInvalido as e:
+                return Response({
+                    'success': False,
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            entregadores = resultado['entregadores']
             
             # Serializar dados
             serializer = UserListSerializer(entregadores, many=True)
             
-            # Log para debug
-            logger.info(f"Entregadores encontrados: {len(entregadores)}")
-            for entregador in entregadores:
-                logger.info(f"Entregador: {entregador.email}, is_active: {entregador.is_active}")
+            logger.debug(f"Entregadores encontrados: {len(entregadores)}")
             
             # Estatísticas
-            total_count = queryset.count()
-            active_count = Entregador.objects.filter(is_active=True).count()
-            inactive_count = Entregador.objects.filter(is_active=False).count()
+            total_count = resultado['total']
+            metricas = MetricasAdmin.obter()
+            active_count = metricas['entregadores_ativos']
+            inactive_count = metricas['entregadores_inativos']
             
             return Response({
                 'success': True,
@@ -140,7 +117,8 @@ class AdminUsersAPIView(APIView):
                         'page': page,
                         'per_page': per_page,
                         'total': total_count,
-                        'total_pages': (total_count + per_page - 1) // per_page
+                        'total_pages': (total_count + per_page - 1) // per_page,
+                        'next_cursor': resultado['next_cursor']
                     },
                     'stats': {
                         'total': total_count,
@@ -183,6 +161,7 @@ class AdminUsersAPIView(APIView):
             if is_active is not None:
                 entregador.is_active = is_active
                 entregador.save()
+                MetricasAdmin.invalidar()
                 
                 status_text = 'ativado' if is_active else 'desativado'
                 logger.info(f"Usuário {entregador.email} {status_text} pelo admin {request.user.email}")
@@ -236,6 +215,7 @@ class AdminUsersAPIView(APIView):
             # Excluir usuário
             email = entregador.email
             entregador.delete()
+            MetricasAdmin.invalidar()
             
             logger.info(f"Usuário {email} excluído pelo admin {request.user.email}")
             
@@ -270,48 +250,12 @@ class AdminStatsAPIView(APIView):
                     'error': 'Acesso negado. Apenas administradores podem acessar esta funcionalidade.'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # Estatísticas básicas
-            total_entregadores = Entregador.objects.count()
-            entregadores_ativos = Entregador.objects.filter(is_active=True).count()
-            entregadores_inativos = Entregador.objects.filter(is_active=False).count()
-            
-            # Estatísticas por período
-            hoje = timezone.now().date()
-            semana_passada = hoje - timedelta(days=7)
-            mes_passado = hoje - timedelta(days=30)
-            
-            registrados_hoje = Entregador.objects.filter(date_joined__date=hoje).count()
-            registrados_semana = Entregador.objects.filter(date_joined__date__gte=semana_passada).count()
-            registrados_mes = Entregador.objects.filter(date_joined__date__gte=mes_passado).count()
-            
-            # Estatísticas por mês (últimos 6 meses)
-            stats_por_mes = []
-            for i in range(6):
-                data_inicio = hoje.replace(day=1) - timedelta(days=30*i)
-                data_fim = data_inicio.replace(day=1) + timedelta(days=32)
-                data_fim = data_fim.replace(day=1) - timedelta(days=1)
-                
-                count = Entregador.objects.filter(
-                    date_joined__date__gte=data_inicio,
-                    date_joined__date__lte=data_fim
-                ).count()
-                
-                stats_por_mes.append({
-                    'mes': data_inicio.strftime('%Y-%m'),
-                    'count': count
-                })
+            # Totais, cadastros por período e por mês de calendário (uma consulta, em cache)
+            metricas = MetricasAdmin.obter()
             
             return Response({
                 'success': True,
-                'data': {
-                    'total_entregadores': total_entregadores,
-                    'entregadores_ativos': entregadores_ativos,
-                    'entregadores_inativos': entregadores_inativos,
-                    'registrados_hoje': registrados_hoje,
-                    'registrados_semana': registrados_semana,
-                    'registrados_mes': registrados_mes,
-                    'stats_por_mes': stats_por_mes
-                }
+                'data': metricas
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
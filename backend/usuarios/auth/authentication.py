@@ -0,0 +1,197 @@
+"""
+Autenticação JWT com cache do usuário por processo.
+
+A JWTAuthentication padrão busca a linha inteira do Entregador (endereço,
+foto, campos de 2FA e de verificação) em toda requisição autenticada. Aqui
+só os campos essenciais (id, email, nome, flags de acesso...) são lidos e
+guardados em memória por AUTH_USUARIO_CACHE_TIMEOUT segundos, na chave
+(id do usuário, versão). A versão fica no cache compartilhado e é
+incrementada pelos sinais quando o perfil, o status ativo ou a senha mudam
+(usuarios/signals.py), o que invalida as cópias de todos os processos.
+
+Isso só vale com um cache compartilhado entre processos (Redis, memcached,
+banco ou arquivo). Com LocMemCache a versão é de cada processo: um worker
+não veria a invalidação feita por outro e continuaria aceitando, por até
+AUTH_USUARIO_CACHE_TIMEOUT segundos, um usuário desativado ou com a senha
+trocada. Nesse caso a cópia em memória fica desligada e cada requisição lê
+os campos essenciais do banco.
+
+O request.user é um Entregador com os demais campos adiados: o primeiro
+acesso a qualquer um deles carrega o restante da linha em uma consulta.
+
+AutenticacaoPorCabecalho é a classe padrão do DRF: lê o esquema do
+cabeçalho Authorization uma vez e usa um único backend (JWT, Token ou
+sessão), em vez de tentar os três em sequência.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    BaseAuthentication, SessionAuthentication, TokenAuthentication, get_authorization_header
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from ..models import Entregador
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'auth:usuario'
+MAXIMO_EM_CACHE = 10000
+
+# Backends cujo conteúdo só é visto pelo próprio processo
+CACHES_POR_PROCESSO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Campos carregados na autenticação; os demais são adiados
+CAMPOS_ESSENCIAIS = (
+    'id', 'password', 'email', 'nome', 'username',
+    'is_active', 'is_staff', 'is_superuser', 'email_validado', 'foto',
+)
+
+# (id do usuário, versão) -> (expira em, valores dos campos essenciais)
+_usuarios = {}
+
+
+class CacheUsuarios:
+    """
+    Cache por processo dos campos essenciais dos usuários autenticados
+    """
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'AUTH_USUARIO_CACHE_TIMEOUT', 60)
+
+    @staticmethod
+    def ativo():
+        """Só há cópia em memória se a versão estiver em um cache compartilhado"""
+        return settings.CACHES['default']['BACKEND'] not in CACHES_POR_PROCESSO
+
+    @staticmethod
+    def versao(user_id):
+        return cache.get(f'{PREFIXO}:{user_id}:versao', 0)
+
+    @staticmethod
+    def invalidar(user_id):
+        """Nova versão do usuário: as cópias em cache de todos os processos deixam de valer"""
+        chave = f'{PREFIXO}:{user_id}:versao'
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.add(chave, int(time.time() * 1000), None)
+        for chave_local in [chave_local for chave_local in _usuarios if chave_local[0] == str(user_id)]:
+            _usuarios.pop(chave_local, None)
+
+    @staticmethod
+    def limpar():
+        _usuarios.clear()
+
+    @staticmethod
+    def valores(user_id):
+        """
+        Campos essenciais do usuário (do cache ou do banco)
+
+        Returns:
+            dict ou None se o usuário não existir
+        """
+        if not CacheUsuarios.ativo():
+            return CacheUsuarios._consultar(user_id)
+
+        chave = (str(user_id), CacheUsuarios.versao(user_id))
+        agora = time.monotonic()
+        entrada = _usuarios.get(chave)
+        if entrada is not None and entrada[0] > agora:
+            return entrada[1]
+
+        valores = CacheUsuarios._consultar(user_id)
+        if valores is not None:
+            if len(_usuarios) >= MAXIMO_EM_CACHE:
+                _usuarios.clear()
+            _usuarios[chave] = (agora + CacheUsuarios.timeout(), valores)
+        return valores
+
+    @staticmethod
+    def _consultar(user_id):
+        return (
+            Entregador.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*CAMPOS_ESSENCIAIS)
+            .first()
+        )
+
+    @staticmethod
+    def instancia(valores):
+        """Entregador com os campos essenciais; os demais são carregados juntos no primeiro acesso"""
+        # from_db espera os valores na ordem dos campos do modelo
+        campos = [campo.attname for campo in Entregador._meta.concrete_fields if campo.attname in valores]
+        usuario = Entregador.from_db(
+            router.db_for_read(Entregador), campos, [valores[campo] for campo in campos]
+        )
+        usuario._carregar_linha_completa = True
+        return usuario
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que lê o usuário do CacheUsuarios
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        valores = CacheUsuarios.valores(user_id)
+        if valores is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not valores['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(valores['password']):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return CacheUsuarios.instancia(valores)
+
+
+class AutenticacaoPorCabecalho(BaseAuthentication):
+    """
+    Escolhe o backend pelo esquema do cabeçalho Authorization
+
+    - Bearer: só JWT (sem sessão nem verificação de CSRF)
+    - Token: só TokenAuthentication
+    - Sem cabeçalho ou esquema desconhecido: sessão, apenas se houver cookie
+      de sessão; sem cookie a requisição é anônima sem nenhuma consulta
+    """
+
+    def __init__(self):
+        self.jwt = CachedJWTAuthentication()
+        self.token = TokenAuthentication()
+        self.sessao = SessionAuthentication()
+        self.esquemas_jwt = {tipo.encode() for tipo in api_settings.AUTH_HEADER_TYPES}
+
+    def authenticate(self, request):
+        cabecalho = get_authorization_header(request)
+        esquema = cabecalho.split(None, 1)[0] if cabecalho else b''
+
+        if esquema in self.esquemas_jwt:
+            return self.jwt.authenticate(request)
+        if esquema.lower() == self.token.keyword.lower().encode():
+            return self.token.authenticate(request)
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return self.sessao.authenticate(request)
+        return None
+
+    def authenticate_header(self, request):
+        return self.jwt.authenticate_header(request)
@@ -0,0 +1,279 @@
+"""
+Busca de entregadores no painel administrativo.
+
+Nome, email e CPF de cada entregador são normalizados em TermoBuscaUsuario:
+palavras do nome, o email completo sem pontuação ("joao.silva@x.com" ->
+"joaosilvaxcom"), as palavras da parte local do email e os dígitos do CPF. O
+índice é atualizado ao salvar o entregador (usuarios/signals.py) e pode ser
+reconstruído com `manage.py reindexar_busca_usuarios`.
+
+A consulta casa por prefixo (intervalos em `termo`, ver sistema/busca.py):
+cada palavra digitada precisa aparecer, ou a consulta inteira sem pontuação
+precisa ser prefixo do email/CPF ("123.456" encontra o CPF 12345678900).
+Resultados vêm por relevância (soma dos pesos; termo exato vale o dobro) e são
+paginados por cursor (keyset) em (relevância, id).
+"""
+import base64
+import logging
+import re
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, When
+from django.utils.dateparse import parse_datetime
+
+from registro_entregadespesa.pagination import ParametroInvalido
+from sistema.busca import STOPWORDS, filtro_prefixo, normalizar
+from .models import Entregador, TermoBuscaUsuario
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO = 2
+TAMANHO_MAXIMO = 100
+CAMPOS_INDEXADOS = frozenset({'nome', 'email', 'cpf'})
+PESOS = {
+    'cpf': 5,
+    'email': 4,
+    'nome': 3,
+    'email_palavra': 1,
+}
+
+
+def termos_do_usuario(entregador):
+    """
+    Returns:
+        dict: {(campo, termo): peso} de um entregador
+    """
+    termos = {}
+
+    def adicionar(campo, termo, peso):
+        termo = termo[:TAMANHO_MAXIMO]
+        if len(termo) >= TAMANHO_MINIMO:
+            termos[(campo, termo)] = max(termos.get((campo, termo), 0), peso)
+
+    for palavra in normalizar(entregador.nome):
+        if palavra not in STOPWORDS:
+            adicionar('nome', palavra, PESOS['nome'])
+
+    email = entregador.email or ''
+    adicionar('email', ''.join(normalizar(email)), PESOS['email'])
+    for palavra in normalizar(email.split('@')[0]):
+        adicionar('email', palavra, PESOS['email_palavra'])
+
+    adicionar('cpf', re.sub(r'\D', '', entregador.cpf or ''), PESOS['cpf'])
+    return termos
+
+
+def _codificar_cursor(*valores):
+    bruto = '|'.join(str(valor) for valor in valores).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor, partes=2):
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = base64.urlsafe_b64decode(cursor + preenchimento).decode().split('|')
+        if len(valores) != partes:
+            raise ValueError(cursor)
+        return valores
+    except (ValueError, UnicodeDecodeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+class BuscaUsuarios:
+    """
+    Índice, busca e listagem paginada de entregadores para o admin
+    """
+
+    @staticmethod
+    def indexar(entregador):
+        """Atualiza os termos de um entregador (grava apenas a diferença)"""
+        novos = termos_do_usuario(entregador)
+        atuais = {
+            (campo, termo): peso
+            for campo, termo, peso in TermoBuscaUsuario.objects.filter(
+                entregador=entregador
+            ).values_list('campo', 'termo', 'peso')
+        }
+        if novos == atuais:
+            return
+
+        removidos = [chave for chave, peso in atuais.items() if novos.get(chave) != peso]
+        with transaction.atomic():
+            if removidos:
+                filtro = Q()
+                for campo, termo in removidos:
+                    filtro |= Q(campo=campo, termo=termo)
+                TermoBuscaUsuario.objects.filter(filtro, entregador=entregador).delete()
+            TermoBuscaUsuario.objects.bulk_create([
+                TermoBuscaUsuario(entregador=entregador, campo=campo, termo=termo, peso=peso)
+                for (campo, termo), peso in novos.items()
+                if atuais.get((campo, termo)) != peso
+            ])
+
+    @staticmethod
+    def reindexar(lote=1000):
+        """
+        Reconstrói o índice de todos os entregadores
+
+        Returns:
+            tuple: (entregadores indexados, termos gravados)
+        """
+        entregadores = termos = 0
+        with transaction.atomic():
+            TermoBuscaUsuario.objects.all().delete()
+            pendentes = []
+            for entregador in Entregador.objects.only('pk', *CAMPOS_INDEXADOS).order_by('pk').iterator(chunk_size=lote):
+                entregadores += 1
+                pendentes.extend(
+                    TermoBuscaUsuario(entregador_id=entregador.pk, campo=campo, termo=termo, peso=peso)
+                    for (campo, termo), peso in termos_do_usuario(entregador).items()
+                )
+                if len(pendentes) >= lote:
+                    TermoBuscaUsuario.objects.bulk_create(pendentes, batch_size=lote)
+                    termos += len(pendentes)
+                    pendentes = []
+            TermoBuscaUsuario.objects.bulk_create(pendentes, batch_size=lote)
+            termos += len(pendentes)
+        logger.info(f"Índice de busca de usuários reconstruído: {entregadores} entregadores, {termos} termos")
+        return entregadores, termos
+
+    @staticmethod
+    def consulta(texto):
+        """
+        Palavras da consulta sem stopwords (como no nome indexado em
+        termos_do_usuario) e a consulta inteira sem pontuação
+
+        Returns:
+            tuple: (palavras, consulta compacta) ou None se não houver o que buscar
+        """
+        palavras = []
+        for palavra in normalizar(texto):
+            palavra = palavra[:TAMANHO_MAXIMO]
+            if len(palavra) >= TAMANHO_MINIMO and palavra not in STOPWORDS and palavra not in palavras:
+                palavras.append(palavra)
+        compacta = ''.join(normalizar(texto))[:TAMANHO_MAXIMO]
+        if not palavras and len(compacta) < TAMANHO_MINIMO:
+            return None
+        return palavras, compacta
+
+    @staticmethod
+    def ranking(palavras, compacta, ativo=None):
+        """
+        Entregadores encontrados com a relevância, do mais ao menos relevante
+
+        Returns:
+            QuerySet de dicts {'entregador_id', 'relevancia'}
+        """
+        filtros = {f'tem_{indice}': filtro_prefixo(palavra) for indice, palavra in enumerate(palavras)}
+        if compacta not in palavras and len(compacta) >= TAMANHO_MINIMO:
+            filtros['tem_compacta'] = filtro_prefixo(compacta)
+
+        qualquer = Q()
+        for filtro in filtros.values():
+            qualquer |= filtro
+        exatos = set(palavras) | {compacta}
+
+        queryset = TermoBuscaUsuario.objects.filter(qualquer)
+        if ativo is not None:
+            queryset = queryset.filter(entregador__is_active=ativo)
+
+        ranking = queryset.values('entregador_id').annotate(
+            relevancia=Sum(
+                Case(When(termo__in=exatos, then=F('peso') * 2), default=F('peso'), output_field=IntegerField())
+            )
+        )
+        if len(filtros) > 1:
+            presencas = {
+                nome: Max(Case(When(filtro, then=1), default=0, output_field=IntegerField()))
+                for nome, filtro in filtros.items()
+            }
+            # Todas as palavras, ou a consulta inteira como prefixo do email/CPF
+            todas_palavras = Q(**{nome: 1 for nome in presencas if nome != 'tem_compacta'})
+            condicao = todas_palavras | Q(tem_compacta=1) if 'tem_compacta' in presencas else todas_palavras
+            ranking = ranking.annotate(**presencas).filter(condicao)
+        return ranking.values('entregador_id', 'relevancia').order_by('-relevancia', '-entregador_id')
+
+    @staticmethod
+    def buscar(texto, ativo=None, cursor=None, inicio=0, limite=10):
+        """
+        Página da busca de entregadores
+
+        Args:
+            texto: Texto digitado (nome, email ou CPF)
+            ativo: True/False para filtrar por is_active (None = todos)
+            cursor: Cursor da página anterior (tem precedência sobre `inicio`)
+            inicio: Deslocamento para paginação por número de página
+            limite: Itens por página
+
+        Returns:
+            dict {'entregadores', 'total', 'next_cursor'}; página vazia se a
+            consulta não tiver termos pesquisáveis (ex.: uma só letra)
+
+        Raises:
+            ParametroInvalido: Se o cursor for inválido
+        """
+        consulta = BuscaUsuarios.consulta(texto)
+        if consulta is None:
+            return {'entregadores': [], 'total': 0, 'next_cursor': None}
+
+        ranking = BuscaUsuarios.ranking(*consulta, ativo=ativo)
+        total = ranking.count()
+        if cursor:
+            relevancia, entregador_id = _decodificar_cursor(cursor)
+            try:
+                relevancia, entregador_id = int(relevancia), int(entregador_id)
+            except ValueError:
+                raise ParametroInvalido('Cursor inválido')
+            ranking = ranking.filter(
+                Q(relevancia__lt=relevancia) | Q(relevancia=relevancia, entregador_id__lt=entregador_id)
+            )
+            inicio = 0
+
+        linhas = list(ranking[inicio:inicio + limite + 1])
+        proximo_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo_cursor = _codificar_cursor(linhas[-1]['relevancia'], linhas[-1]['entregador_id'])
+
+        ids = [linha['entregador_id'] for linha in linhas]
+        entregadores = Entregador.objects.in_bulk(ids)
+        return {
+            'entregadores': [entregadores[pk] for pk in ids if pk in entregadores],
+            'total': total,
+            'next_cursor': proximo_cursor,
+        }
+
+    @staticmethod
+    def listar(ativo=None, cursor=None, inicio=0, limite=10):
+        """
+        Página da listagem sem busca, dos cadastros mais recentes aos mais antigos
+
+        Returns:
+            dict {'entregadores', 'total', 'next_cursor'}
+
+        Raises:
+            ParametroInvalido: Se o cursor for inválido
+        """
+        queryset = Entregador.objects.all()
+        if ativo is not None:
+            queryset = queryset.filter(is_active=ativo)
+        total = queryset.count()
+
+        queryset = queryset.order_by('-date_joined', '-id')
+        if cursor:
+            data_texto, entregador_id = _decodificar_cursor(cursor)
+            data = parse_datetime(data_texto)
+            if data is None or not entregador_id.isdigit():
+                raise ParametroInvalido('Cursor inválido')
+            queryset = queryset.filter(
+                Q(date_joined__lt=data) | Q(date_joined=data, id__lt=int(entregador_id))
+            )
+            inicio = 0
+
+        entregadores = list(queryset[inicio:inicio + limite + 1])
+        proximo_cursor = None
+        if len(entregadores) > limite:
+            entregadores = entregadores[:limite]
+            ultimo = entregadores[-1]
+            proximo_cursor = _codificar_cursor(ultimo.date_joined.isoformat(), ultimo.id)
+        return {'entregadores': entregadores, 'total': total, 'next_cursor': proximo_cursor}
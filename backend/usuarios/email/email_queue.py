@@ -0,0 +1,253 @@
+"""
+Fila de envio de emails.
+
+`enqueue` grava a mensagem em OutboundEmail e retorna imediatamente. A entrega
+depende de EMAIL_QUEUE_MODE:
+
+- 'thread' (padrão com DEBUG): após o commit, uma thread em segundo plano
+  envia a mensagem e aproveita para processar reenvios vencidos;
+- 'worker' (padrão em produção): apenas enfileira; o comando
+  `process_email_queue` (processo worker do Procfile) faz o envio;
+- 'sync': envia na própria requisição (útil em testes).
+
+Falhas são reagendadas com backoff exponencial até EMAIL_QUEUE_MAX_ATTEMPTS;
+depois disso a mensagem fica com status 'dead'.
+
+As mensagens levam códigos de verificação: o corpo é apagado assim que a
+mensagem é enviada e `purge` remove enviadas e descartadas depois de
+EMAIL_QUEUE_RETENTION_DAYS (o worker chama periodicamente).
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Envios presos em 'sending' por mais tempo que isso (processo morto no meio
+# do envio) voltam a ser elegíveis
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+class EmailQueueService:
+    """
+    Serviço da fila de emails de saída
+    """
+
+    @staticmethod
+    def mode():
+        return getattr(settings, 'EMAIL_QUEUE_MODE', 'thread')
+
+    @staticmethod
+    def max_attempts():
+        return getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+
+    @staticmethod
+    def retention():
+        return timedelta(days=getattr(settings, 'EMAIL_QUEUE_RETENTION_DAYS', 7))
+
+    @staticmethod
+    def backoff(attempts):
+        """Espera antes da próxima tentativa: base * 2^(tentativas-1), limitada"""
+        base = getattr(settings, 'EMAIL_QUEUE_BACKOFF_SECONDS', 30)
+        limite = getattr(settings, 'EMAIL_QUEUE_BACKOFF_MAX_SECONDS', 3600)
+        return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), limite))
+
+    @staticmethod
+    def enqueue(to_email, subject, body, html_body=None, purpose=''):
+        """
+        Enfileira um email para envio
+
+        Returns:
+            OutboundEmail: Mensagem gravada na fila
+        """
+        email = OutboundEmail.objects.create(
+            to_email=to_email,
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            purpose=purpose
+        )
+        logger.info(f"📬 Email enfileirado para {to_email} (purpose: {purpose}, id: {email.id})")
+
+        mode = EmailQueueService.mode()
+        if mode == 'sync':
+            EmailQueueService.deliver(email.id)
+        elif mode == 'thread':
+            transaction.on_commit(lambda: EmailQueueService._start_thread(email.id))
+        return email
+
+    @staticmethod
+    def _start_thread(email_id):
+        thread = threading.Thread(
+            target=EmailQueueService._deliver_in_background,
+            args=(email_id,),
+            name=f'email-queue-{email_id}',
+            daemon=True
+        )
+        thread.start()
+
+    @staticmethod
+    def _deliver_in_background(email_id):
+        try:
+            EmailQueueService.deliver(email_id)
+            # Aproveitar a thread para reenviar o que estiver vencido
+            EmailQueueService.process_batch(limit=10)
+        except Exception as e:
+            logger.error(f"Erro na thread de envio de email: {str(e)}", exc_info=True)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _claim(email_id):
+        """
+        Marca a mensagem como 'sending' se ela ainda estiver disponível.
+
+        O UPDATE condicional garante que só um processo (worker ou thread)
+        envia cada mensagem.
+        """
+        now = timezone.now()
+        disponivel = Q(status='pending', next_attempt_at__lte=now) | Q(
+            status='sending', locked_at__lt=now - LOCK_TIMEOUT
+        )
+        return OutboundEmail.objects.filter(disponivel, pk=email_id).update(
+            status='sending', locked_at=now
+        ) == 1
+
+    @staticmethod
+    def deliver(email_id, connection=None):
+        """
+        Tenta enviar uma mensagem da fila
+
+        Returns:
+            bool: True se foi enviada nesta chamada
+        """
+        if not EmailQueueService._claim(email_id):
+            return False
+
+        email = OutboundEmail.objects.get(pk=email_id)
+        email.attempts += 1
+        try:
+            if connection is None:
+                backend = getattr(settings, 'EMAIL_QUEUE_BACKEND', None)
+                connection = get_connection(backend) if backend else None
+            sent = send_mail(
+                subject=email.subject,
+                message=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[email.to_email],
+                fail_silently=False,
+                html_message=email.html_body,
+                connection=connection,
+            )
+            if not sent:
+                raise RuntimeError('send_mail retornou 0')
+        except Exception as e:
+            EmailQueueService._register_failure(email, e)
+            return False
+
+        email.status = 'sent'
+        email.sent_at = timezone.now()
+        email.locked_at = None
+        email.last_error = ''
+        # Não guardar códigos de verificação depois de entregues
+        email.body = ''
+        email.html_body = None
+        email.save(update_fields=['status', 'sent_at', 'locked_at', 'last_error', 'attempts', 'body', 'html_body'])
+        logger.info(f"✅ Email {email.id} enviado para {email.to_email} (tentativa {email.attempts})")
+        return True
+
+    @staticmethod
+    def _register_failure(email, error):
+        email.last_error = str(error)[:2000]
+        email.locked_at = None
+        if email.attempts >= EmailQueueService.max_attempts():
+            email.status = 'dead'
+            logger.error(
+                f"❌ Email {email.id} para {email.to_email} descartado após {email.attempts} tentativas: {error}"
+            )
+        else:
+            email.status = 'pending'
+            email.next_attempt_at = timezone.now() + EmailQueueService.backoff(email.attempts)
+            logger.warning(
+                f"⚠️ Falha ao enviar email {email.id} (tentativa {email.attempts}), "
+                f"nova tentativa em {email.next_attempt_at:%H:%M:%S}: {error}"
+            )
+        email.save(update_fields=['status', 'attempts', 'next_attempt_at', 'locked_at', 'last_error'])
+
+    @staticmethod
+    def due_ids(limit=50):
+        """IDs das mensagens prontas para envio, das mais antigas para as mais novas"""
+        now = timezone.now()
+        return list(
+            OutboundEmail.objects.filter(
+                Q(status='pending', next_attempt_at__lte=now)
+                | Q(status='sending', locked_at__lt=now - LOCK_TIMEOUT)
+            ).order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+        )
+
+    @staticmethod
+    def process_batch(limit=50):
+        """
+        Envia um lote de mensagens vencidas reutilizando uma única conexão
+
+        Returns:
+            dict: Quantidade de mensagens enviadas e com falha
+        """
+        ids = EmailQueueService.due_ids(limit)
+        if not ids:
+            return {'sent': 0, 'failed': 0}
+
+        backend = getattr(settings, 'EMAIL_QUEUE_BACKEND', None)
+        try:
+            connection = get_connection(backend) if backend else get_connection()
+            connection.open()
+        except Exception as e:
+            # Sem conexão compartilhada: cada envio tenta a sua e registra a falha
+            logger.warning(f"Não foi possível abrir a conexão de email: {str(e)}")
+            connection = None
+
+        sent = failed = 0
+        try:
+            for email_id in ids:
+                if EmailQueueService.deliver(email_id, connection=connection):
+                    sent += 1
+                else:
+                    failed += 1
+        finally:
+            if connection is not None:
+                connection.close()
+        return {'sent': sent, 'failed': failed}
+
+    @staticmethod
+    def requeue_dead(ids=None):
+        """Devolve mensagens 'dead' para a fila com o contador de tentativas zerado"""
+        queryset = OutboundEmail.objects.filter(status='dead')
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        return queryset.update(status='pending', attempts=0, next_attempt_at=timezone.now(), last_error='')
+
+    @staticmethod
+    def purge():
+        """
+        Remove mensagens enviadas ou descartadas há mais de EMAIL_QUEUE_RETENTION_DAYS
+
+        Returns:
+            int: Quantidade de mensagens removidas
+        """
+        limite = timezone.now() - EmailQueueService.retention()
+        total, _ = OutboundEmail.objects.filter(
+            Q(status='sent', sent_at__lt=limite)
+            # 'dead' fica com a última tentativa em next_attempt_at
+            | Q(status='dead', next_attempt_at__lt=limite)
+        ).delete()
+        if total:
+            logger.info(f"🧹 {total} email(s) antigos removidos da fila")
+        return total
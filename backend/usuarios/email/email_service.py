@@ -1,11 +1,11 @@
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 import secrets
 import logging
 
+from .email_queue import EmailQueueService
+from .email_templates import EmailTemplateRenderer
+
 logger = logging.getLogger(__name__)
 
 class TwoFactorEmailService:
@@ -31,16 +31,6 @@ class TwoFactorEmailService:
             dict: Resultado da operação
         """
         try:
-            # Verificar configuração de email antes de continuar
-            email_backend = getattr(settings, 'EMAIL_BACKEND', '')
-            email_host_user = getattr(settings, 'EMAIL_HOST_USER', '')
-            
-            # Se está usando console backend, ainda pode funcionar (para logs)
-            using_console = email_backend == 'django.core.mail.backends.console.EmailBackend'
-            
-            if not using_console and not email_host_user:
-                logger.warning("EMAIL_HOST_USER não configurado, mas tentando enviar mesmo assim")
-            
             # Gerar código
             code = TwoFactorEmailService.generate_code()
             
@@ -98,73 +88,30 @@ class TwoFactorEmailService:
                     'expires_in': 10
                 }
             
-            # Renderizar template HTML
+            # Renderizar versões texto e HTML (template pré-compilado)
             try:
-                html_message = render_to_string(template, context)
+                text_message, html_message = EmailTemplateRenderer.render(template, context)
             except Exception as template_error:
                 logger.error(f"Erro ao renderizar template {template}: {str(template_error)}")
                 # Usar mensagem simples se o template falhar
+                text_message = f'Seu código de verificação é: {code}\n\nEste código expira em 10 minutos.'
                 html_message = None
             
-            # Enviar email com tratamento robusto de erros
-            try:
-                success = send_mail(
-                    subject=subject,
-                    message=f'Seu código de verificação é: {code}\n\nEste código expira em 10 minutos.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False,
-                    html_message=html_message,
-                )
-                
-                if success:
-                    logger.info(f"✅ Código 2FA enviado para {user.email} (purpose: {purpose}, código: {code})")
-                    return {
-                        'success': True,
-                        'message': 'Código enviado com sucesso',
-                        'expires_at': expires_at.isoformat()
-                    }
-                else:
-                    logger.error(f"❌ send_mail retornou False para {user.email}")
-                    verification.delete()
-                    return {
-                        'success': False,
-                        'message': 'Erro ao enviar email (retorno False)'
-                    }
-                    
-            except Exception as email_error:
-                logger.error(f"❌ Erro ao enviar email para {user.email}: {str(email_error)}")
-                logger.error(f"Configuração - BACKEND: {email_backend}")
-                logger.error(f"Configuração - HOST: {getattr(settings, 'EMAIL_HOST', 'N/A')}")
-                logger.error(f"Configuração - USER: {email_host_user}")
-                logger.error(f"Configuração - PORT: {getattr(settings, 'EMAIL_PORT', 'N/A')}")
-                
-                # Se está usando console backend, ainda considerar sucesso (para desenvolvimento)
-                if using_console:
-                    logger.info(f"ℹ️ Usando console backend - código será exibido nos logs")
-                    logger.info(f"📧 Código para {user.email}: {code}")
-                    return {
-                        'success': True,
-                        'message': 'Código gerado (modo console - verifique os logs)',
-                        'expires_at': expires_at.isoformat()
-                    }
-                
-                # Para produção sem email configurado, deletar código e retornar erro
-                verification.delete()
-                error_message = str(email_error)
-                
-                # Mensagens de erro mais amigáveis
-                if 'authentication' in error_message.lower() or 'login' in error_message.lower():
-                    error_message = 'Erro de autenticação no servidor de email. Verifique as credenciais.'
-                elif 'connection' in error_message.lower() or 'timeout' in error_message.lower():
-                    error_message = 'Erro de conexão com servidor de email. Tente novamente mais tarde.'
-                elif 'smtp' in error_message.lower():
-                    error_message = 'Erro na configuração do servidor de email.'
-                
-                return {
-                    'success': False,
-                    'message': f'Erro ao enviar email: {error_message}'
-                }
+            # Enfileirar o envio: a resposta não espera o servidor de email
+            EmailQueueService.enqueue(
+                to_email=user.email,
+                subject=subject,
+                body=text_message,
+                html_body=html_message,
+                purpose=purpose
+            )
+            
+            logger.info(f"✅ Código 2FA gerado para {user.email} (purpose: {purpose}, verificação: {verification.id})")
+            return {
+                'success': True,
+                'message': 'Código enviado com sucesso',
+                'expires_at': expires_at.isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"❌ Erro ao enviar código 2FA: {str(e)}", exc_info=True)
@@ -242,10 +189,6 @@ class TwoFactorEmailService:
             dict: Resultado da operação
         """
         try:
-            # Verificar configuração de email
-            email_backend = getattr(settings, 'EMAIL_BACKEND', '')
-            using_console = email_backend == 'django.core.mail.backends.console.EmailBackend'
-            
             # Gerar código
             code = TwoFactorEmailService.generate_code()
             
@@ -257,55 +200,33 @@ class TwoFactorEmailService:
             user.registration_code_expires_at = expires_at
             user.save(update_fields=['registration_code', 'registration_code_expires_at'])
             
-            # Renderizar template HTML
+            # Renderizar versões texto e HTML (template pré-compilado)
             try:
-                html_message = render_to_string('emails/registration_verification.html', {
+                text_message, html_message = EmailTemplateRenderer.render('emails/registration_verification.html', {
                     'user_name': user.nome,
                     'code': code,
                     'expires_in': 10
                 })
             except Exception as template_error:
                 logger.error(f"Erro ao renderizar template: {str(template_error)}")
+                text_message = f'Seu código de verificação é: {code}\n\nEste código expira em 10 minutos.'
                 html_message = None
             
-            # Enviar email com tratamento robusto
-            try:
-                success = send_mail(
-                    subject='Verificação de Cadastro - Gestão Entregadores',
-                    message=f'Seu código de verificação é: {code}\n\nEste código expira em 10 minutos.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    # Não deixar o fluxo falhar por email em produção free-tier
-                    fail_silently=True,
-                    html_message=html_message,
-                )
-                
-                if success:
-                    logger.info(f"✅ Código de verificação de cadastro enviado para {user.email}")
-                    return {
-                        'success': True,
-                        'message': 'Código enviado com sucesso',
-                        'expires_at': expires_at.isoformat()
-                    }
-                else:
-                    logger.error(f"❌ send_mail retornou False para {user.email}")
-                    user.registration_code = None
-                    user.registration_code_expires_at = None
-                    user.save(update_fields=['registration_code', 'registration_code_expires_at'])
-                    return {
-                        'success': False,
-                        'message': 'Erro ao enviar email (retorno False)'
-                    }
-                    
-            except Exception as email_error:
-                logger.error(f"❌ Erro ao enviar email para {user.email}: {str(email_error)}")
-                # Mesmo sem email, não devemos quebrar o fluxo de cadastro
-                logger.info(f"ℹ️ Prosseguindo sem envio de email. Código: {code}")
-                return {
-                    'success': True,
-                    'message': 'Código gerado (envio de email indisponível)',
-                    'expires_at': expires_at.isoformat()
-                }
+            # Enfileirar o envio: o cadastro não espera o servidor de email
+            EmailQueueService.enqueue(
+                to_email=user.email,
+                subject='Verificação de Cadastro - Gestão Entregadores',
+                body=text_message,
+                html_body=html_message,
+                purpose='registration'
+            )
+            
+            logger.info(f"✅ Código de verificação de cadastro gerado para {user.email}")
+            return {
+                'success': True,
+                'message': 'Código enviado com sucesso',
+                'expires_at': expires_at.isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"❌ Erro ao enviar código de verificação de cadastro: {str(e)}", exc_info=True)
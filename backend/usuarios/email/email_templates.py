@@ -0,0 +1,148 @@
+"""
+Renderização pré-compilada dos templates de email.
+
+Os templates de código (2FA e cadastro) só usam variáveis simples
+(`{{ user_name }}`, `{{ code }}`, `{{ expires_in }}`). Cada template é lido uma
+vez por processo e dividido em trechos fixos + variáveis; a versão em texto
+puro é derivada do mesmo HTML na compilação. Renderizar um email passa a ser
+apenas juntar strings.
+
+Templates com tags (`{% %}`) ou filtros continuam indo pelo motor de templates
+do Django.
+"""
+import html
+import logging
+import re
+import threading
+
+from django.template.loader import get_template, render_to_string
+from django.utils.html import conditional_escape
+
+logger = logging.getLogger(__name__)
+
+VARIAVEL = re.compile(r'{{\s*([A-Za-z_]\w*)\s*}}')
+QUALQUER_VARIAVEL = re.compile(r'{{.*?}}', re.DOTALL)
+MARCADOR = re.compile(r'\x00(\d+)\x00')
+
+# Conversão HTML -> texto (executada só na compilação)
+BLOCOS_IGNORADOS = re.compile(r'<(head|style|script)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+QUEBRAS = re.compile(r'<br\s*/?>|</(p|div|h[1-6]|li|tr|ul|ol|table)>', re.IGNORECASE)
+ITEM_LISTA = re.compile(r'<li\b[^>]*>', re.IGNORECASE)
+TAGS = re.compile(r'<[^>]+>')
+ESPACOS = re.compile(r'[ \t\r\f\v]+')
+
+
+class TemplateCompilado:
+    """Trechos fixos e variáveis de um template, nas versões HTML e texto"""
+
+    def __init__(self, nome, fonte):
+        self.nome = nome
+        partes = VARIAVEL.split(fonte)
+        self.literais_html = partes[0::2]
+        self.variaveis_html = partes[1::2]
+        self.literais_texto, self.variaveis_texto = self._compilar_texto(partes)
+
+    @staticmethod
+    def _compilar_texto(partes):
+        # Troca cada variável por um marcador que sobrevive à remoção das tags
+        variaveis = partes[1::2]
+        fonte = ''.join(
+            parte if i % 2 == 0 else f'\x00{i // 2}\x00'
+            for i, parte in enumerate(partes)
+        )
+        texto = BLOCOS_IGNORADOS.sub('', fonte)
+        texto = ITEM_LISTA.sub('- ', texto)
+        texto = QUEBRAS.sub('\n', texto)
+        texto = html.unescape(TAGS.sub('', texto))
+
+        linhas = [ESPACOS.sub(' ', linha).strip() for linha in texto.split('\n')]
+        texto = '\n'.join(linhas)
+        texto = re.sub(r'\n{3,}', '\n\n', texto)
+        # Itens de lista em linhas consecutivas
+        texto = re.sub(r'\n\n(?=- )', '\n', texto).strip()
+
+        pedacos = MARCADOR.split(texto)
+        return pedacos[0::2], [variaveis[int(indice)] for indice in pedacos[1::2]]
+
+    @staticmethod
+    def _juntar(literais, variaveis, valores):
+        saida = [literais[0]]
+        for variavel, literal in zip(variaveis, literais[1:]):
+            saida.append(valores[variavel])
+            saida.append(literal)
+        return ''.join(saida)
+
+    def render(self, context):
+        """
+        Returns:
+            tuple: (texto puro, HTML)
+        """
+        brutos = {variavel: str(context.get(variavel, '')) for variavel in set(self.variaveis_html)}
+        # Mesmo escape automático que o motor de templates aplicaria
+        escapados = {variavel: conditional_escape(valor) for variavel, valor in brutos.items()}
+        return (
+            self._juntar(self.literais_texto, self.variaveis_texto, brutos),
+            self._juntar(self.literais_html, self.variaveis_html, escapados),
+        )
+
+
+class EmailTemplateRenderer:
+    """
+    Cache por processo dos templates de email compilados
+    """
+
+    _lock = threading.Lock()
+    _compilados = {}
+
+    @classmethod
+    def compilar(cls, nome):
+        """
+        Compila (uma única vez) o template informado
+
+        Returns:
+            TemplateCompilado ou None se o template precisar do motor completo
+        """
+        try:
+            return cls._compilados[nome]
+        except KeyError:
+            pass
+
+        with cls._lock:
+            if nome not in cls._compilados:
+                fonte = get_template(nome).template.source
+                simples = len(VARIAVEL.findall(fonte)) == len(QUALQUER_VARIAVEL.findall(fonte))
+                if '{%' in fonte or '{#' in fonte or not simples:
+                    logger.debug(f"Template {nome} usa tags/filtros: renderização pelo Django")
+                    cls._compilados[nome] = None
+                else:
+                    cls._compilados[nome] = TemplateCompilado(nome, fonte)
+            return cls._compilados[nome]
+
+    @classmethod
+    def render(cls, nome, context):
+        """
+        Renderiza um template de email
+
+        Returns:
+            tuple: (texto puro, HTML)
+
+        Raises:
+            TemplateDoesNotExist: Se o template não existir
+        """
+        compilado = cls.compilar(nome)
+        if compilado is None:
+            html_renderizado = render_to_string(nome, context)
+            return html_para_texto(html_renderizado), html_renderizado
+        return compilado.render(context)
+
+    @classmethod
+    def limpar(cls):
+        """Descarta os templates compilados (ex.: após editar os arquivos)"""
+        with cls._lock:
+            cls._compilados = {}
+
+
+def html_para_texto(conteudo):
+    """Versão em texto puro de um HTML já renderizado"""
+    literais, _ = TemplateCompilado._compilar_texto([conteudo])
+    return literais[0]
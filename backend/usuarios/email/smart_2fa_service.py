@@ -1,6 +1,7 @@
 from django.utils import timezone
 from datetime import timedelta
 from ..models import Entregador, TrustedDevice
+from .trusted_device_cache import DispositivosConfiaveis
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,31 +47,24 @@ class Smart2FAService:
                     'reason': 'Unknown device'
                 }
             
-            # Verificar se é dispositivo confiável
-            try:
-                trusted_device = TrustedDevice.objects.get(
-                    user=user,
-                    device_id=device_id,
-                    is_active=True
-                )
-                
-                # Atualizar último uso
-                trusted_device.last_used = timezone.now()
-                trusted_device.save(update_fields=['last_used'])
-                
-                # Dispositivo confiável - não pedir 2FA
-                return {
-                    'require_2fa': False,
-                    'reason': 'Trusted device',
-                    'device_name': trusted_device.device_name
-                }
-                
-            except TrustedDevice.DoesNotExist:
+            # Verificar se é dispositivo confiável (em cache; last_used gravado no máximo a cada intervalo)
+            trusted_device = DispositivosConfiaveis.obter(user, device_id)
+            if trusted_device is None:
                 # Dispositivo não confiável - pedir 2FA
                 return {
                     'require_2fa': True,
                     'reason': 'Untrusted device'
                 }
+            
+            # Atualizar último uso
+            DispositivosConfiaveis.registrar_uso(user, device_id, trusted_device)
+            
+            # Dispositivo confiável - não pedir 2FA
+            return {
+                'require_2fa': False,
+                'reason': 'Trusted device',
+                'device_name': trusted_device['device_name']
+            }
                 
         except Exception as e:
             logger.error(f"Erro ao verificar 2FA: {str(e)}")
@@ -152,6 +146,8 @@ class Smart2FAService:
             
             # Desativar todos os dispositivos confiáveis
             TrustedDevice.objects.filter(user=user).update(is_active=False)
+            # update() não dispara sinais: descartar o cache de dispositivos aqui
+            DispositivosConfiaveis.invalidar(user.pk)
             
             logger.info(f"2FA forçado para todos os dispositivos: {user.email}")
             
@@ -0,0 +1,104 @@
+"""
+Cache de dispositivos confiáveis do 2FA.
+
+A decisão "este dispositivo é confiável?" fica no cache compartilhado,
+na chave (usuário, versão, device_id). A versão por usuário é incrementada
+sempre que um dispositivo do usuário é gravado ou removido (sinais em
+usuarios/signals.py) ou quando o 2FA é forçado em todos, o que invalida
+as respostas em cache, inclusive as negativas.
+
+A gravação de `last_used` é agrupada: no máximo uma por dispositivo a cada
+TWO_FACTOR_LAST_USED_INTERVALO_MINUTOS. Logins de um dispositivo confiável
+dentro desse intervalo não gravam nada no banco; `last_used` fica no máximo
+esse intervalo atrasado.
+"""
+import hashlib
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import TrustedDevice
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = '2fa:dispositivos'
+NAO_CONFIAVEL = 'nao_confiavel'
+
+
+class DispositivosConfiaveis:
+    """
+    Consulta em cache dos dispositivos confiáveis e registro agrupado de uso
+    """
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'TWO_FACTOR_DISPOSITIVO_CACHE_TIMEOUT', 3600)
+
+    @staticmethod
+    def intervalo_last_used():
+        return timedelta(minutes=getattr(settings, 'TWO_FACTOR_LAST_USED_INTERVALO_MINUTOS', 15))
+
+    @staticmethod
+    def versao(user_id):
+        chave = f'{PREFIXO}:{user_id}:versao'
+        versao = cache.get(chave)
+        if versao is None:
+            cache.add(chave, int(time.time() * 1000), None)
+            versao = cache.get(chave)
+        return versao
+
+    @staticmethod
+    def invalidar(user_id):
+        """Descarta as decisões em cache de todos os dispositivos do usuário"""
+        chave = f'{PREFIXO}:{user_id}:versao'
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.add(chave, int(time.time() * 1000), None)
+
+    @staticmethod
+    def chave(user_id, device_id):
+        dispositivo = hashlib.sha256(device_id.encode()).hexdigest()[:32]
+        return f'{PREFIXO}:{user_id}:v{DispositivosConfiaveis.versao(user_id)}:{dispositivo}'
+
+    @staticmethod
+    def obter(user, device_id):
+        """
+        Dispositivo confiável ativo do usuário
+
+        Returns:
+            dict {'id', 'device_name', 'last_used'} ou None se não for confiável
+        """
+        chave = DispositivosConfiaveis.chave(user.pk, device_id)
+        dispositivo = cache.get(chave)
+        if dispositivo is None:
+            dispositivo = TrustedDevice.objects.filter(
+                user=user, device_id=device_id, is_active=True
+            ).values('id', 'device_name', 'last_used').first() or NAO_CONFIAVEL
+            cache.set(chave, dispositivo, DispositivosConfiaveis.timeout())
+        return None if dispositivo == NAO_CONFIAVEL else dispositivo
+
+    @staticmethod
+    def registrar_uso(user, device_id, dispositivo):
+        """
+        Atualiza `last_used` se a última gravação for mais antiga que o intervalo
+
+        Returns:
+            bool: Se houve gravação no banco
+        """
+        agora = timezone.now()
+        if agora - dispositivo['last_used'] < DispositivosConfiaveis.intervalo_last_used():
+            return False
+
+        # UPDATE direto: não dispara sinais (o cache continua válido) nem grava as outras colunas
+        TrustedDevice.objects.filter(pk=dispositivo['id']).update(last_used=agora)
+        cache.set(
+            DispositivosConfiaveis.chave(user.pk, device_id),
+            {**dispositivo, 'last_used': agora},
+            DispositivosConfiaveis.timeout()
+        )
+        return True
@@ -0,0 +1,126 @@
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth.middleware import get_user
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import SimpleLazyObject
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from usuarios.auth.authentication import AutenticacaoPorCabecalho, CacheUsuarios
+from usuarios.models import Entregador
+
+
+class Reverter(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a cadeia JWT -> Token -> Sessão com a autenticação por cabeçalho '
+        '(sem cabeçalho, token expirado/inválido, Bearer válido, Token e sessão). '
+        'Os dados gerados são descartados ao final (transação revertida).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Autenticações por cenário',
+        )
+
+    def _autenticar(self, autenticadores, request):
+        for autenticador in autenticadores:
+            try:
+                resultado = autenticador.authenticate(request)
+            except APIException:
+                return None
+            if resultado is not None:
+                return resultado
+        return None
+
+    def _medir(self, autenticadores, fabricar, iteracoes):
+        # Consultas em regime (após a primeira requisição, que aquece os caches)
+        self._autenticar(autenticadores, fabricar())
+        with CaptureQueriesContext(connection) as consultas:
+            self._autenticar(autenticadores, fabricar())
+        inicio = time.perf_counter()
+        for _ in range(iteracoes):
+            self._autenticar(autenticadores, fabricar())
+        return (time.perf_counter() - inicio) / iteracoes * 1_000_000, len(consultas)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._executar(options['iterations'])
+                raise Reverter()
+        except Reverter:
+            pass
+
+    def _executar(self, iteracoes):
+        usuario = Entregador.objects.create_user(
+            email='benchmark.auth@example.com', password='x', nome='Benchmark',
+            telefone='0', username='benchmark_auth'
+        )
+        valido = AccessToken.for_user(usuario)
+        expirado = AccessToken.for_user(usuario)
+        expirado.set_exp(lifetime=-timedelta(minutes=1))
+        token_drf = Token.objects.create(user=usuario)
+        motor_sessao = import_module(settings.SESSION_ENGINE)
+        sessao = motor_sessao.SessionStore()
+        sessao['_auth_user_id'] = str(usuario.pk)
+        sessao['_auth_user_backend'] = 'django.contrib.auth.backends.ModelBackend'
+        sessao['_auth_user_hash'] = usuario.get_session_auth_hash()
+        sessao.create()
+
+        fabrica = APIRequestFactory()
+
+        def requisicao(cookie_sessao=False, **cabecalhos):
+            """Requisição como sai do SessionMiddleware/AuthenticationMiddleware"""
+            def fabricar():
+                django_request = fabrica.get('/api/auth/profile/', **cabecalhos)
+                if cookie_sessao:
+                    django_request.COOKIES[settings.SESSION_COOKIE_NAME] = sessao.session_key
+                django_request.session = motor_sessao.SessionStore(
+                    django_request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+                )
+                django_request.user = SimpleLazyObject(lambda: get_user(django_request))
+                return Request(django_request)
+            return fabricar
+
+        cenarios = [
+            ('sem cabeçalho', requisicao()),
+            ('Bearer expirado', requisicao(HTTP_AUTHORIZATION=f'Bearer {expirado}')),
+            ('Bearer inválido', requisicao(HTTP_AUTHORIZATION='Bearer abc.def.ghi')),
+            ('Bearer válido', requisicao(HTTP_AUTHORIZATION=f'Bearer {valido}')),
+            ('Token', requisicao(HTTP_AUTHORIZATION=f'Token {token_drf.key}')),
+            ('Basic desconhecido', requisicao(HTTP_AUTHORIZATION='Basic dXNlcjpwYXNz')),
+            ('cookie de sessão', requisicao(cookie_sessao=True)),
+        ]
+        cadeia = [JWTAuthentication(), TokenAuthentication(), SessionAuthentication()]
+        despacho = [AutenticacaoPorCabecalho()]
+
+        self.stdout.write(f'📊 {iteracoes} autenticações por cenário (µs e consultas por requisição)\n')
+        if not CacheUsuarios.ativo():
+            self.stdout.write(self.style.WARNING(
+                '⚠️ Cache de usuários desligado (LocMemCache): configure REDIS_URL para medir o JWT com cache\n'
+            ))
+        for nome, fabricar in cenarios:
+            CacheUsuarios.limpar()
+            cadeia_us, cadeia_q = self._medir(cadeia, fabricar, iteracoes)
+            CacheUsuarios.limpar()
+            despacho_us, despacho_q = self._medir(despacho, fabricar, iteracoes)
+            self.stdout.write(
+                f'{nome:20} cadeia: {cadeia_us:8.1f} µs {cadeia_q} consultas   '
+                f'por cabeçalho: {despacho_us:8.1f} µs {despacho_q} consultas'
+            )
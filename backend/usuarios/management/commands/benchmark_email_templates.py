@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from usuarios.email.email_templates import EmailTemplateRenderer
+
+TEMPLATES = [
+    'emails/2fa_login.html',
+    'emails/2fa_setup.html',
+    'emails/2fa_disable.html',
+    'emails/registration_verification.html',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara o custo por email do render_to_string com o renderizador pré-compilado'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Renderizações por template',
+        )
+
+    def _medir(self, funcao, iteracoes):
+        inicio = time.perf_counter()
+        for i in range(iteracoes):
+            funcao({'user_name': f'Entregador {i}', 'code': f'{i % 1000000:06d}', 'expires_in': 10})
+        return (time.perf_counter() - inicio) / iteracoes * 1_000_000
+
+    def handle(self, *args, **options):
+        iteracoes = options['iterations']
+        self.stdout.write(f'📊 {iteracoes} renderizações por template (µs por email)\n')
+
+        for nome in TEMPLATES:
+            contexto = {'user_name': 'Ana & <Bia>', 'code': '123456', 'expires_in': 10}
+            _, html = EmailTemplateRenderer.render(nome, contexto)
+            if html != render_to_string(nome, contexto):
+                self.stdout.write(self.style.ERROR(f'❌ {nome}: HTML diferente do render_to_string'))
+                continue
+
+            django_us = self._medir(lambda ctx: render_to_string(nome, ctx), iteracoes)
+            compilado_us = self._medir(lambda ctx: EmailTemplateRenderer.render(nome, ctx), iteracoes)
+            self.stdout.write(
+                f'{nome:42} render_to_string: {django_us:8.1f}  '
+                f'pré-compilado (texto + HTML): {compilado_us:6.1f}  '
+                f'({django_us / compilado_us:.0f}x)'
+            )
@@ -0,0 +1,118 @@
+import io
+import logging
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from usuarios.middleware.email_validation_middleware import EmailValidationMiddleware
+from usuarios.middleware.middleware import CSRFExemptAPIMiddleware
+from usuarios.middleware.rotas import PREFIXOS, CSRF_ISENTO, SEM_VALIDACAO_EMAIL
+
+# Mistura de caminhos de um dia típico: API do app (com IDs), admin e estáticos
+CAMINHOS = [
+    '/api/auth/profile/',
+    '/api/relatorios/estatisticas/',
+    '/api/registros/trabalho/',
+    '/api/registros/trabalho/42/',
+    '/api/admin/users/',
+    '/api/admin/users/7/',
+    '/comunidade/api/feed/postagens/',
+    '/admin/comunidade/postagem/',
+    '/static/css/base.css',
+    '/usuarios/email-validation/',
+    '/',
+]
+
+logger = logging.getLogger('usuarios.middleware.middleware')
+
+
+class LegadoCSRF:
+    """Implementação anterior: lista montada e percorrida a cada requisição, log INFO"""
+
+    def process_request(self, request):
+        api_routes = list(PREFIXOS[CSRF_ISENTO])
+        if any(request.path.startswith(route) for route in api_routes):
+            setattr(request, '_dont_enforce_csrf_checks', True)
+            logger.info(f"CSRF desabilitado para rota: {request.path}")
+        return None
+
+
+class LegadoEmail:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        exempt_urls = list(PREFIXOS[SEM_VALIDACAO_EMAIL])
+        if any(request.path.startswith(url) for url in exempt_urls):
+            return self.get_response(request)
+        if request.user.is_authenticated:
+            return self.get_response(request)
+        return self.get_response(request)
+
+
+@contextmanager
+def console_silenciado():
+    """Logs do console vão para memória durante a medição (o custo de emitir continua medido)"""
+    handlers = [
+        handler for handler in logging.getLogger().handlers
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler)
+    ]
+    originais = [handler.setStream(io.StringIO()) for handler in handlers]
+    try:
+        yield
+    finally:
+        for handler, stream in zip(handlers, originais):
+            handler.setStream(stream)
+
+
+class Command(BaseCommand):
+    help = 'Mede o custo por requisição dos middlewares de CSRF e validação de email (antes e depois da classificação de rotas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20000,
+            help='Requisições simuladas por implementação',
+        )
+
+    def _medir(self, funcao, requisicoes):
+        inicio = time.perf_counter()
+        for request in requisicoes:
+            funcao(request)
+        return (time.perf_counter() - inicio) / len(requisicoes) * 1_000_000
+
+    def handle(self, *args, **options):
+        iteracoes = options['iterations']
+        fabrica = RequestFactory()
+        requisicoes = []
+        for indice in range(iteracoes):
+            request = fabrica.get(CAMINHOS[indice % len(CAMINHOS)])
+            request.user = AnonymousUser()
+            requisicoes.append(request)
+
+        resposta = HttpResponse()
+        implementacoes = [
+            ('CSRFExemptAPIMiddleware', LegadoCSRF().process_request,
+             CSRFExemptAPIMiddleware(lambda request: resposta).process_request),
+            ('EmailValidationMiddleware', LegadoEmail(lambda request: resposta),
+             EmailValidationMiddleware(lambda request: resposta)),
+        ]
+
+        self.stdout.write(f'📊 {iteracoes} requisições, {len(CAMINHOS)} caminhos distintos (µs por requisição)\n')
+        for nome, legado, atual in implementacoes:
+            with console_silenciado():
+                # Aquecer o cache de classificação e os logs antes de medir
+                for request in requisicoes[:len(CAMINHOS)]:
+                    legado(request)
+                    atual(request)
+                legado_us = self._medir(legado, requisicoes)
+                atual_us = self._medir(atual, requisicoes)
+            self.stdout.write(
+                f'{nome:28} listas + startswith: {legado_us:6.2f}  '
+                f'rotas pré-compiladas: {atual_us:6.2f}  ({legado_us / atual_us:.1f}x)'
+            )
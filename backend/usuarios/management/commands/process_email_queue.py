@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.email.email_queue import EmailQueueService
+
+# Intervalo (segundos) entre limpezas das mensagens antigas no modo contínuo
+INTERVALO_LIMPEZA = 3600
+
+
+class Command(BaseCommand):
+    help = 'Envia os emails pendentes da fila (códigos 2FA e de cadastro)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Processa um lote e encerra (para uso em cron)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Quantidade máxima de emails por lote',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera quando a fila está vazia',
+        )
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Devolve para a fila os emails que esgotaram as tentativas',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            total = EmailQueueService.requeue_dead()
+            self.stdout.write(self.style.SUCCESS(f'✅ {total} email(s) devolvido(s) à fila'))
+
+        if options['once']:
+            result = EmailQueueService.process_batch(limit=options['batch_size'])
+            self.stdout.write(f"📧 Enviados: {result['sent']} | Falhas: {result['failed']}")
+            EmailQueueService.purge()
+            return
+
+        self.stdout.write('📬 Processando fila de emails (Ctrl+C para sair)...')
+        proxima_limpeza = 0
+        try:
+            while True:
+                try:
+                    if time.monotonic() >= proxima_limpeza:
+                        EmailQueueService.purge()
+                        proxima_limpeza = time.monotonic() + INTERVALO_LIMPEZA
+                    result = EmailQueueService.process_batch(limit=options['batch_size'])
+                except Exception as e:
+                    # Banco indisponível etc.: manter o worker vivo e tentar de novo
+                    self.stderr.write(f'❌ Erro ao processar a fila: {str(e)}')
+                    time.sleep(options['interval'])
+                    continue
+                if result['sent'] or result['failed']:
+                    self.stdout.write(f"📧 Enviados: {result['sent']} | Falhas: {result['failed']}")
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Encerrado.')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from usuarios.busca_service import BuscaUsuarios
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de entregadores do painel administrativo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Quantidade de termos gravados por INSERT',
+        )
+
+    def handle(self, *args, **options):
+        entregadores, termos = BuscaUsuarios.reindexar(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {entregadores} entregadores, {termos} termos indexados'))
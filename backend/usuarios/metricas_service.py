@@ -0,0 +1,115 @@
+"""
+Métricas de cadastro de entregadores do painel administrativo.
+
+Totais, ativos/inativos, cadastros de hoje/semana/mês e o histograma dos
+últimos meses saem de uma única consulta com agregados condicionais
+(COUNT ... FILTER / SUM(CASE ...)) sobre intervalos de `date_joined`, que
+usam o índice da coluna em vez de funções de data por linha.
+
+O resultado fica em cache por poucos segundos e é compartilhado pelo
+AdminDashboardView, AdminStatsAPIView e pelas estatísticas da listagem de
+usuários; as ações do admin que alteram usuários invalidam o cache.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Entregador
+
+logger = logging.getLogger(__name__)
+
+CHAVE_CACHE = 'admin:metricas:entregadores'
+MESES_HISTOGRAMA = 6
+
+
+def _inicio_do_dia(dia):
+    """Meia-noite do dia no fuso atual, como datetime com fuso"""
+    instante = datetime.combine(dia, time.min)
+    return timezone.make_aware(instante) if settings.USE_TZ else instante
+
+
+def meses_anteriores(hoje, quantidade=MESES_HISTOGRAMA):
+    """
+    Meses de calendário do atual para trás
+
+    Returns:
+        list: [(primeiro dia do mês, primeiro dia do mês seguinte), ...]
+    """
+    meses = []
+    inicio = hoje.replace(day=1)
+    fim = (inicio + timedelta(days=32)).replace(day=1)
+    for _ in range(quantidade):
+        meses.append((inicio, fim))
+        fim = inicio
+        inicio = (inicio - timedelta(days=1)).replace(day=1)
+    return meses
+
+
+class MetricasAdmin:
+    """
+    Métricas de entregadores para o painel administrativo
+    """
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'ADMIN_METRICAS_CACHE_TIMEOUT', 30)
+
+    @staticmethod
+    def calcular(hoje=None):
+        """
+        Calcula as métricas em uma consulta
+
+        Args:
+            hoje: Data de referência (padrão: hoje no fuso atual)
+
+        Returns:
+            dict: Totais, cadastros por período e 'stats_por_mes'
+        """
+        hoje = hoje or timezone.localdate()
+        meses = meses_anteriores(hoje)
+
+        agregados = {
+            'total_entregadores': Count('pk'),
+            'entregadores_ativos': Count('pk', filter=Q(is_active=True)),
+            'entregadores_inativos': Count('pk', filter=Q(is_active=False)),
+            'registrados_hoje': Count('pk', filter=Q(
+                date_joined__gte=_inicio_do_dia(hoje),
+                date_joined__lt=_inicio_do_dia(hoje + timedelta(days=1))
+            )),
+            'registrados_semana': Count('pk', filter=Q(date_joined__gte=_inicio_do_dia(hoje - timedelta(days=7)))),
+            'registrados_mes': Count('pk', filter=Q(date_joined__gte=_inicio_do_dia(hoje - timedelta(days=30)))),
+        }
+        for indice, (inicio, fim) in enumerate(meses):
+            agregados[f'mes_{indice}'] = Count('pk', filter=Q(
+                date_joined__gte=_inicio_do_dia(inicio),
+                date_joined__lt=_inicio_do_dia(fim)
+            ))
+
+        valores = Entregador.objects.aggregate(**agregados)
+        metricas = {nome: valores[nome] for nome in agregados if not nome.startswith('mes_')}
+        metricas['stats_por_mes'] = [
+            {'mes': inicio.strftime('%Y-%m'), 'count': valores[f'mes_{indice}']}
+            for indice, (inicio, _) in enumerate(meses)
+        ]
+        return metricas
+
+    @staticmethod
+    def obter():
+        """Métricas do cache (calculadas se expiradas)"""
+        hoje = timezone.localdate()
+        chave = f'{CHAVE_CACHE}:{hoje.isoformat()}'
+        metricas = cache.get(chave)
+        if metricas is None:
+            metricas = MetricasAdmin.calcular(hoje)
+            cache.set(chave, metricas, MetricasAdmin.timeout())
+        return metricas
+
+    @staticmethod
+    def invalidar():
+        """Descarta as métricas em cache (após ativar/desativar/excluir usuários)"""
+        cache.delete(f'{CHAVE_CACHE}:{timezone.localdate().isoformat()}')
+        logger.debug("Cache das métricas do admin invalidado")
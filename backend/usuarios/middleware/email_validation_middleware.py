@@ -1,46 +1,73 @@
+import hashlib
+
+from django.conf import settings
+from django.core import signing
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib.auth import logout
 from django.contrib import messages
+from .rotas import SEM_VALIDACAO_EMAIL, rotas
+
+# Cookie assinado que marca a sessão atual como já verificada (email validado ou admin)
+COOKIE_VALIDADO = 'email_validado'
+SALT_VALIDADO = 'usuarios.email_validado'
+
+
+def _marca_da_sessao(request):
+    """Valor do cookie para a sessão atual (muda a cada login/logout, que trocam a chave da sessão)"""
+    chave_sessao = request.COOKIES.get(settings.SESSION_COOKIE_NAME, '')
+    return hashlib.sha256(chave_sessao.encode()).hexdigest()[:32]
+
 
 class EmailValidationMiddleware:
     """
     Middleware para verificar se usuários não-admin têm email validado
+
+    Só atua em rotas de páginas (APIs, admin, estáticos e mídia ficam de fora)
+    e só carrega sessão/usuário quando há cookie de sessão. Depois que a
+    sessão passa na verificação, um cookie assinado ligado à chave da sessão
+    evita consultar o banco de novo nas próximas requisições.
     """
-    
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Lista de URLs que não precisam de validação de email
-        exempt_urls = [
-            '/admin/login/',
-            '/admin/logout/',
-            '/auth/login/',
-            '/usuarios/login/',
-            '/usuarios/email-validation/',
-            '/usuarios/resend-code/',
-            '/admin/',
-            '/api/',
-        ]
-        
-        # Verificar se a URL atual está na lista de exceções
-        if any(request.path.startswith(url) for url in exempt_urls):
+        # URLs que não precisam de validação de email (usuarios/middleware/rotas.py)
+        if rotas.pertence(request.path, SEM_VALIDACAO_EMAIL):
+            response = self.get_response(request)
+            return response
+
+        # Sem cookie de sessão o usuário é anônimo: nada a verificar
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
             response = self.get_response(request)
             return response
-        
+
+        # Sessão já verificada (sem carregar sessão nem usuário)
+        marca = _marca_da_sessao(request)
+        if request.get_signed_cookie(COOKIE_VALIDADO, default=None, salt=SALT_VALIDADO,
+                                     max_age=settings.SESSION_COOKIE_AGE) == marca:
+            response = self.get_response(request)
+            return response
+
         # Se o usuário está autenticado
         if request.user.is_authenticated:
-            # Se é admin, permitir acesso
-            if request.user.is_staff:
-                response = self.get_response(request)
-                return response
-            
             # Se não é admin e email não está validado, redirecionar para validação
-            if not request.user.email_validado:
+            if not request.user.is_staff and not request.user.email_validado:
                 # Evitar redirecionamento infinito
                 if not request.path.startswith('/usuarios/email-validation/'):
                     return redirect('usuarios:email_validation')
-        
+            else:
+                # Admin ou email validado: lembrar na sessão atual
+                response = self.get_response(request)
+                response.set_signed_cookie(
+                    COOKIE_VALIDADO, marca, salt=SALT_VALIDADO,
+                    max_age=settings.SESSION_COOKIE_AGE,
+                    secure=settings.SESSION_COOKIE_SECURE,
+                    httponly=True,
+                    samesite=settings.SESSION_COOKIE_SAMESITE,
+                )
+                return response
+
         response = self.get_response(request)
         return response
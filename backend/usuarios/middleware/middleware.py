@@ -1,5 +1,6 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
+from .rotas import CSRF_ISENTO, rotas
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,27 +11,10 @@ class CSRFExemptAPIMiddleware(MiddlewareMixin):
     """
     
     def process_request(self, request):
-        # Lista de rotas que devem ser isentas de CSRF
-        api_routes = [
-            '/api/auth/login/',
-            '/api/auth/register/',
-            '/api/auth/logout/',
-            '/api/auth/refresh/',
-            '/api/auth/profile/',
-            '/api/auth/change-password/',
-            '/api/entregadores/me/',
-            '/api/estatisticas/',
-            '/api/upload-foto/',
-            '/api/relatorios/trabalho/',
-            '/api/relatorios/despesas/',
-            '/api/admin/users/',
-            '/api/admin/stats/',
-        ]
-        
-        # Verificar se a rota atual é uma API que deve ser isenta de CSRF
-        if any(request.path.startswith(route) for route in api_routes):
+        # Rotas isentas: usuarios/middleware/rotas.py (prefixos pré-compilados)
+        if rotas.pertence(request.path, CSRF_ISENTO):
             # Marcar a requisição como isenta de CSRF
             setattr(request, '_dont_enforce_csrf_checks', True)
-            logger.info(f"CSRF desabilitado para rota: {request.path}")
+            logger.debug(f"CSRF desabilitado para rota: {request.path}")
         
         return None
@@ -0,0 +1,82 @@
+"""
+Classificação de rotas usada pelos middlewares.
+
+Os prefixos de cada classe de rota são compilados uma vez, na importação,
+em uma única expressão regular por classe. A classificação de cada caminho
+(conjunto das classes a que pertence) fica em um cache LRU, então os
+caminhos mais acessados custam uma consulta a dicionário por requisição.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+# Rotas de API isentas de CSRF (autenticadas por token)
+CSRF_ISENTO = 'csrf_isento'
+# Rotas que não passam pela verificação de email validado
+SEM_VALIDACAO_EMAIL = 'sem_validacao_email'
+
+PREFIXOS = {
+    CSRF_ISENTO: (
+        '/api/auth/login/',
+        '/api/auth/register/',
+        '/api/auth/logout/',
+        '/api/auth/refresh/',
+        '/api/auth/profile/',
+        '/api/auth/change-password/',
+        '/api/entregadores/me/',
+        '/api/estatisticas/',
+        '/api/upload-foto/',
+        '/api/relatorios/trabalho/',
+        '/api/relatorios/despesas/',
+        '/api/admin/users/',
+        '/api/admin/stats/',
+    ),
+    SEM_VALIDACAO_EMAIL: (
+        '/admin/login/',
+        '/admin/logout/',
+        '/auth/login/',
+        '/usuarios/login/',
+        '/usuarios/email-validation/',
+        '/usuarios/resend-code/',
+        '/admin/',
+        '/api/',
+        # APIs (JSON, autenticadas por token) e arquivos
+        '/registro/api/',
+        '/comunidade/api/',
+        '/comunidade/admin/api/',
+        '/' + settings.STATIC_URL.lstrip('/'),
+        '/' + settings.MEDIA_URL.lstrip('/'),
+        '/favicon.ico',
+    ),
+}
+
+
+class ClassificadorRotas:
+    """
+    Classifica caminhos por prefixo
+
+    Args:
+        prefixos: {classe: prefixos}
+        tamanho_cache: Caminhos distintos guardados no cache de classificação
+    """
+
+    def __init__(self, prefixos, tamanho_cache=4096):
+        self.padroes = {
+            classe: re.compile('|'.join(re.escape(prefixo) for prefixo in sorted(lista, key=len, reverse=True)))
+            for classe, lista in prefixos.items()
+        }
+        self.classificar = lru_cache(maxsize=tamanho_cache)(self._classificar)
+
+    def _classificar(self, caminho):
+        """
+        Returns:
+            frozenset: Classes cujos prefixos casam com o início do caminho
+        """
+        return frozenset(classe for classe, padrao in self.padroes.items() if padrao.match(caminho))
+
+    def pertence(self, caminho, classe):
+        return classe in self.classificar(caminho)
+
+
+rotas = ClassificadorRotas(PREFIXOS)
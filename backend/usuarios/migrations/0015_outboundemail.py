@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0014_entregador_registration_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('html_body', models.TextField(blank=True, null=True)),
+                ('purpose', models.CharField(blank=True, max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('sending', 'Enviando'), ('sent', 'Enviado'), ('dead', 'Falhou definitivamente')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_fila_idx')],
+            },
+        ),
+    ]
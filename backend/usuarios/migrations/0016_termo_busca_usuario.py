@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def indexar_usuarios_existentes(apps, schema_editor):
+    from usuarios.busca_service import termos_do_usuario
+
+    Entregador = apps.get_model('usuarios', 'Entregador')
+    TermoBuscaUsuario = apps.get_model('usuarios', 'TermoBuscaUsuario')
+    pendentes = []
+    for entregador in Entregador.objects.only('pk', 'nome', 'email', 'cpf').iterator(chunk_size=1000):
+        pendentes.extend(
+            TermoBuscaUsuario(entregador_id=entregador.pk, campo=campo, termo=termo, peso=peso)
+            for (campo, termo), peso in termos_do_usuario(entregador).items()
+        )
+    TermoBuscaUsuario.objects.bulk_create(pendentes, batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0015_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermoBuscaUsuario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.CharField(choices=[('nome', 'Nome'), ('email', 'Email'), ('cpf', 'CPF')], max_length=5)),
+                ('termo', models.CharField(max_length=100)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+                ('entregador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='termos_busca', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['termo', 'entregador'], name='termo_usuario_termo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entregador', 'campo', 'termo'), name='termo_usuario_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_usuarios_existentes, migrations.RunPython.noop),
+    ]
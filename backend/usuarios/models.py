@@ -64,6 +64,14 @@ class Entregador(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Usuário da autenticação em cache (usuarios/auth/authentication.py):
+        # o primeiro campo adiado acessado carrega todos os outros juntos
+        if fields is not None and getattr(self, '_carregar_linha_completa', False):
+            self._carregar_linha_completa = False
+            fields = list(set(fields) | self.get_deferred_fields())
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 class TwoFactorVerification(models.Model):
     """
     Modelo para armazenar códigos de verificação temporários do 2FA via email
@@ -111,3 +119,73 @@ class TrustedDevice(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.device_name} ({self.device_type})"
+
+
+class OutboundEmail(models.Model):
+    """
+    Fila de emails de saída (códigos 2FA e de cadastro).
+
+    As views apenas gravam a mensagem aqui; o envio é feito por
+    EmailQueueService (thread em segundo plano ou comando process_email_queue),
+    com novas tentativas e backoff exponencial. Mensagens que esgotam as
+    tentativas ficam com status 'dead' para inspeção no admin. O corpo é
+    apagado após o envio e mensagens antigas são removidas por
+    EmailQueueService.purge.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('sending', 'Enviando'),
+        ('sent', 'Enviado'),
+        ('dead', 'Falhou definitivamente'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(null=True, blank=True)
+    purpose = models.CharField(max_length=30, blank=True)  # login, setup, disable, registration...
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=django.utils.timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)  # Início do envio em andamento
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.status})"
+
+
+class TermoBuscaUsuario(models.Model):
+    """
+    Índice de busca de usuários do painel administrativo: palavras do nome,
+    email e dígitos do CPF normalizados (minúsculas, sem acentos e pontuação)
+    """
+    CAMPO_CHOICES = [
+        ('nome', 'Nome'),
+        ('email', 'Email'),
+        ('cpf', 'CPF'),
+    ]
+
+    entregador = models.ForeignKey(Entregador, on_delete=models.CASCADE, related_name='termos_busca')
+    campo = models.CharField(max_length=5, choices=CAMPO_CHOICES)
+    termo = models.CharField(max_length=100)
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entregador', 'campo', 'termo'], name='termo_usuario_unico'),
+        ]
+        indexes = [
+            # Busca por prefixo: intervalo em termo
+            models.Index(fields=['termo', 'entregador'], name='termo_usuario_termo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entregador_id} - {self.campo}:{self.termo}"
@@ -1,6 +1,6 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Entregador
+from .models import Entregador, TrustedDevice
 from registro_entregadespesa.models import CategoriaDespesa
 
 @receiver(post_save, sender=Entregador)
@@ -42,3 +42,43 @@ def criar_categorias_padrao(sender, instance, created, **kwargs):
             print(f"   ✅ Categoria criada: {cat_data['nome']}")
         
         print(f"🎉 4 categorias padrão criadas para {instance.nome}")
+
+
+@receiver(post_save, sender=Entregador)
+def indexar_busca_usuario(sender, instance, update_fields=None, **kwargs):
+    """
+    Mantém o índice de busca do admin (nome/email/CPF) atualizado
+
+    Gravações que não tocam esses campos (ex.: last_login) são ignoradas.
+    """
+    from .busca_service import BuscaUsuarios, CAMPOS_INDEXADOS
+
+    if update_fields is not None and not CAMPOS_INDEXADOS & set(update_fields):
+        return
+    BuscaUsuarios.indexar(instance)
+
+
+@receiver(post_save, sender=Entregador)
+@receiver(post_delete, sender=Entregador)
+def invalidar_usuario_autenticado(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida o usuário em cache da autenticação JWT (perfil, status ativo ou senha)
+
+    Gravações só de campos fora dos essenciais (ex.: last_login) não invalidam.
+    """
+    from .auth.authentication import CAMPOS_ESSENCIAIS, CacheUsuarios
+
+    if update_fields is not None and not set(CAMPOS_ESSENCIAIS) & set(update_fields):
+        return
+    CacheUsuarios.invalidar(instance.pk)
+
+
+@receiver(post_save, sender=TrustedDevice)
+@receiver(post_delete, sender=TrustedDevice)
+def invalidar_dispositivos_confiaveis(sender, instance, **kwargs):
+    """
+    Invalida a decisão em cache de dispositivo confiável do 2FA (adição, remoção, edição no admin)
+    """
+    from .email.trusted_device_cache import DispositivosConfiaveis
+
+    DispositivosConfiaveis.invalidar(instance.user_id)
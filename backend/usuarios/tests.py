@@ -0,0 +1,356 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .auth.authentication import PREFIXO, CacheUsuarios
+from .busca_service import BuscaUsuarios
+from .email.email_queue import EmailQueueService
+from .email.smart_2fa_service import Smart2FAService
+from .models import Entregador, OutboundEmail, TrustedDevice
+
+
+def criar_entregador(email, nome='Teste', **extra):
+    return Entregador.objects.create_user(
+        email=email, password='senha-teste', nome=nome, telefone='11999999999', **extra
+    )
+
+
+class BackendComFalha(EmailBackend):
+    """Backend locmem que falha nos próximos `falhas` envios"""
+
+    falhas = 0
+
+    def send_messages(self, messages):
+        if BackendComFalha.falhas > 0:
+            BackendComFalha.falhas -= 1
+            raise ConnectionError('SMTP indisponível')
+        return super().send_messages(messages)
+
+
+class RelogioFalso:
+    """timezone.now() controlado pelo teste"""
+
+    def __init__(self, inicio):
+        self.agora = inicio
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, **intervalo):
+        self.agora += timedelta(**intervalo)
+
+
+@override_settings(
+    EMAIL_QUEUE_MODE='sync',
+    EMAIL_QUEUE_BACKEND='usuarios.tests.BackendComFalha',
+    EMAIL_QUEUE_MAX_ATTEMPTS=3,
+    EMAIL_QUEUE_BACKOFF_SECONDS=30,
+    EMAIL_QUEUE_BACKOFF_MAX_SECONDS=3600,
+)
+class EmailQueueTests(TestCase):
+    """Fila de emails em modo síncrono com o backend locmem"""
+
+    def setUp(self):
+        BackendComFalha.falhas = 0
+        # Um pouco à frente do relógio real: next_attempt_at padrão usa o relógio real
+        self.relogio = RelogioFalso(timezone.now() + timedelta(seconds=1))
+        patcher = mock.patch('django.utils.timezone.now', self.relogio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _enfileirar(self):
+        return EmailQueueService.enqueue(
+            to_email='entregador@teste.com',
+            subject='Código de verificação',
+            body='Seu código é 123456',
+            html_body='<p>Seu código é <b>123456</b></p>',
+            purpose='2fa_login'
+        )
+
+    def test_enfileirar_envia(self):
+        email = self._enfileirar()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.sent_at, self.relogio())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['entregador@teste.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Código de verificação')
+        # O código não fica guardado depois do envio
+        self.assertEqual(email.body, '')
+        self.assertIsNone(email.html_body)
+
+    def test_falha_reagenda_com_backoff(self):
+        BackendComFalha.falhas = 2
+        email = self._enfileirar()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.next_attempt_at, self.relogio() + timedelta(seconds=30))
+        self.assertIn('SMTP indisponível', email.last_error)
+
+        # Antes do horário agendado nada é reenviado
+        self.relogio.avancar(seconds=29)
+        self.assertEqual(EmailQueueService.process_batch(), {'sent': 0, 'failed': 0})
+
+        # Segunda falha: espera dobra
+        self.relogio.avancar(seconds=1)
+        self.assertEqual(EmailQueueService.process_batch(), {'sent': 0, 'failed': 1})
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.next_attempt_at, self.relogio() + timedelta(seconds=60))
+
+        self.relogio.avancar(seconds=60)
+        self.assertEqual(EmailQueueService.process_batch(), {'sent': 1, 'failed': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_dead_apos_maximo_de_tentativas(self):
+        BackendComFalha.falhas = 10
+        email = self._enfileirar()
+
+        for _ in range(5):
+            self.relogio.avancar(hours=1)
+            EmailQueueService.process_batch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'dead')
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailQueueService.due_ids(), [])
+
+    def test_requeue_dead(self):
+        BackendComFalha.falhas = 3
+        email = self._enfileirar()
+        for _ in range(2):
+            self.relogio.avancar(hours=1)
+            EmailQueueService.process_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'dead')
+
+        self.assertEqual(EmailQueueService.requeue_dead(), 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 0)
+        self.assertEqual(email.last_error, '')
+
+        self.assertEqual(EmailQueueService.process_batch(), {'sent': 1, 'failed': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_requeue_dead_filtra_por_ids(self):
+        BackendComFalha.falhas = 6
+        emails = [self._enfileirar(), self._enfileirar()]
+        for _ in range(2):
+            self.relogio.avancar(hours=1)
+            EmailQueueService.process_batch()
+        self.assertEqual(OutboundEmail.objects.filter(status='dead').count(), 2)
+
+        self.assertEqual(EmailQueueService.requeue_dead(ids=[emails[0].pk]), 1)
+        self.assertEqual(
+            dict(OutboundEmail.objects.values_list('pk', 'status')),
+            {emails[0].pk: 'pending', emails[1].pk: 'dead'}
+        )
+
+    @override_settings(EMAIL_QUEUE_RETENTION_DAYS=7)
+    def test_purge_remove_enviadas_e_descartadas_antigas(self):
+        BackendComFalha.falhas = 3
+        descartada = self._enfileirar()
+        for _ in range(2):
+            self.relogio.avancar(hours=1)
+            EmailQueueService.process_batch()
+        enviada = self._enfileirar()
+        self.relogio.avancar(days=6)
+        recente = self._enfileirar()
+        pendente = OutboundEmail.objects.create(
+            to_email='outro@teste.com', subject='Código', body='Seu código é 654321',
+            next_attempt_at=self.relogio() + timedelta(days=30)
+        )
+
+        self.assertEqual(EmailQueueService.purge(), 0)
+        self.relogio.avancar(days=1, hours=1)
+        self.assertEqual(EmailQueueService.purge(), 2)
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list('pk', flat=True)), {recente.pk, pendente.pk}
+        )
+        self.assertFalse(OutboundEmail.objects.filter(pk__in=[descartada.pk, enviada.pk]).exists())
+
+
+class BuscaUsuariosTests(TestCase):
+    """Busca de entregadores do painel administrativo"""
+
+    def setUp(self):
+        self.joao = criar_entregador('joao.silva@teste.com', nome='João da Silva', cpf='123.456.789-00')
+        self.maria = criar_entregador('maria@teste.com', nome='Maria Silva Souza')
+        self.pedro = criar_entregador('pedro@teste.com', nome='Pedro Santos')
+
+    def _ids(self, resultado):
+        return [entregador.pk for entregador in resultado['entregadores']]
+
+    def test_nome_completo_com_stopword(self):
+        resultado = BuscaUsuarios.buscar('Joao da Silva')
+
+        self.assertEqual(resultado['total'], 1)
+        self.assertEqual(self._ids(resultado), [self.joao.pk])
+
+    def test_prefixos_de_todas_as_palavras(self):
+        resultado = BuscaUsuarios.buscar('silv ma')
+
+        self.assertEqual(self._ids(resultado), [self.maria.pk])
+
+    def test_email_e_cpf_por_prefixo(self):
+        self.assertEqual(self._ids(BuscaUsuarios.buscar('joao.silva@tes')), [self.joao.pk])
+        self.assertEqual(self._ids(BuscaUsuarios.buscar('123.456')), [self.joao.pk])
+
+    def test_consulta_de_uma_letra_devolve_pagina_vazia(self):
+        resultado = BuscaUsuarios.buscar('j')
+
+        self.assertEqual(resultado, {'entregadores': [], 'total': 0, 'next_cursor': None})
+
+    def test_paginacao_por_cursor(self):
+        primeira = BuscaUsuarios.buscar('silva', limite=1)
+        self.assertEqual(primeira['total'], 2)
+        self.assertIsNotNone(primeira['next_cursor'])
+
+        segunda = BuscaUsuarios.buscar('silva', cursor=primeira['next_cursor'], limite=1)
+        self.assertIsNone(segunda['next_cursor'])
+        self.assertEqual(
+            set(self._ids(primeira) + self._ids(segunda)), {self.joao.pk, self.maria.pk}
+        )
+
+    def test_renomear_reindexa(self):
+        self.pedro.nome = 'Pedro Alvares'
+        self.pedro.save()
+
+        self.assertEqual(self._ids(BuscaUsuarios.buscar('alvares')), [self.pedro.pk])
+        self.assertEqual(BuscaUsuarios.buscar('santos')['total'], 0)
+
+
+class CacheUsuariosTests(TestCase):
+    """Cópia em memória dos campos essenciais do usuário autenticado"""
+
+    def setUp(self):
+        CacheUsuarios.limpar()
+        self.addCleanup(CacheUsuarios.limpar)
+        self.entregador = criar_entregador('auth@teste.com')
+
+    def _cache_compartilhado(self):
+        """Cache em arquivo: visível para todos os processos, como o Redis"""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        configuracao = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': diretorio,
+        }})
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_locmem_nao_guarda_copia_em_memoria(self):
+        self.assertFalse(CacheUsuarios.ativo())
+
+        with self.assertNumQueries(1):
+            CacheUsuarios.valores(self.entregador.pk)
+        with self.assertNumQueries(1):
+            CacheUsuarios.valores(self.entregador.pk)
+
+    def test_cache_compartilhado_reaproveita_a_copia(self):
+        self._cache_compartilhado()
+        self.assertTrue(CacheUsuarios.ativo())
+
+        with self.assertNumQueries(1):
+            CacheUsuarios.valores(self.entregador.pk)
+        with self.assertNumQueries(0):
+            valores = CacheUsuarios.valores(self.entregador.pk)
+        self.assertTrue(valores['is_active'])
+
+    def test_desativar_invalida_a_copia(self):
+        self._cache_compartilhado()
+        CacheUsuarios.valores(self.entregador.pk)
+
+        self.entregador.is_active = False
+        self.entregador.save(update_fields=['is_active'])
+
+        self.assertFalse(CacheUsuarios.valores(self.entregador.pk)['is_active'])
+
+    def test_invalidacao_feita_por_outro_processo(self):
+        self._cache_compartilhado()
+        CacheUsuarios.valores(self.entregador.pk)
+
+        # Outro processo alterou o usuário: só a versão compartilhada muda
+        Entregador.objects.filter(pk=self.entregador.pk).update(nome='Outro nome')
+        cache.set(f'{PREFIXO}:{self.entregador.pk}:versao', CacheUsuarios.versao(self.entregador.pk) + 1, None)
+
+        self.assertEqual(CacheUsuarios.valores(self.entregador.pk)['nome'], 'Outro nome')
+
+
+@override_settings(TWO_FACTOR_LAST_USED_INTERVALO_MINUTOS=15)
+class DispositivosConfiaveisTests(TestCase):
+    """Decisão de 2FA com dispositivos confiáveis em cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.relogio = RelogioFalso(timezone.now())
+        patcher = mock.patch('django.utils.timezone.now', self.relogio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.entregador = criar_entregador('2fa@teste.com', two_factor_enabled=True)
+        self.dispositivo = TrustedDevice.objects.create(
+            user=self.entregador, device_id='celular-1', device_name='Celular', device_type='mobile'
+        )
+
+    def _motivo(self, device_id):
+        return Smart2FAService.should_require_2fa(self.entregador, device_id)['reason']
+
+    def test_dispositivo_confiavel_sai_do_cache(self):
+        self.assertEqual(self._motivo('celular-1'), 'Trusted device')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._motivo('celular-1'), 'Trusted device')
+
+    def test_last_used_gravado_no_maximo_uma_vez_por_intervalo(self):
+        self._motivo('celular-1')
+        self.relogio.avancar(minutes=10)
+        self._motivo('celular-1')
+        self.dispositivo.refresh_from_db()
+        ultimo_uso = self.dispositivo.last_used
+
+        self.relogio.avancar(minutes=10)
+        with self.assertNumQueries(1):
+            self._motivo('celular-1')
+
+        self.dispositivo.refresh_from_db()
+        self.assertEqual(self.dispositivo.last_used, self.relogio())
+        self.assertNotEqual(self.dispositivo.last_used, ultimo_uso)
+
+    def test_adicionar_dispositivo_invalida_resposta_negativa(self):
+        self.assertEqual(self._motivo('notebook'), 'Untrusted device')
+
+        Smart2FAService.add_trusted_device(self.entregador, 'notebook', 'Notebook', 'web')
+
+        self.assertEqual(self._motivo('notebook'), 'Trusted device')
+
+    def test_remover_ou_desativar_todos_invalida_o_cache(self):
+        self.assertEqual(self._motivo('celular-1'), 'Trusted device')
+        self.dispositivo.delete()
+        self.assertEqual(self._motivo('celular-1'), 'Untrusted device')
+
+        Smart2FAService.add_trusted_device(self.entregador, 'celular-1', 'Celular', 'mobile')
+        self.assertEqual(self._motivo('celular-1'), 'Trusted device')
+
+        Smart2FAService.force_2fa_for_all_devices(self.entregador)
+        # Mesmo depois de liberar o próximo login, o dispositivo não é mais confiável
+        self.entregador.two_factor_required = False
+        self.assertEqual(self._motivo('celular-1'), 'Untrusted device')
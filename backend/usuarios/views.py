@@ -14,6 +14,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from relatorios_dashboard.cache_service import ReportCache
 from .models import Entregador
 from .auth.auth_serializers import UserProfileSerializer as EntregadorSerializer
 
@@ -115,6 +116,8 @@ class UploadFotoPerfilView(APIView):
             # Salvar nova foto
             filename = f"perfil_{user.id}_{uuid.uuid4().hex[:8]}.jpg"
             user.foto.save(filename, ContentFile(foto_bytes), save=True)
+            # A foto faz parte do payload das estatísticas
+            ReportCache.invalidar(user.id)
             logger.info(f"Foto atualizada para usuário: {user.email}")
             
             return Response({
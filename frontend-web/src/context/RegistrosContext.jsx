@@ -21,7 +21,8 @@ export function RegistrosProvider({ children }) {
     }
     try {
       console.log('🔍 RegistrosContext - Carregando registros...');
-      const response = await api.get(ENDPOINTS.REGISTROS.LIST);
+      // O contexto guarda a lista inteira (as listagens são paginadas por padrão)
+      const response = await api.get(`${ENDPOINTS.REGISTROS.LIST}?completo=true`);
       console.log('🔍 RegistrosContext - Registros carregados:', response.data);
       setRegistros(response.data.results || response.data || []);
     } catch (err) {
@@ -59,7 +60,8 @@ export function RegistrosProvider({ children }) {
     }
     try {
       console.log('🔍 RegistrosContext - Carregando despesas...');
-      const response = await api.get(ENDPOINTS.DESPESAS.LIST);
+      // O contexto guarda a lista inteira (as listagens são paginadas por padrão)
+      const response = await api.get(`${ENDPOINTS.DESPESAS.LIST}?completo=true`);
       console.log('🔍 RegistrosContext - Despesas carregadas:', response.data);
       setDespesas(response.data.results || response.data || []);
     } catch (err) {
@@ -60,8 +60,9 @@ const AdminDashboard = () => {
       setError(null);
       const [usersResponse, postagensResponse, anunciosResponse] = await Promise.all([
         api.get(ENDPOINTS.ADMIN.USERS),
-        api.get('/comunidade/api/postagens/'),
-        api.get('/comunidade/api/anuncios/')
+        // A moderação precisa de todos os itens (a API pagina por padrão)
+        api.get('/comunidade/api/postagens/?completo=true'),
+        api.get('/comunidade/api/anuncios/?completo=true')
       ]);
       
       // A API retorna { success: true, data: { entregadores: [...] } }
@@ -29,6 +29,9 @@ import { api, ENDPOINTS, API_BASE_URL } from '../../services/apiClient';
 const DeliveryComunidade = () => {
   const [postagens, setPostagens] = useState([]);
   const [anuncios, setAnuncios] = useState([]);
+  // Cursores do feed paginado (null quando não há mais itens)
+  const [cursores, setCursores] = useState({ postagens: null, anuncios: null });
+  const [carregandoMais, setCarregandoMais] = useState({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -62,6 +65,11 @@ const DeliveryComunidade = () => {
       ]);
       setPostagens(postagensResponse.data.postagens || []);
       setAnuncios(anunciosResponse.data.anuncios || []);
+      // A API devolve só a primeira página; o restante vem de /comunidade/api/feed/<tipo>/
+      setCursores({
+        postagens: postagensResponse.data.postagens_next_cursor || null,
+        anuncios: anunciosResponse.data.anuncios_next_cursor || null,
+      });
     } catch (err) {
       setError('Erro ao carregar dados da comunidade: ' + (err.response?.data?.message || err.message));
     } finally {
@@ -69,6 +77,30 @@ const DeliveryComunidade = () => {
     }
   };
 
+  const carregarMais = async (tipo) => {
+    const cursor = cursores[tipo];
+    if (!cursor) return;
+    try {
+      setCarregandoMais(prev => ({ ...prev, [tipo]: true }));
+      const response = await api.get(`/comunidade/api/feed/${tipo}/?cursor=${encodeURIComponent(cursor)}`);
+      const novos = response.data.results || [];
+      const adicionar = (atuais) => {
+        const ids = new Set(atuais.map(item => item.id));
+        return [...atuais, ...novos.filter(item => !ids.has(item.id))];
+      };
+      if (tipo === 'postagens') {
+        setPostagens(adicionar);
+      } else {
+        setAnuncios(adicionar);
+      }
+      setCursores(prev => ({ ...prev, [tipo]: response.data.next_cursor || null }));
+    } catch (err) {
+      setError('Erro ao carregar mais itens da comunidade: ' + (err.response?.data?.message || err.message));
+    } finally {
+      setCarregandoMais(prev => ({ ...prev, [tipo]: false }));
+    }
+  };
+
   const handlePostChange = (e) => {
     setPostData({ ...postData, [e.target.name]: e.target.value });
   };
@@ -257,6 +289,17 @@ const DeliveryComunidade = () => {
                   </ListItem>
                 )}
               </List>
+              {cursores.postagens && (
+                <Box display="flex" justifyContent="center" mt={1}>
+                  <Button
+                    variant="outlined"
+                    onClick={() => carregarMais('postagens')}
+                    disabled={!!carregandoMais.postagens}
+                  >
+                    {carregandoMais.postagens ? <CircularProgress size={20} /> : 'Carregar mais'}
+                  </Button>
+                </Box>
+              )}
             </CardContent>
           </Card>
         </Grid>
@@ -427,6 +470,17 @@ const DeliveryComunidade = () => {
                   </ListItem>
                 )}
               </List>
+              {cursores.anuncios && (
+                <Box display="flex" justifyContent="center" mt={1}>
+                  <Button
+                    variant="outlined"
+                    onClick={() => carregarMais('anuncios')}
+                    disabled={!!carregandoMais.anuncios}
+                  >
+                    {carregandoMais.anuncios ? <CircularProgress size={20} /> : 'Carregar mais'}
+                  </Button>
+                </Box>
+              )}
             </CardContent>
           </Card>
         </Grid>
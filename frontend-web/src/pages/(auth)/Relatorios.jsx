@@ -116,9 +116,13 @@ const Relatorios = () => {
       let diasTrabalhadosData = [];
       let despesasData = [];
       
+      // Os gráficos usam o histórico completo (listagens são paginadas por padrão)
+      const listaParams = new URLSearchParams(params);
+      listaParams.append('completo', 'true');
+      
       // Buscar dados detalhados de dias trabalhados
       try {
-        const diasResponse = await api.get(`/registro/api/registro-trabalho/?${params.toString()}`);
+        const diasResponse = await api.get(`/registro/api/registro-trabalho/?${listaParams.toString()}`);
         console.log('🔍 Relatorios - Dias trabalhados:', diasResponse.data);
         diasTrabalhadosData = diasResponse.data.results || [];
         setDiasTrabalhados(diasTrabalhadosData);
@@ -129,7 +133,7 @@ const Relatorios = () => {
       
       // Buscar dados de despesas
       try {
-        const despesasResponse = await api.get(`/registro/api/registro-despesa/?${params.toString()}`);
+        const despesasResponse = await api.get(`/registro/api/registro-despesa/?${listaParams.toString()}`);
         console.log('🔍 Relatorios - Despesas:', despesasResponse.data);
         despesasData = despesasResponse.data.results || [];
         setDespesas(despesasData);
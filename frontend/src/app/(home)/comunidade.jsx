@@ -24,6 +24,9 @@ function ComunidadeScreen() {
   const [activeTab, setActiveTab] = useState('postagens'); // 'postagens' ou 'anuncios'
   const [postagens, setPostagens] = useState([]);
   const [anuncios, setAnuncios] = useState([]);
+  // Cursores da próxima página de cada tipo (null quando não há mais itens)
+  const [cursores, setCursores] = useState({ postagens: null, anuncios: null });
+  const [carregandoMais, setCarregandoMais] = useState(false);
   const [carregando, setCarregando] = useState(false);
   const [atualizando, setAtualizando] = useState(false);
   const [mostrarModalPostagem, setMostrarModalPostagem] = useState(false);
@@ -51,6 +54,11 @@ function ComunidadeScreen() {
       
       setPostagens(postagens);
       setAnuncios(anuncios);
+      // O backend devolve só a primeira página; o restante vem ao rolar a lista
+      setCursores({
+        postagens: data.postagens_next_cursor || null,
+        anuncios: data.anuncios_next_cursor || null,
+      });
       
     } catch (error) {
       console.error('❌ Erro ao carregar dados da comunidade:', error);
@@ -96,6 +104,7 @@ function ComunidadeScreen() {
 
       setPostagens(postagensMock);
       setAnuncios(anunciosMock);
+      setCursores({ postagens: null, anuncios: null });
       
       Alert.alert('Aviso', 'Não foi possível conectar com o servidor. Mostrando dados de exemplo.');
     } finally {
@@ -118,6 +127,31 @@ function ComunidadeScreen() {
     }
   };
 
+  const carregarMais = async () => {
+    const tipo = activeTab;
+    const cursor = cursores[tipo];
+    if (!cursor || carregandoMais) return;
+    setCarregandoMais(true);
+    try {
+      const data = await communityService.getMorePosts(tipo, cursor);
+      const novos = data.results || [];
+      const adicionar = (atuais) => {
+        const ids = new Set(atuais.map((item) => item.id));
+        return [...atuais, ...novos.filter((item) => !ids.has(item.id))];
+      };
+      if (tipo === 'postagens') {
+        setPostagens(adicionar);
+      } else {
+        setAnuncios(adicionar);
+      }
+      setCursores((atuais) => ({ ...atuais, [tipo]: data.next_cursor || null }));
+    } catch (error) {
+      console.error('❌ Erro ao carregar mais itens da comunidade:', error);
+    } finally {
+      setCarregandoMais(false);
+    }
+  };
+
   const aoAtualizar = async () => {
     setAtualizando(true);
     await carregarDados();
@@ -254,6 +288,8 @@ function ComunidadeScreen() {
           <RefreshControl refreshing={atualizando} onRefresh={aoAtualizar} />
         }
         ListEmptyComponent={renderizarEstadoVazio}
+        onEndReached={carregarMais}
+        onEndReachedThreshold={0.5}
         contentContainerStyle={styles.containerLista}
         showsVerticalScrollIndicator={false}
       />
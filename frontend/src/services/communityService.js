@@ -53,6 +53,36 @@ class CommunityService {
     }
   }
 
+  // Buscar a próxima página do feed ('postagens' ou 'anuncios')
+  // getPosts devolve só a primeira página de cada tipo e os cursores
+  // postagens_next_cursor / anuncios_next_cursor para continuar aqui
+  async getMorePosts(tipo, cursor) {
+    try {
+      const url = `${this.baseURL}/comunidade/api/feed/${tipo}/?cursor=${encodeURIComponent(cursor)}`;
+      console.log('🔄 Buscando mais itens:', url);
+
+      const token = await this.getAuthToken();
+
+      const response = await fetch(url, {
+        method: 'GET',
+        headers: {
+          'Accept': 'application/json',
+          ...(token && { 'Authorization': `Bearer ${token}` }),
+        },
+      });
+
+      if (!response.ok) {
+        throw new Error(`Erro ao buscar mais itens: ${response.status} - ${response.statusText}`);
+      }
+
+      // { success, tipo, results, count, next_cursor, has_more }
+      return await response.json();
+    } catch (error) {
+      console.error('❌ Erro ao buscar mais itens:', error);
+      throw error;
+    }
+  }
+
   // Criar nova postagem
   async createPost(postData) {
     try {